@@ -0,0 +1,57 @@
+"""
+比較逐一請求與批次請求在高延遲連線下的耗時
+    python -m benchmarks.bench_batch_transport [--latency 0.2] [--keywords 8] [--pages 3]
+"""
+import argparse
+import time
+from config.key_manager import KeyManager
+from core.api_client import YouTubeAPIClient
+from benchmarks.fake_youtube import FakeYouTubeServer
+
+
+def run_case(server: FakeYouTubeServer, transport: str, max_workers: int, keywords: list[str], pages: int) -> dict:
+    key_manager = KeyManager(file_path=None, usage_path=None)
+    key_manager.set_keys(["FAKE-KEY-" + "x" * 30])
+    client = YouTubeAPIClient(key_manager, max_workers=max_workers, transport=transport, root_url=server.root_url)
+    settings = {"days": 30, "max_pages": pages, "limit": 10_000, "min_views": 0, "max_duration": 60}
+
+    client.service  # build the service outside the timed region
+    server.reset_counters()
+    start = time.perf_counter()
+    results = client.fetch_many(keywords, settings)
+    elapsed = time.perf_counter() - start
+    return {
+        "case": f"{transport} x{max_workers}",
+        "seconds": elapsed,
+        "http_round_trips": server.http_requests,
+        "api_calls": sum(server.api_calls.values()),
+        "results": len(results),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--keywords", type=int, default=8)
+    parser.add_argument("--pages", type=int, default=3)
+    args = parser.parse_args()
+
+    server = FakeYouTubeServer(latency=args.latency, pages=args.pages).start()
+    keywords = [f"kw{i}" for i in range(args.keywords)]
+    try:
+        rows = [
+            run_case(server, "direct", 1, keywords, args.pages),
+            run_case(server, "direct", 4, keywords, args.pages),
+            run_case(server, "batch", 1, keywords, args.pages),
+        ]
+    finally:
+        server.stop()
+
+    print(f"latency={args.latency}s keywords={args.keywords} pages={args.pages}")
+    print(f"{'case':<12}{'seconds':>10}{'round trips':>14}{'api calls':>12}{'results':>10}")
+    for row in rows:
+        print(f"{row['case']:<12}{row['seconds']:>10.2f}{row['http_round_trips']:>14}{row['api_calls']:>12}{row['results']:>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""
+重複上傳偵測 (core.dedup) 隨結果數增加的耗時，與兩兩比較標題的做法對照
+    python -m benchmarks.bench_dedup [--sizes 1000 5000 20000 50000] [--naive-max 2000]
+
+測試資料：每支影片有 0 至數個重新上傳的版本 (標題加上表情符號、hashtag、大小寫與標點變化或刪去一個詞，
+時長相差 1 秒內、幾天內發布)，另有一般的不同影片；precision / recall 以「同組影片配對」計算
+"""
+import argparse
+import random
+import time
+from collections import Counter
+from datetime import datetime
+from config.settings import (
+    DEDUP_DURATION_GAP, DEDUP_LOOSE_SIMILARITY, DEDUP_MIN_TITLE_CHARS, DEDUP_PUBLISH_GAP, DEDUP_SHINGLE,
+    DEDUP_SIMILARITY
+)
+from core.dedup import find_duplicates, normalize_title
+from core.models import VideoRecord
+
+# Words every other Shorts title uses, plus a long tail of topic words (names, places, objects)
+COMMON_WORDS = ("cat dog baby prank fail dance challenge hack trick funny cute wait for it end "
+                "satisfying epic 小貓 狗狗 爆笑 挑戰 驚人 最後 反應").split()
+SYLLABLES = "ka ri mo ta lu ne shi po ga ze bo vi ran tor mel dus qui fen 星 海 光 龍 雲 花".split()
+DECORATIONS = ("😂", "🔥🔥", "!!", " #shorts", " #viral #fyp", " (re-upload)", " 😱", "...")
+
+
+def _variant(rng: random.Random, title: str) -> str:
+    words = title.split()
+    roll = rng.random()
+    if roll < 0.3 and len(words) > 4:
+        del words[rng.randrange(len(words))]
+    elif roll < 0.5:
+        words = [w.upper() if rng.random() < 0.5 else w for w in words]
+    return " ".join(words) + "".join(rng.sample(DECORATIONS, rng.randint(0, 2)))
+
+
+def make_records(count: int, seed: int = 0) -> tuple[list[VideoRecord], list[int]]:
+    """count 部影片與各自所屬的原始影片編號 (相同編號即互為拷貝)"""
+    rng = random.Random(seed)
+    topic_words = ["".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 3))) for _ in range(5_000)]
+    records, truth = [], []
+    clip = 0
+    while len(records) < count:
+        words = rng.sample(COMMON_WORDS, rng.randint(2, 4)) + rng.sample(topic_words, rng.randint(2, 5))
+        rng.shuffle(words)
+        title = " ".join(words)
+        duration = rng.randint(8, 60)
+        day = rng.randint(1, 28)
+        # Most clips are unique; viral ones get many copies
+        copies = 1 + min(int(rng.expovariate(0.7)), 30)
+        for n in range(min(copies, count - len(records))):
+            views = rng.randint(100_000, 30_000_000)
+            records.append(VideoRecord(
+                id=f"{len(records):011d}",
+                title=title if n == 0 else _variant(rng, title),
+                channel_id=f"UC{rng.getrandbits(64):022x}",
+                channel_title=f"Channel {rng.randint(0, 5000)}",
+                thumbnail_url="",
+                published_at=f"2026-09-{min(28, day + rng.randint(0, 2) * (n > 0)):02d}T12:00:00Z",
+                view_count=views,
+                duration_sec=min(60, duration + (rng.randint(-1, 1) if n else 0)),
+                formatted_duration="",
+                daily_views=0.0,
+                rating="",
+            ))
+            truth.append(clip)
+        clip += 1
+    order = list(range(count))
+    rng.shuffle(order)
+    return [records[i] for i in order], [truth[i] for i in order]
+
+
+def title_shingles(title: str) -> set[str]:
+    text = normalize_title(title)
+    if len(text) < max(DEDUP_SHINGLE, DEDUP_MIN_TITLE_CHARS):
+        return set()
+    return {text[i:i + DEDUP_SHINGLE] for i in range(len(text) - DEDUP_SHINGLE + 1)}
+
+
+def naive_duplicates(records: list[VideoRecord]) -> list[list[int]]:
+    """兩兩比較標題的 n-gram 集合 (精確 Jaccard 相似度，規則與 find_duplicates 相同)，O(n²)"""
+    shingles = [title_shingles(v.title) for v in records]
+    published = [datetime.fromisoformat(v.published_at.replace("Z", "+00:00")).timestamp() for v in records]
+    parent = list(range(len(records)))
+
+    def find(x):
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    for i in range(len(records)):
+        if not shingles[i]:
+            continue
+        for j in range(i + 1, len(records)):
+            if not shingles[j] or abs(records[i].duration_sec - records[j].duration_sec) > DEDUP_DURATION_GAP:
+                continue
+            similarity = len(shingles[i] & shingles[j]) / len(shingles[i] | shingles[j])
+            close = abs(published[i] - published[j]) <= DEDUP_PUBLISH_GAP
+            if similarity >= DEDUP_SIMILARITY or (similarity >= DEDUP_LOOSE_SIMILARITY and close):
+                parent[find(j)] = find(i)
+    groups = {}
+    for i in range(len(records)):
+        groups.setdefault(find(i), []).append(i)
+    return [g for g in groups.values() if len(g) > 1]
+
+
+def pair_scores(groups: list[list[int]], truth: list[int]) -> dict:
+    """以「同組影片配對」計算 precision / recall"""
+    def pairs(counter):
+        return sum(n * (n - 1) // 2 for n in counter.values())
+
+    predicted = list(range(len(truth)))
+    for gid, members in enumerate(groups):
+        for i in members:
+            predicted[i] = len(truth) + gid
+    both = pairs(Counter(zip(predicted, truth)))
+    found, actual = pairs(Counter(predicted)), pairs(Counter(truth))
+    return {
+        "precision": round(both / found, 4) if found else 1.0,
+        "recall": round(both / actual, 4) if actual else 1.0,
+    }
+
+
+def run(sizes: list[int], naive_max: int = 2_000) -> dict:
+    find_duplicates(make_records(100)[0])  # numpy / pandas imports stay out of the first timing
+    results = {}
+    for size in sizes:
+        records, truth = make_records(size)
+        start = time.perf_counter()
+        groups = find_duplicates(records)
+        seconds = time.perf_counter() - start
+        results[f"lsh_{size}"] = {
+            "seconds": round(seconds, 3),
+            "us_per_record": round(seconds / size * 1e6, 1),
+            "groups": len(groups),
+            "cards_after_collapse": size - sum(len(g) - 1 for g in groups),
+            **pair_scores(groups, truth),
+        }
+        if size <= naive_max:
+            start = time.perf_counter()
+            groups = naive_duplicates(records)
+            seconds = time.perf_counter() - start
+            results[f"pairwise_{size}"] = {
+                "seconds": round(seconds, 3),
+                "us_per_record": round(seconds / size * 1e6, 1),
+                "groups": len(groups),
+                **pair_scores(groups, truth),
+            }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 5_000, 20_000, 50_000])
+    parser.add_argument("--naive-max", type=int, default=2_000, help="兩兩比較只在此數量以下執行")
+    args = parser.parse_args()
+
+    for case, values in run(args.sizes, args.naive_max).items():
+        print(f"{case}: " + ", ".join(f"{k}={v}" for k, v in values.items()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+比較逐段匯出 (core.export) 與一次在記憶體中建立整個檔案的耗時與記憶體峰值
+    python -m benchmarks.bench_export [--rows 100000] [--chunk-size 5000]
+
+記憶體峰值以 tracemalloc 量測，只包含 Python 物件 (pyarrow 的緩衝區不在其中)
+"""
+import argparse
+import gc
+import io
+import json
+import random
+import time
+import tracemalloc
+from config.settings import EXPORT_CHUNK_SIZE
+from core.export import EXPORT_COLUMNS, EXPORT_FORMATS, record_row, write_export
+from core.models import VideoRecord
+from core.result_view import card_html
+
+
+def make_records(count: int, seed: int = 0) -> list[VideoRecord]:
+    rng = random.Random(seed)
+    records = []
+    for i in range(count):
+        views = rng.randint(100_000, 30_000_000)
+        subscribers = rng.choice([None, rng.randint(100, 10_000_000)])
+        records.append(VideoRecord(
+            id=f"{i:011d}",
+            title=f"Cute cat compilation #{i} " + "".join(rng.choice("abcdefgh ") for _ in range(40)),
+            channel_id=f"UC{rng.getrandbits(64):022x}",
+            channel_title=f"Channel {rng.randint(0, 5000)}",
+            thumbnail_url=f"https://i.ytimg.com/vi/{i:011d}/mqdefault.jpg",
+            published_at="2026-09-01T12:00:00Z",
+            view_count=views,
+            duration_sec=45,
+            formatted_duration="00:45",
+            daily_views=views / rng.randint(1, 60),
+            rating="🔥🔥",
+            keywords=["CAT", "CUTE"][:rng.randint(1, 2)],
+            views_per_hour=rng.choice([None, rng.random() * 10_000]),
+            subscriber_count=subscribers,
+        ))
+    return records
+
+
+def in_memory_export(records: list[VideoRecord], fmt: str) -> bytes:
+    """一次建立整個檔案 (先轉成 dict 列表 / DataFrame / 字串)，作為比較基準"""
+    import pandas as pd
+    columns = list(EXPORT_COLUMNS)
+    rows = [record_row(vid, columns) for vid in records]
+    if fmt == "csv":
+        return pd.DataFrame(rows, columns=columns).to_csv(index=False).encode("utf-8-sig")
+    if fmt == "ndjson":
+        return "".join(json.dumps(row, ensure_ascii=False) + "\n" for row in rows).encode("utf-8")
+    if fmt == "parquet":
+        buffer = io.BytesIO()
+        pd.DataFrame(rows, columns=columns).to_parquet(buffer, index=False)
+        return buffer.getvalue()
+    return ("<html><body>" + "\n".join(card_html(vid) for vid in records) + "</body></html>").encode("utf-8")
+
+
+class CountingSink:
+    """只計算位元組數的輸出目標 (模擬寫入檔案或網路)"""
+    def __init__(self):
+        self.size = 0
+
+    def write(self, data: bytes):
+        self.size += len(data)
+
+
+def streamed_export(records: list[VideoRecord], fmt: str, chunk_size: int) -> int:
+    sink = CountingSink()
+    write_export(records, sink, fmt, chunk_size=chunk_size)
+    return sink.size
+
+
+def peak_memory(run) -> int:
+    gc.collect()
+    tracemalloc.start()
+    run()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+def run(rows: int, chunk_size: int = EXPORT_CHUNK_SIZE) -> dict:
+    records = make_records(rows)
+    results = {}
+    for fmt in EXPORT_FORMATS:
+        cases = {
+            "streamed": lambda: streamed_export(records, fmt, chunk_size),
+            "in_memory": lambda: len(in_memory_export(records, fmt)),
+        }
+        for label, export in cases.items():
+            start = time.perf_counter()
+            size = export()
+            seconds = time.perf_counter() - start
+            results[f"{fmt}.{label}"] = {
+                "seconds": round(seconds, 3),
+                "rows_per_sec": round(rows / seconds),
+                "output_mib": round(size / 1024 / 1024, 2),
+                "peak_python_mib": round(peak_memory(export) / 1024 / 1024, 2),
+            }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--chunk-size", type=int, default=EXPORT_CHUNK_SIZE)
+    args = parser.parse_args()
+
+    for case, values in run(args.rows, args.chunk_size).items():
+        print(f"{case}: " + ", ".join(f"{k}={v}" for k, v in values.items()))
+
+
+if __name__ == "__main__":
+    main()
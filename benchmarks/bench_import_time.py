@@ -0,0 +1,106 @@
+"""
+啟動時間分析：以 python -X importtime 匯入網頁版，列出各模組的匯入耗時，
+並檢查較重的套件 (pandas、googleapiclient 等) 是否延後到第一次搜尋才載入
+    python -m benchmarks.bench_import_time [--repeat 5] [--top 15] [--budget-ms 50]
+
+有延後載入的套件在啟動時被匯入、或本專案模組超過 --budget-ms 時，結束代碼為 1
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+# Loaded on the first search, never at start-up
+DEFERRED_MODULES = ("pandas", "googleapiclient", "httplib2", "isodate")
+APP_PREFIXES = ("config.", "core.")
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+
+def parse_importtime(stderr: str) -> list[tuple[str, int, int, int]]:
+    """解析 -X importtime 輸出，回傳 [(module, depth, self_us, cumulative_us)]"""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        head, cumulative_us, name = line.split("|", 2)
+        stripped = name.lstrip()
+        # One space after the bar, then two per nesting level
+        depth = (len(name) - len(stripped) - 1) // 2
+        rows.append((stripped, depth, int(head.split(":", 1)[1]), int(cumulative_us)))
+    return rows
+
+
+def profile_once(module: str) -> list[tuple[str, int, int, int]]:
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE="1")
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=REPO_ROOT, env=env, capture_output=True, text=True, timeout=120,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr[-2000:]}")
+    return parse_importtime(result.stderr)
+
+
+def profile(module: str = "streamlit_app", repeat: int = 5) -> dict:
+    """
+    匯入 module repeat 次 (每次都是新的行程)，各項取中位數
+    :return: total_ms (含執行腳本本身)、app_ms (本專案模組)、streamlit_ms、各模組耗時與延後載入檢查
+    """
+    runs = [profile_once(module) for _ in range(repeat)]
+
+    def median_ms(values) -> float:
+        return round(statistics.median(values) / 1000, 2)
+
+    per_module = {}
+    for rows in runs:
+        for name, depth, _, cumulative in rows:
+            if depth == 1:
+                per_module.setdefault(name, []).append(cumulative)
+
+    loaded = set(name for name, *_ in runs[-1])
+    deferred_loaded = sorted(name for name in loaded if name in DEFERRED_MODULES)
+    return {
+        "module": module,
+        "total_ms": median_ms([rows[-1][3] for rows in runs]),
+        "script_ms": median_ms([rows[-1][2] for rows in runs]),
+        "app_ms": median_ms([
+            sum(c for name, depth, _, c in rows if depth == 1 and name.startswith(APP_PREFIXES)) for rows in runs
+        ]),
+        "streamlit_ms": median_ms([
+            sum(c for name, depth, _, c in rows if depth == 1 and name == "streamlit") for rows in runs
+        ]),
+        "modules_ms": {name: median_ms(values) for name, values in per_module.items()},
+        "deferred_loaded": deferred_loaded,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="streamlit_app")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--budget-ms", type=float, default=50.0, help="本專案模組的匯入時間上限")
+    args = parser.parse_args()
+
+    report = profile(args.module, args.repeat)
+    print(f"import {report['module']}: {report['total_ms']:.1f} ms total "
+          f"(streamlit {report['streamlit_ms']:.1f} ms, app modules {report['app_ms']:.1f} ms, "
+          f"script body {report['script_ms']:.1f} ms)")
+    ranked = sorted(report["modules_ms"].items(), key=lambda kv: kv[1], reverse=True)
+    for name, ms in ranked[:args.top]:
+        print(f"  {ms:>9.2f} ms  {name}")
+
+    failed = False
+    if report["deferred_loaded"]:
+        print(f"FAIL: loaded at start-up but should be deferred: {', '.join(report['deferred_loaded'])}")
+        failed = True
+    if report["app_ms"] > args.budget_ms:
+        print(f"FAIL: app modules took {report['app_ms']:.1f} ms (budget {args.budget_ms:.0f} ms)")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
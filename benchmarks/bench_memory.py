@@ -0,0 +1,81 @@
+"""
+比較完整 API 回應 (dict) 與精簡 VideoRecord 的記憶體用量
+    python -m benchmarks.bench_memory [--results 1000]
+"""
+import argparse
+import gc
+import json
+import random
+import tracemalloc
+from core.models import VideoRecord
+
+THUMBNAIL_SIZES = {"default": (120, 90), "medium": (320, 180), "high": (480, 360),
+                   "standard": (640, 480), "maxres": (1280, 720)}
+
+
+def make_api_item(i: int, rng: random.Random) -> dict:
+    """接近真實 videos().list 的項目 (含說明、標籤、多種縮圖與在地化欄位) 與計算欄位"""
+    video_id = f"{i:011d}"
+    title = f"Cute cat compilation #{i} " + "".join(rng.choice("abcdefgh ") for _ in range(40))
+    description = " ".join(rng.choice(["cat", "cute", "funny", "shorts", "#viral", "subscribe"]) for _ in range(100))
+    item = {
+        "kind": "youtube#video",
+        "etag": f"etag-{rng.getrandbits(64):x}",
+        "id": video_id,
+        "snippet": {
+            "publishedAt": "2026-09-01T12:00:00Z",
+            "channelId": f"UC{rng.getrandbits(64):x}",
+            "title": title,
+            "description": description,
+            "thumbnails": {
+                name: {"url": f"https://i.ytimg.com/vi/{video_id}/{name}.jpg", "width": w, "height": h}
+                for name, (w, h) in THUMBNAIL_SIZES.items()
+            },
+            "channelTitle": f"Channel {rng.randint(0, 500)}",
+            "tags": [f"tag{rng.randint(0, 1000)}" for _ in range(15)],
+            "categoryId": "15",
+            "liveBroadcastContent": "none",
+            "defaultAudioLanguage": "en",
+            "localized": {"title": title, "description": description},
+        },
+        "contentDetails": {"duration": "PT45S", "dimension": "2d", "definition": "hd", "caption": "false",
+                           "licensedContent": True, "contentRating": {}, "projection": "rectangular"},
+        "statistics": {"viewCount": str(rng.randint(100_000, 30_000_000)), "likeCount": str(rng.randint(0, 10**6)),
+                       "favoriteCount": "0", "commentCount": str(rng.randint(0, 10**4))},
+        "_daily_views": rng.random() * 10**6,
+        "_rating": "🔥🔥",
+        "_duration_sec": 45,
+        "_formatted_duration": "00:45",
+        "_keywords": ["CAT"],
+    }
+    return item
+
+
+def measure(build) -> tuple[int, object]:
+    gc.collect()
+    tracemalloc.start()
+    data = build()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return current, data
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--results", type=int, default=1000)
+    args = parser.parse_args()
+
+    # Round-trip through JSON so strings are fresh objects, as they are after an API call
+    payload = json.dumps([make_api_item(i, random.Random(i)) for i in range(args.results)])
+
+    dict_bytes, items = measure(lambda: json.loads(payload))
+    record_bytes, records = measure(lambda: [VideoRecord.from_item(item) for item in json.loads(payload)])
+
+    print(f"results={args.results}")
+    print(f"raw dicts:     {dict_bytes / 1024:>10.1f} KiB ({dict_bytes / args.results:,.0f} B/result)")
+    print(f"VideoRecord:   {record_bytes / 1024:>10.1f} KiB ({record_bytes / args.results:,.0f} B/result)")
+    print(f"reduction:     {dict_bytes / record_bytes:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
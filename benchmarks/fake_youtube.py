@@ -0,0 +1,403 @@
+"""
+本機模擬的 YouTube Data API (search / videos / channels / batch)
+供效能測試使用，不消耗真實額度：
+    server = FakeYouTubeServer(latency=0.1).start()
+    client = YouTubeAPIClient(key_manager, root_url=server.root_url)
+
+也可以載入錄製的回應 (load_fixtures)，格式：
+    {"search": {"<q>|<pageToken>": <search().list 回應>}, "videos": {"<video_id>": <videos().list 項目>}}
+第一頁的 pageToken 為空字串；找不到的查詢或影片改用合成資料
+"""
+import email.parser
+import hashlib
+import json
+import math
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from datetime import datetime
+from urllib.parse import parse_qs, urlsplit
+
+QUOTA_ERROR = {
+    "error": {
+        "code": 403,
+        "message": "The request cannot be completed because you have exceeded your quota.",
+        "errors": [{"message": "quota", "domain": "youtube.quota", "reason": "quotaExceeded"}],
+    }
+}
+
+BACKEND_ERROR = {
+    "error": {
+        "code": 503,
+        "message": "The service is currently unavailable.",
+        "errors": [{"message": "backend", "domain": "global", "reason": "backendError"}],
+    }
+}
+
+# Units charged per call, as in config.key_manager.QUOTA_COSTS
+ENDPOINT_COSTS = {"search": 100, "videos": 1, "channels": 1}
+
+# Synthetic videos belong to this many channels
+FAKE_CHANNELS = 997
+
+# Synthetic publish times count back from here, so every fetch of a video agrees
+_STARTED_AT = time.time()
+
+
+def _digest(text: str) -> int:
+    return int(hashlib.md5(text.encode("utf-8")).hexdigest(), 16)
+
+
+_FIELD_NAME = re.compile(r"[\w*]+(?:/[\w*]+)*")
+
+
+def parse_fields(mask: str) -> dict:
+    """
+    解析 partial response 的 fields 參數為巢狀 dict (空 dict 表示整個欄位)
+    'items(id,snippet/title),nextPageToken' -> {'items': {'id': {}, 'snippet': {'title': {}}}, 'nextPageToken': {}}
+    """
+    tree = {}
+
+    def parse(pos: int, node: dict) -> int:
+        while pos < len(mask):
+            match = _FIELD_NAME.match(mask, pos)
+            if match is None:
+                raise ValueError(f"Invalid fields mask at {pos}: {mask!r}")
+            target = node
+            for name in match.group(0).split("/"):
+                target = target.setdefault(name, {})
+            pos = match.end()
+            if pos < len(mask) and mask[pos] == "(":
+                pos = parse(pos + 1, target) + 1
+            if pos < len(mask) and mask[pos] == ")":
+                return pos
+            if pos < len(mask) and mask[pos] == ",":
+                pos += 1
+        return pos
+
+    parse(0, tree)
+    return tree
+
+
+def apply_fields(value, tree: dict):
+    """只保留 tree 中的欄位 (list 逐項套用)"""
+    if not tree:
+        return value
+    if isinstance(value, list):
+        return [apply_fields(v, tree) for v in value]
+    if isinstance(value, dict):
+        if "*" in tree:
+            return {k: apply_fields(v, tree["*"]) for k, v in value.items()}
+        return {k: apply_fields(value[k], sub) for k, sub in tree.items() if k in value}
+    return value
+
+
+class FakeYouTubeServer:
+    def __init__(self, latency: float = 0.05, pages: int = 5, exhausted_keys=(), host: str = "127.0.0.1",
+                 key_budgets: dict | None = None, error_rate: float = 0.0, payload_padding: int = 0,
+                 fixtures: dict | None = None, seed: int = 0, results_per_day: float = 0,
+                 view_decay: float = 1.0, error_every: int = 0):
+        """
+        :param latency: 每次 HTTP 往返的延遲秒數 (批次請求只計一次)
+        :param pages: 每個關鍵字可翻的頁數
+        :param exhausted_keys: 一律回傳 quotaExceeded 的 API Key
+        :param key_budgets: {api_key: 額度單位}，用完後該 Key 回傳 quotaExceeded (模擬用到一半耗盡)
+        :param error_rate: 隨機回傳 503 backendError 的比例 (以 seed 決定，可重現)
+        :param error_every: 每第 N 個 API 呼叫回傳 503 backendError (不論請求數多少都一定會發生)；0 表示不使用
+        :param payload_padding: 每部影片額外的說明文字長度，用於模擬較大的回應
+        :param fixtures: 錄製的回應 (見 load_fixtures)
+        :param results_per_day: 有 publishedBefore 的查詢，每天有多少部符合的影片 (決定 totalResults 與可翻頁數)；
+                                0 表示每個查詢都有 pages 頁
+        :param view_decay: 搜尋結果每往後一頁，觀看數乘上的比例 (模擬依相關性排序，後面的頁面較少影片通過篩選)
+        """
+        self.latency = latency
+        self.pages = pages
+        self.exhausted_keys = set(exhausted_keys)
+        self.key_budgets = dict(key_budgets or {})
+        self.error_rate = error_rate
+        self.error_every = error_every
+        self._dispatched = 0
+        self.payload_padding = payload_padding
+        self.fixtures = fixtures or {"search": {}, "videos": {}}
+        self.results_per_day = results_per_day
+        self.view_decay = view_decay
+        self._result_page = {}  # video_id -> search page it was served on
+        self._rng = random.Random(seed)
+        self.http_requests = 0
+        self.api_calls = dict.fromkeys(ENDPOINT_COSTS, 0)
+        self.errors = {"quota": 0, "backend": 0}
+        self.key_units = {}  # api_key -> units charged so far
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, 0), self._make_handler())
+        self._httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def root_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def reset_counters(self):
+        with self._lock:
+            self.http_requests = 0
+            self.api_calls = dict.fromkeys(ENDPOINT_COSTS, 0)
+            self.errors = {"quota": 0, "backend": 0}
+            self.key_units = {}
+
+    @staticmethod
+    def load_fixtures(path) -> dict:
+        """讀取錄製的回應檔 (JSON)"""
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        return {"search": data.get("search", {}), "videos": data.get("videos", {})}
+
+    # --- Fixtures ---
+    def search_page(self, query: dict) -> dict:
+        q = query.get("q", [""])[0]
+        token = query.get("pageToken", [""])[0]
+        recorded = self.fixtures["search"].get(f"{q}|{token}")
+        if recorded is not None:
+            return recorded
+        page = int(token or 0)
+        total = 1_000_000
+        seed = q
+        before = query.get("publishedBefore", [""])[0]
+        if before:
+            # Each time window holds its own videos
+            after = query.get("publishedAfter", [""])[0]
+            seed = f"{q}|{after}|{before}"
+            if self.results_per_day:
+                hours = (self._parse_time(before) - self._parse_time(after)).total_seconds() / 3600
+                total = max(0, int(hours / 24 * self.results_per_day))
+        pages = min(self.pages, math.ceil(total / 50))
+        count = min(50, max(0, total - page * 50)) if page < pages else 0
+        items = [
+            {"kind": "youtube#searchResult", "etag": self._etag(f"{seed}|{page}|{i}"),
+             "id": {"kind": "youtube#video", "videoId": self.video_id(seed, page, i)}}
+            for i in range(count)
+        ]
+        if self.view_decay != 1.0:
+            with self._lock:
+                self._result_page.update((item["id"]["videoId"], page) for item in items)
+        response = {"kind": "youtube#searchListResponse", "etag": self._etag(f"{seed}|{page}"),
+                    "regionCode": "TW", "items": items, "pageInfo": {"totalResults": total, "resultsPerPage": 50}}
+        if page + 1 < pages:
+            response["nextPageToken"] = str(page + 1)
+        return response
+
+    @staticmethod
+    def _parse_time(value: str) -> datetime:
+        return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+    @staticmethod
+    def video_id(q: str, page: int, index: int) -> str:
+        return hashlib.sha1(f"{q}|{page}|{index}".encode("utf-8")).hexdigest()[:11]
+
+    @staticmethod
+    def _etag(text: str) -> str:
+        return hashlib.sha1(text.encode("utf-8")).hexdigest()[:27]
+
+    @staticmethod
+    def video_item(video_id: str) -> dict:
+        """合成的 videos().list 項目，欄位與真實回應相同 (縮圖各尺寸、標籤、localized 等)"""
+        seed = _digest(video_id)
+        published = time.gmtime(_STARTED_AT - (seed % 60 + 1) * 86400)
+        title = f"Fake short {video_id}"
+        thumbnails = {
+            name: {"url": f"https://i.ytimg.com/vi/{video_id}/{file}.jpg", "width": width, "height": height}
+            for name, file, width, height in (
+                ("default", "default", 120, 90), ("medium", "mqdefault", 320, 180), ("high", "hqdefault", 480, 360),
+                ("standard", "sddefault", 640, 480), ("maxres", "maxresdefault", 1280, 720),
+            )
+        }
+        views = seed % 20_000_000
+        channel = seed % FAKE_CHANNELS
+        return {
+            "kind": "youtube#video",
+            "etag": FakeYouTubeServer._etag(video_id),
+            "id": video_id,
+            "snippet": {
+                "publishedAt": time.strftime("%Y-%m-%dT%H:%M:%SZ", published),
+                "channelId": FakeYouTubeServer.channel_id(channel),
+                "title": title,
+                "description": "",
+                "thumbnails": thumbnails,
+                "channelTitle": f"Channel {channel}",
+                "tags": ["shorts", "fake", f"tag{seed % 13}"],
+                "categoryId": str(seed % 30),
+                "liveBroadcastContent": "none",
+                "defaultAudioLanguage": "zh-TW",
+                "localized": {"title": title, "description": ""},
+            },
+            "contentDetails": {
+                "duration": f"PT{seed % 70 + 5}S", "dimension": "2d", "definition": "hd", "caption": "false",
+                "licensedContent": True, "contentRating": {}, "projection": "rectangular",
+            },
+            "statistics": {
+                "viewCount": str(views), "likeCount": str(views // 40), "favoriteCount": "0",
+                "commentCount": str(views // 900),
+            },
+        }
+
+    @staticmethod
+    def channel_id(index: int) -> str:
+        return f"UCfake{index:018d}"
+
+    @staticmethod
+    def channel_item(channel_id: str) -> dict:
+        """合成的 channels().list 項目 (約 5% 的頻道隱藏訂閱數)"""
+        seed = _digest(channel_id)
+        hidden = seed % 20 == 0
+        # Log-uniform between 100 and 10M subscribers, like real channel sizes
+        subscribers = int(10 ** (2 + (seed % 10_000) / 2_000))
+        statistics = {
+            "viewCount": str(subscribers * (seed % 300 + 20)),
+            "hiddenSubscriberCount": hidden,
+            "videoCount": str(seed % 2_000 + 1),
+        }
+        if not hidden:
+            statistics["subscriberCount"] = str(subscribers)
+        return {
+            "kind": "youtube#channel",
+            "etag": FakeYouTubeServer._etag(channel_id),
+            "id": channel_id,
+            "snippet": {"title": f"Channel {channel_id}", "description": "", "customUrl": f"@{channel_id.lower()}"},
+            "statistics": statistics,
+        }
+
+    def channels_list(self, query: dict) -> dict:
+        ids = [v for v in query.get("id", [""])[0].split(",") if v]
+        parts = set(query.get("part", ["snippet"])[0].split(","))
+        items = [
+            {k: v for k, v in self.channel_item(channel_id).items() if k in ("kind", "etag", "id") or k in parts}
+            for channel_id in ids
+        ]
+        return {"kind": "youtube#channelListResponse", "etag": self._etag(",".join(ids)), "items": items,
+                "pageInfo": {"totalResults": len(items), "resultsPerPage": len(items)}}
+
+    def videos_list(self, query: dict) -> dict:
+        ids = [v for v in query.get("id", [""])[0].split(",") if v]
+        parts = set(query.get("part", ["snippet,contentDetails,statistics"])[0].split(","))
+        items = []
+        for video_id in ids:
+            item = self.fixtures["videos"].get(video_id) or self.video_item(video_id)
+            depth = self._result_page.get(video_id, 0)
+            if depth and "statistics" in item:
+                views = int(int(item["statistics"]["viewCount"]) * self.view_decay ** depth)
+                item = dict(item, statistics=dict(item["statistics"], viewCount=str(views)))
+            if self.payload_padding and "snippet" in item:
+                padding = "x" * self.payload_padding
+                item = dict(item, snippet=dict(item["snippet"], description=padding,
+                                               localized=dict(item["snippet"].get("localized", {}), description=padding)))
+            # Like the real API, only the requested parts come back
+            items.append({k: v for k, v in item.items() if k in ("kind", "etag", "id") or k in parts})
+        return {"kind": "youtube#videoListResponse", "etag": self._etag(",".join(ids)), "items": items,
+                "pageInfo": {"totalResults": len(items), "resultsPerPage": len(items)}}
+
+    def _check_quota(self, key: str, endpoint: str) -> bool:
+        """扣除 Key 的額度，額度不足時回傳 False"""
+        with self._lock:
+            if key in self.exhausted_keys:
+                self.errors["quota"] += 1
+                return False
+            if key in self.key_budgets:
+                used = self.key_units.get(key, 0) + ENDPOINT_COSTS[endpoint]
+                if used > self.key_budgets[key]:
+                    self.errors["quota"] += 1
+                    return False
+            self.key_units[key] = self.key_units.get(key, 0) + ENDPOINT_COSTS[endpoint]
+            self.api_calls[endpoint] += 1
+            return True
+
+    def dispatch(self, path: str, query: dict) -> tuple[int, dict]:
+        """處理單一 API 呼叫，回傳 (HTTP 狀態碼, JSON 內容)"""
+        endpoint = path.rstrip("/").rsplit("/", 1)[-1]
+        if endpoint not in ENDPOINT_COSTS:
+            return 404, {"error": {"code": 404, "message": f"Unknown path {path}"}}
+        if self.error_rate or self.error_every:
+            with self._lock:
+                self._dispatched += 1
+                failed = (bool(self.error_every) and self._dispatched % self.error_every == 0
+                          or bool(self.error_rate) and self._rng.random() < self.error_rate)
+                if failed:
+                    self.errors["backend"] += 1
+            if failed:
+                return 503, BACKEND_ERROR
+        if not self._check_quota(query.get("key", [""])[0], endpoint):
+            return 403, QUOTA_ERROR
+        handlers = {"search": self.search_page, "videos": self.videos_list, "channels": self.channels_list}
+        response = handlers[endpoint](query)
+        fields = query.get("fields", [""])[0]
+        if fields:
+            # Partial response, as the real API does for the fields parameter
+            try:
+                response = apply_fields(response, parse_fields(fields))
+            except ValueError as e:
+                return 400, {"error": {"code": 400, "message": str(e)}}
+        return 200, response
+
+    # --- HTTP ---
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def _send(self, status: int, body: bytes, content_type: str):
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _round_trip(self):
+                with server._lock:
+                    server.http_requests += 1
+                if server.latency:
+                    time.sleep(server.latency)
+
+            def do_GET(self):
+                self._round_trip()
+                parts = urlsplit(self.path)
+                status, payload = server.dispatch(parts.path, parse_qs(parts.query))
+                self._send(status, json.dumps(payload).encode("utf-8"), "application/json; charset=UTF-8")
+
+            def do_POST(self):
+                self._round_trip()
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                header = f"Content-Type: {self.headers['Content-Type']}\r\n\r\n".encode("utf-8")
+                message = email.parser.BytesParser().parsebytes(header + body)
+
+                boundary = "fake_batch_boundary"
+                out = []
+                for part in message.get_payload():
+                    request_line = part.get_payload().split("\r\n", 1)[0]
+                    target = urlsplit(request_line.split(" ")[1])
+                    status, payload = server.dispatch(target.path, parse_qs(target.query))
+                    content_id = part["Content-ID"]
+                    out.append(
+                        f"--{boundary}\r\n"
+                        "Content-Type: application/http\r\n"
+                        f"Content-ID: <response-{content_id[1:]}\r\n\r\n"
+                        f"HTTP/1.1 {status} {'OK' if status == 200 else 'Error'}\r\n"
+                        "Content-Type: application/json; charset=UTF-8\r\n\r\n"
+                        f"{json.dumps(payload)}\r\n"
+                    )
+                out.append(f"--{boundary}--\r\n")
+                self._send(200, "".join(out).encode("utf-8"), f"multipart/mixed; boundary={boundary}")
+
+        return Handler
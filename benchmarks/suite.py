@@ -0,0 +1,557 @@
+"""
+離線效能測試套件：以本機模擬 API 執行，結果寫成可互相比較的 JSON 報告
+    python -m benchmarks.suite [-o report.json] [--compare baseline.json] [--quick] [--fixtures recorded.json]
+
+項目：
+    end_to_end      fetch_and_filter / fetch_many 的端到端吞吐量 (逐一與批次請求)
+    data_processor  DataProcessor 每部影片的處理成本 (逐筆與批次)
+    key_rotation    部分 Key 用到一半耗盡、或伺服器每 4 個呼叫回傳一次 503 時的結果 (與無錯誤時比較遺失的影片數)
+    adaptive_depth  固定搜尋深度與自動調整深度 (首次與有歷史紀錄時) 每單位額度、每秒取得的通過影片數
+    shared_cache    多個 session 同時搜尋相同條件時，有無共用結果快取的 API 呼叫數、額度與等待時間
+    incremental     一天後重新執行相同搜尋：完整搜尋與增量更新 (只搜尋新影片、舊影片只更新 statistics) 的額度與耗時
+    sharding        長時間範圍分段搜尋與單一查詢取得的不同影片數與額度
+    channels        搜尋後補充頻道訂閱數的 API 呼叫數與額度 (首次與快取命中時，相對於每張卡片查詢一次)
+    corpus          搜尋後只改變篩選條件：在本地候選影片中重新過濾與重新搜尋的耗時、額度與結果是否一致
+    projection      回應欄位範圍 (完整回應、卡片欄位、兩階段) 的回應大小、額度與結果是否一致
+    dedup           重複上傳偵測 (MinHash / LSH) 隨結果數的耗時與準確度，與兩兩比較標題對照 (見 benchmarks/bench_dedup.py)
+    export          逐段匯出與一次在記憶體中建立整個檔案的耗時與記憶體峰值 (見 benchmarks/bench_export.py)
+    memory          每 1,000 筆結果的記憶體用量 (完整回應與 VideoRecord)
+    import_time     網頁版的啟動匯入時間 (見 benchmarks/bench_import_time.py)
+"""
+import argparse
+import copy
+import json
+import logging
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from config.key_manager import KeyManager
+from core.api_client import YouTubeAPIClient
+from core.cache import ResponseCache
+from core.corpus import CandidateCorpus
+from core.data_processor import DataProcessor
+from core.delta_store import DeltaStore
+from core.metrics import Metrics
+from core.models import VideoRecord
+from core.result_cache import SharedResultCache
+from core.yield_history import YieldHistory
+from benchmarks.bench_data_processor import make_items, scalar_process
+from benchmarks.bench_dedup import run as run_dedup
+from benchmarks.bench_export import run as run_export
+from benchmarks.bench_import_time import profile as profile_imports
+from benchmarks.bench_memory import make_api_item, measure
+from benchmarks.fake_youtube import FakeYouTubeServer
+
+REPORT_VERSION = 1
+
+
+def fake_key(i: int) -> str:
+    return f"FAKE-KEY-{i:02d}-" + "x" * 26
+
+
+def make_client(server: FakeYouTubeServer, keys: list[str], transport: str, max_workers: int) -> YouTubeAPIClient:
+    key_manager = KeyManager(file_path=None, usage_path=None, metrics=Metrics())
+    key_manager.set_keys(keys)
+    client = YouTubeAPIClient(key_manager, max_workers=max_workers, transport=transport, root_url=server.root_url)
+    client.service  # build the service outside the timed region
+    return client
+
+
+def median_run(repeat: int, run, setup=None) -> tuple[float, dict]:
+    """
+    執行 repeat 次，回傳耗時中位數與最後一次的結果
+    :param setup: 每次執行前呼叫 (不計時)，回傳值作為 run 的參數
+    """
+    timings = []
+    result = None
+    for _ in range(repeat):
+        args = () if setup is None else (setup(),)
+        start = time.perf_counter()
+        result = run(*args)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings), result
+
+
+def bench_end_to_end(args, fixtures) -> dict:
+    server = FakeYouTubeServer(latency=args.latency, pages=args.pages, payload_padding=args.padding,
+                               fixtures=fixtures).start()
+    keywords = [f"kw{i}" for i in range(args.keywords)]
+    settings = {"days": 30, "max_pages": args.pages, "limit": 10_000, "min_views": 100_000, "max_duration": 60}
+    results = {}
+    try:
+        for transport, workers in (("direct", 1), ("direct", args.workers), ("batch", args.workers)):
+            client = make_client(server, [fake_key(0)], transport, workers)
+
+            def per_keyword():
+                return sum(len(client.fetch_and_filter(kw, settings)) for kw in keywords)
+
+            def many():
+                return len(client.fetch_many(keywords, settings))
+
+            for name, run in (("fetch_and_filter", per_keyword), ("fetch_many", many)):
+                server.reset_counters()
+                client.metrics.reset()
+                seconds, found = median_run(args.repeat, run)
+                checked = client.metrics.total("items_checked") / args.repeat
+                results[f"{name}.{transport}_x{workers}"] = {
+                    "seconds": round(seconds, 4),
+                    "results": found,
+                    "videos_checked_per_sec": round(checked / seconds, 1),
+                    "http_round_trips": server.http_requests // args.repeat,
+                    "quota_units": client.metrics.total("keyword_quota_units") / args.repeat,
+                    "response_kib": round(client.metrics.total("response_bytes") / args.repeat / 1024, 1),
+                }
+    finally:
+        server.stop()
+    return results
+
+
+def bench_data_processor(args) -> dict:
+    logging.disable(logging.ERROR)  # scalar path logs every unparsable date
+    try:
+        items = make_items(args.items)
+
+        def fresh():
+            # Both paths write into the items, so every run gets a copy made before the timer starts
+            return copy.deepcopy(items)
+        DataProcessor.process_batch(fresh(), 100_000, 60)  # numpy / pandas imports stay out of the timing
+        scalar_seconds, _ = median_run(args.repeat, lambda batch: scalar_process(batch, 100_000, 60), fresh)
+        batch_seconds, _ = median_run(args.repeat, lambda batch: DataProcessor.process_batch(batch, 100_000, 60), fresh)
+    finally:
+        logging.disable(logging.NOTSET)
+    return {
+        "process_batch": {"items": args.items, "us_per_item": round(batch_seconds / args.items * 1e6, 3)},
+        "scalar": {"items": args.items, "us_per_item": round(scalar_seconds / args.items * 1e6, 3)},
+    }
+
+
+def bench_key_rotation(args, fixtures) -> dict:
+    keywords = [f"kw{i}" for i in range(args.keywords)]
+    settings = {"days": 30, "max_pages": args.pages, "limit": 10_000, "min_views": 0, "max_duration": 60}
+    keys = [fake_key(i) for i in range(4)]
+    # The first three keys run dry after one search page each; the last one never does
+    budgets = {key: 150 for key in keys[:3]}
+    # Every 4th API call fails with a 503, so even a --quick run exercises the retries
+    cases = (("baseline", {}, 0), ("failing", budgets, 0), ("flaky", {}, 4))
+    results = {}
+    for transport in ("direct", "batch"):
+        for label, server_budgets, error_every in cases:
+            server = FakeYouTubeServer(latency=args.latency, pages=args.pages, key_budgets=server_budgets,
+                                       error_every=error_every, fixtures=fixtures).start()
+            try:
+                client = make_client(server, keys, transport, args.workers)
+                start = time.perf_counter()
+                found = len(client.fetch_many(keywords, settings))
+                seconds = time.perf_counter() - start
+                results[f"{transport}.{label}"] = {
+                    "seconds": round(seconds, 4),
+                    "results": found,
+                    "quota_errors": server.errors["quota"],
+                    "backend_errors": server.errors["backend"],
+                    "rotations": client.metrics.total("key_rotations"),
+                    "retries": client.metrics.total("retries"),
+                }
+            finally:
+                server.stop()
+        for label, _, _ in cases[1:]:
+            case = results[f"{transport}.{label}"]
+            case["lost_results"] = results[f"{transport}.baseline"]["results"] - case["results"]
+        flaky = results[f"{transport}.flaky"]
+        if not flaky["backend_errors"] or not flaky["retries"]:
+            raise AssertionError(f"{transport}.flaky: injected 503s were not retried ({flaky})")
+    return results
+
+
+def bench_adaptive_depth(args) -> dict:
+    # Later pages are less relevant, so fewer of their videos clear min_views
+    pages = 12
+    server = FakeYouTubeServer(latency=args.latency, pages=pages, view_decay=0.4).start()
+    keywords = [f"kw{i}" for i in range(args.keywords)]
+    settings = {"days": 30, "max_pages": pages, "limit": 10_000, "min_views": 100_000, "max_duration": 60}
+    history = YieldHistory(path=None)
+    results = {}
+    try:
+        for label, adaptive in (("fixed", False), ("adaptive_cold", True), ("adaptive_warm", True)):
+            client = make_client(server, [fake_key(0)], "direct", args.workers)
+            client.yield_history = history
+            server.reset_counters()
+            start = time.perf_counter()
+            found = len(client.fetch_many(keywords, dict(settings, adaptive=adaptive)))
+            seconds = time.perf_counter() - start
+            units = client.metrics.total("keyword_quota_units")
+            results[label] = {
+                "seconds": round(seconds, 4),
+                "results": found,
+                "search_pages": server.api_calls["search"],
+                "quota_units": units,
+                "results_per_100_units": round(found / units * 100, 2),
+                "results_per_sec": round(found / seconds, 1),
+            }
+    finally:
+        server.stop()
+    return results
+
+
+def bench_shared_cache(args) -> dict:
+    sessions = 8
+    server = FakeYouTubeServer(latency=args.latency, pages=args.pages).start()
+    keywords = [f"kw{i}" for i in range(args.keywords)]
+    settings = {"days": 30, "max_pages": args.pages, "limit": 10_000, "min_views": 100_000, "max_duration": 60}
+    results = {}
+    try:
+        for label, shared in (("per_session", None), ("shared", SharedResultCache())):
+            # Every session builds its own key manager and client, like a Streamlit rerun does
+            clients = [make_client(server, [fake_key(i)], "direct", args.workers) for i in range(sessions)]
+            for client in clients:
+                client.results_cache = shared
+            server.reset_counters()
+            barrier = threading.Barrier(sessions)
+
+            def session(client):
+                barrier.wait()
+                start = time.perf_counter()
+                found = len(client.fetch_many(keywords, settings))
+                return found, time.perf_counter() - start
+
+            with ThreadPoolExecutor(max_workers=sessions) as pool:
+                runs = list(pool.map(session, clients))
+            results[label] = {
+                "sessions": sessions,
+                "results_per_session": runs[0][0],
+                "api_calls": sum(server.api_calls.values()),
+                "quota_units": sum(server.key_units.values()),
+                "median_latency": round(statistics.median(seconds for _, seconds in runs), 4),
+            }
+    finally:
+        server.stop()
+    return results
+
+
+def bench_incremental(args) -> dict:
+    # About 100 uploads a day match each keyword, so a day's slice is a page or three
+    server = FakeYouTubeServer(latency=args.latency, pages=args.pages, results_per_day=100).start()
+    keywords = [f"kw{i}" for i in range(args.keywords)]
+    # Fake videos are up to 60 days old; a wider window keeps every known video in range
+    settings = {"days": 90, "max_pages": args.pages, "limit": 10_000, "min_views": 100_000, "max_duration": 60}
+    store = DeltaStore(path=None)
+    keys = [DeltaStore.make_key(kw, settings["days"]) for kw in keywords]
+    initial_state = {}
+    results = {}
+    try:
+        cases = (("initial", True, 0), ("full_rerun", False, 0),
+                 ("incremental_6h", True, 6), ("incremental_24h", True, 24))
+        for label, incremental, hours_later in cases:
+            if hours_later:
+                # Pretend the initial run happened hours_later ago
+                for key in keys:
+                    searched_at, items = initial_state[key]
+                    store.save(key, searched_at - hours_later * 3600, items)
+            client = make_client(server, [fake_key(0)], "direct", args.workers)
+            client.delta_store = store
+            server.reset_counters()
+            start = time.perf_counter()
+            found = len(client.fetch_many(keywords, dict(settings, incremental=incremental)))
+            seconds = time.perf_counter() - start
+            results[label] = {
+                "seconds": round(seconds, 4),
+                "results": found,
+                "search_pages": server.api_calls["search"],
+                "videos_calls": server.api_calls["videos"],
+                "quota_units": client.metrics.total("keyword_quota_units"),
+                "new_videos": client.metrics.total("delta_new_videos"),
+            }
+            if label == "initial":
+                initial_state = {key: store.load(key) for key in keys}
+    finally:
+        server.stop()
+        store.close()
+    return results
+
+
+def bench_sharding(args) -> dict:
+    # A year of uploads is far more than one query can page through
+    server = FakeYouTubeServer(latency=args.latency, pages=args.pages, results_per_day=args.results_per_day).start()
+    keywords = [f"kw{i}" for i in range(args.keywords)]
+    results = {}
+    try:
+        for shards in (1, 4, 16):
+            client = make_client(server, [fake_key(0)], "direct", args.workers)
+            server.reset_counters()
+            start = time.perf_counter()
+            found = sum(len(client.search_shorts(kw, 365, args.pages, shards)) for kw in keywords)
+            seconds = time.perf_counter() - start
+            results[f"shards_{shards}"] = {
+                "seconds": round(seconds, 4),
+                "candidates": found,
+                "windows": client.metrics.total("search_windows") or len(keywords),
+                "splits": client.metrics.total("window_splits"),
+                "quota_units": client.metrics.total("keyword_quota_units"),
+            }
+            # Every split window already paid for its first page on top of the leaf windows' pages
+            bound = shards * args.pages + (shards - max(1, shards // 4))
+            pages = client.metrics.by_label("api_calls", "keyword")
+            if max(pages.values(), default=0) > bound:
+                raise AssertionError(f"shards={shards}: {max(pages.values())} search pages for one keyword, "
+                                     f"more than the stated bound of {bound}")
+            results[f"shards_{shards}"]["max_pages_per_keyword"] = max(pages.values(), default=0)
+        for case in results.values():
+            case["candidates_per_100_units"] = round(case["candidates"] / case["quota_units"] * 100, 1)
+    finally:
+        server.stop()
+    return results
+
+
+def bench_projection(args) -> dict:
+    server = FakeYouTubeServer(latency=args.latency, pages=args.pages, payload_padding=args.padding).start()
+    keywords = [f"kw{i}" for i in range(args.keywords)]
+    settings = {"days": 30, "max_pages": args.pages, "limit": 10_000, "min_views": 100_000, "max_duration": 60}
+    results = {}
+    baseline = None
+    try:
+        # "export" is the unmasked response, i.e. what every call downloaded before projections
+        for projection in ("export", "card", "two-phase"):
+            client = make_client(server, [fake_key(0)], "direct", args.workers)
+            client.projection = projection
+            server.reset_counters()
+            start = time.perf_counter()
+            records = sorted((v.to_dict() for v in client.fetch_many(keywords, settings)), key=lambda r: r["id"])
+            seconds = time.perf_counter() - start
+            if baseline is None:
+                baseline = records
+            results[projection] = {
+                "seconds": round(seconds, 4),
+                "results": len(records),
+                "same_results": records == baseline,
+                "search_kib": round(client.metrics.total("response_bytes", method="youtube.search.list") / 1024, 1),
+                "videos_kib": round(client.metrics.total("response_bytes", method="youtube.videos.list") / 1024, 1),
+                "response_kib": round(client.metrics.total("response_bytes") / 1024, 1),
+                "videos_calls": server.api_calls["videos"],
+                "quota_units": client.metrics.total("keyword_quota_units"),
+            }
+    finally:
+        server.stop()
+    return results
+
+
+def bench_corpus(args) -> dict:
+    server = FakeYouTubeServer(latency=args.latency, pages=args.pages, payload_padding=args.padding).start()
+    keywords = [f"kw{i}" for i in range(args.keywords)]
+    settings = {"keywords": keywords, "days": 30, "max_pages": args.pages, "limit": 50,
+                "min_views": 100_000, "max_duration": 60}
+    variants = {
+        "min_views_50k": {"min_views": 50_000},
+        "min_views_1m": {"min_views": 1_000_000},
+        "max_duration_30": {"max_duration": 30},
+        "limit_10": {"limit": 10},
+        "limit_200": {"limit": 200},
+    }
+    results = {}
+    try:
+        client = make_client(server, [fake_key(0)], "direct", args.workers)
+        client.corpus = CandidateCorpus(settings)
+        client.fetch_many(keywords, settings)
+        corpus = client.corpus
+        for label, change in variants.items():
+            variant = dict(settings, **change)
+            start = time.perf_counter()
+            local = corpus.query(variant)
+            refilter_seconds = time.perf_counter() - start
+
+            fresh_client = make_client(server, [fake_key(0)], "direct", args.workers)
+            server.reset_counters()
+            start = time.perf_counter()
+            fresh = fresh_client.fetch_many(keywords, variant)
+            fetch_seconds = time.perf_counter() - start
+            results[label] = {
+                "candidates": len(corpus),
+                "refilter_ms": round(refilter_seconds * 1000, 2),
+                "fetch_seconds": round(fetch_seconds, 4),
+                "fetch_quota_units": fresh_client.metrics.total("keyword_quota_units"),
+                "results": len(fresh),
+                "same_results": [v.to_dict() for v in local] == [v.to_dict() for v in fresh],
+            }
+
+        # Streaming stops at the limit, so looser filters can only be answered while the limit still fills up
+        client = make_client(server, [fake_key(0)], "direct", args.workers)
+        client.corpus = CandidateCorpus(settings)
+        list(client.iter_fetch_many(keywords, settings))
+        results["stream"] = {
+            "candidates": len(client.corpus),
+            "answered_locally": sum(client.corpus.query(dict(settings, **change)) is not None
+                                    for change in variants.values()),
+            "variants": len(variants),
+        }
+    finally:
+        server.stop()
+    return results
+
+
+def bench_channels(args) -> dict:
+    server = FakeYouTubeServer(latency=args.latency, pages=args.pages).start()
+    keywords = [f"kw{i}" for i in range(args.keywords)]
+    settings = {"days": 30, "max_pages": args.pages, "limit": 10_000, "min_views": 100_000, "max_duration": 60}
+    cache = ResponseCache(path=None)
+    results = {}
+    try:
+        records = make_client(server, [fake_key(0)], "direct", args.workers).fetch_many(keywords, settings)
+        for label in ("cold_cache", "warm_cache"):
+            client = make_client(server, [fake_key(0)], "direct", args.workers)
+            client.cache = cache
+            server.reset_counters()
+            start = time.perf_counter()
+            channels = client.enrich_channels(records)
+            seconds = time.perf_counter() - start
+            results[label] = {
+                "seconds": round(seconds, 4),
+                "results": len(records),
+                "channels": channels,
+                "channels_calls": server.api_calls["channels"],
+                "quota_units": client.metrics.total("keyword_quota_units"),
+                "units_one_call_per_card": len(records),
+                "with_subscribers": sum(1 for v in records if v.subscriber_count is not None),
+            }
+    finally:
+        server.stop()
+        cache.close()
+    return results
+
+
+def bench_memory(args) -> dict:
+    count = args.memory_results
+    payload = json.dumps([make_api_item(i, random.Random(i)) for i in range(count)])
+    dict_bytes, _ = measure(lambda: json.loads(payload))
+    record_bytes, _ = measure(lambda: [VideoRecord.from_item(item) for item in json.loads(payload)])
+    return {
+        "raw_dicts": {"kib_per_1k": round(dict_bytes / count * 1000 / 1024, 1)},
+        "video_record": {"kib_per_1k": round(record_bytes / count * 1000 / 1024, 1)},
+    }
+
+
+def bench_dedup(args) -> dict:
+    return run_dedup(args.dedup_sizes)
+
+
+def bench_export(args) -> dict:
+    return run_export(args.export_rows)
+
+
+def bench_import_time(args) -> dict:
+    report = profile_imports("streamlit_app", repeat=max(args.repeat, 3))
+    return {
+        "streamlit_app": {
+            "total_ms": report["total_ms"],
+            "streamlit_ms": report["streamlit_ms"],
+            "app_ms": report["app_ms"],
+            "script_ms": report["script_ms"],
+            "deferred_loaded": len(report["deferred_loaded"]),
+        }
+    }
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              timeout=10).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        return ""
+
+
+def compare(old: dict, new: dict) -> list[str]:
+    """逐項列出兩份報告的數值差異"""
+    lines = []
+    for group, cases in new["benchmarks"].items():
+        for case, values in cases.items():
+            before = old.get("benchmarks", {}).get(group, {}).get(case, {})
+            for metric, value in values.items():
+                if metric not in before or not isinstance(value, (int, float)):
+                    continue
+                prev = before[metric]
+                change = f"{(value - prev) / prev * 100:+.1f}%" if prev else "n/a"
+                lines.append(f"{group}.{case}.{metric}: {prev} -> {value} ({change})")
+    return lines
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-o", "--output", default="benchmark_report.json")
+    parser.add_argument("--compare", help="與先前的報告比較")
+    parser.add_argument("--fixtures", help="錄製的 API 回應 (見 benchmarks/fake_youtube.py)")
+    parser.add_argument("--only", nargs="+",
+                        choices=["end_to_end", "data_processor", "key_rotation", "adaptive_depth", "shared_cache",
+                                 "incremental", "sharding", "corpus", "projection", "channels", "dedup", "export",
+                                 "memory", "import_time"])
+    parser.add_argument("--quick", action="store_true", help="縮小規模，適合快速檢查")
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--keywords", type=int, default=6)
+    parser.add_argument("--pages", type=int, default=4)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--padding", type=int, default=0, help="每部影片額外的說明文字長度")
+    parser.add_argument("--items", type=int, default=100_000, help="DataProcessor 測試的影片數")
+    parser.add_argument("--results-per-day", type=float, default=100, help="分段搜尋測試中每天上傳的影片數")
+    parser.add_argument("--memory-results", type=int, default=5_000)
+    parser.add_argument("--dedup-sizes", type=int, nargs="+", default=[1_000, 5_000, 20_000, 50_000])
+    parser.add_argument("--export-rows", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    if args.quick:
+        args.keywords, args.pages, args.items, args.memory_results, args.repeat = 3, 2, 10_000, 1_000, 1
+        args.export_rows, args.dedup_sizes = 10_000, [1_000, 5_000]
+    logging.basicConfig(level=logging.CRITICAL)
+    fixtures = FakeYouTubeServer.load_fixtures(args.fixtures) if args.fixtures else None
+
+    selected = args.only or ["end_to_end", "data_processor", "key_rotation", "adaptive_depth", "shared_cache",
+                             "incremental", "sharding", "corpus", "projection", "channels", "dedup", "export",
+                             "memory", "import_time"]
+    runners = {
+        "end_to_end": lambda: bench_end_to_end(args, fixtures),
+        "data_processor": lambda: bench_data_processor(args),
+        "key_rotation": lambda: bench_key_rotation(args, fixtures),
+        "adaptive_depth": lambda: bench_adaptive_depth(args),
+        "shared_cache": lambda: bench_shared_cache(args),
+        "incremental": lambda: bench_incremental(args),
+        "sharding": lambda: bench_sharding(args),
+        "corpus": lambda: bench_corpus(args),
+        "projection": lambda: bench_projection(args),
+        "channels": lambda: bench_channels(args),
+        "dedup": lambda: bench_dedup(args),
+        "export": lambda: bench_export(args),
+        "memory": lambda: bench_memory(args),
+        "import_time": lambda: bench_import_time(args),
+    }
+    benchmarks = {}
+    for name in selected:
+        print(f"running {name}...", file=sys.stderr)
+        benchmarks[name] = runners[name]()
+
+    report = {
+        "version": REPORT_VERSION,
+        "meta": {
+            "created_at": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "git": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "params": {k: v for k, v in vars(args).items() if k not in ("output", "compare")},
+        },
+        "benchmarks": benchmarks,
+    }
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+        f.write("\n")
+
+    for group, cases in benchmarks.items():
+        for case, values in cases.items():
+            print(f"{group}.{case}: " + ", ".join(f"{k}={v}" for k, v in values.items()))
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            print("\n".join(compare(json.load(f), report)))
+
+
+if __name__ == "__main__":
+    main()
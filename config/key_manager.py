@@ -1,12 +1,137 @@
+import hashlib
 import json
 import logging
-from config.settings import API_KEYS_FILE
+import os
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from config.settings import API_KEYS_FILE, KEY_USAGE_FILE, DAILY_QUOTA_UNITS, USAGE_SYNC_INTERVAL
+
+try:
+    from zoneinfo import ZoneInfo
+    PACIFIC_TZ = ZoneInfo("America/Los_Angeles")
+except Exception:
+    # Frozen builds without tzdata: PST is close enough for a daily reset
+    PACIFIC_TZ = timezone(timedelta(hours=-8))
+
+# Estimated quota cost per API method (YouTube Data API v3)
+QUOTA_COSTS = {
+    "youtube.search.list": 100,
+    "youtube.videos.list": 1,
+    "youtube.channels.list": 1,
+}
+
+
+def quota_day() -> str:
+    """YouTube 額度於太平洋時間午夜重置，回傳目前的額度日期"""
+    return datetime.now(PACIFIC_TZ).strftime("%Y-%m-%d")
+
+
+def atomic_write_json(path, data):
+    """先寫入暫存檔再取代，避免其他行程讀到寫到一半的檔案"""
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+class FileLock:
+    """
+    以 O_EXCL 鎖定檔實作的跨行程鎖 (Windows / Linux 通用)
+    等待超過 timeout 秒時引發 TimeoutError；超過 stale_after 秒的鎖定檔視為當機行程留下的，可以移除
+    """
+    def __init__(self, path, timeout: float = 5.0, stale_after: float = 30.0):
+        self.path = f"{path}.lock"
+        self.timeout = timeout
+        self.stale_after = stale_after
+        self._fd = None
+        self._token = None
+
+    def __enter__(self):
+        deadline = time.monotonic() + self.timeout
+        while True:
+            try:
+                self._fd = os.open(self.path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+                # Identifies this holder, so release never deletes a lock someone else took over
+                self._token = f"{os.getpid()}:{threading.get_ident()}:{time.time_ns()}".encode()
+                os.write(self._fd, self._token)
+                return self
+            except FileExistsError:
+                if self._break_stale():
+                    continue
+                if time.monotonic() > deadline:
+                    raise TimeoutError(f"Timed out waiting for {self.path}")
+                time.sleep(0.01)
+
+    def _is_stale(self, path) -> bool:
+        return time.time() - os.path.getmtime(path) > self.stale_after
+
+    def _break_stale(self) -> bool:
+        """
+        移除當機行程留下的鎖定檔，回傳是否應立即重試
+        先改名再確認：改名是原子操作，檢查與移除之間其他行程剛取得的鎖不會被刪掉
+        """
+        try:
+            if not self._is_stale(self.path):
+                return False
+        except OSError:
+            return True  # Released in the meantime
+        moved = f"{self.path}.{os.getpid()}.{threading.get_ident()}.stale"
+        try:
+            os.rename(self.path, moved)
+        except OSError:
+            return True  # Another process broke or released it first
+        try:
+            stale = self._is_stale(moved)
+            if stale:
+                logging.warning(f"Removed stale lock {self.path}")
+            else:
+                # Freshly taken by another process after our check: give it back and keep waiting
+                os.link(moved, self.path)
+        except OSError as e:
+            # A new lock appeared in the meantime; keep waiting for it
+            logging.warning(f"Failed to restore lock {self.path}: {e}")
+            stale = False
+        finally:
+            try:
+                os.remove(moved)
+            except OSError:
+                pass
+        return stale
+
+    def __exit__(self, *exc):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+            try:
+                with open(self.path, 'rb') as f:
+                    owned = f.read() == self._token
+                # Not ours any more when it was broken as stale and taken by another process
+                if owned:
+                    os.remove(self.path)
+            except OSError:
+                pass
+
 
 class KeyManager:
-    def __init__(self, file_path=API_KEYS_FILE):
+    def __init__(self, file_path=API_KEYS_FILE, usage_path=KEY_USAGE_FILE, daily_quota: int = DAILY_QUOTA_UNITS,
+                 metrics=None):
+        """
+        :param file_path: API Key 清單檔案，None 表示由 UI 設定
+        :param usage_path: 各 Key 額度使用量檔案 (多個行程共用)，None 表示僅記錄於記憶體
+        :param metrics: core.metrics.Metrics，記錄各 Key 額度與輪替次數 (可省略)
+        """
         self.file_path = file_path
+        self.usage_path = usage_path
+        self.daily_quota = daily_quota
         self.keys = []
         self.current_index = 0
+        self._lock = threading.RLock()
+        self._usage = {}     # key_id -> {"day", "units", "exhausted"}
+        self._pending = {}   # key_id -> units spent since the last sync
+        self._last_sync = 0.0
+        self.spent = 0       # Units spent by this process, all keys
+        self.metrics = metrics
         if self.file_path:
             self.load_keys()
 
@@ -16,17 +141,17 @@ class KeyManager:
             if self.file_path:
                 logging.warning(f"Key file not found: {self.file_path}")
             return
-        
+
         try:
             with open(self.file_path, 'r', encoding='utf-8') as f:
                 data = json.load(f)
                 self.keys = data.get("api_keys", [])
                 self.current_index = data.get("current_index", 0)
-                
+
                 # Ensure index is valid
                 if self.keys and self.current_index >= len(self.keys):
                     self.current_index = 0
-                    
+
         except Exception as e:
             logging.error(f"Failed to load API keys: {e}")
 
@@ -40,33 +165,166 @@ class KeyManager:
             "current_index": self.current_index
         }
         try:
-            with open(self.file_path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2)
+            with FileLock(self.file_path):
+                atomic_write_json(self.file_path, data)
         except Exception as e:
             logging.error(f"Failed to save API keys: {e}")
 
+    @staticmethod
+    def key_id(key: str) -> str:
+        """使用量檔案只記錄 Key 的雜湊值，不儲存明文"""
+        return hashlib.sha256(key.encode('utf-8')).hexdigest()[:16]
+
+    @staticmethod
+    def mask_key(key: str) -> str:
+        if len(key) <= 10:
+            return "*" * len(key)
+        return f"{key[:6]}...{key[-4:]}"
+
+    def _entry(self, key: str) -> dict:
+        """取得 Key 的當日使用紀錄 (需持有鎖)，跨過太平洋時間午夜即重置"""
+        kid = self.key_id(key)
+        today = quota_day()
+        entry = self._usage.get(kid)
+        if entry is None or entry["day"] != today:
+            entry = {"day": today, "units": 0, "exhausted": False}
+            self._usage[kid] = entry
+            self._pending.pop(kid, None)
+        return entry
+
+    def headroom(self, key: str) -> int:
+        """預估剩餘額度"""
+        with self._lock:
+            entry = self._entry(key)
+            return 0 if entry["exhausted"] else self.daily_quota - entry["units"]
+
     def get_current_key(self) -> str:
-        """取得當前的 API Key"""
-        if not self.keys:
-            return ""
-        return self.keys[self.current_index]
-
-    def rotate_key(self) -> str:
-        """切換到下一個 Key (Round-Robin)"""
-        if not self.keys:
-            return ""
-        
-        self.current_index = (self.current_index + 1) % len(self.keys)
-        self.save_keys()  # 記住最後使用的位置
-        logging.info(f"Rotated to API Key index: {self.current_index}")
-        return self.get_current_key()
+        """取得剩餘額度最多的 API Key (已用盡的 Key 在重置前不會被選用)"""
+        with self._lock:
+            if not self.keys:
+                return ""
+            self._sync()
+            best_index = None
+            best_room = None
+            for idx, key in enumerate(self.keys):
+                entry = self._entry(key)
+                if entry["exhausted"]:
+                    continue
+                room = self.daily_quota - entry["units"]
+                # Ties keep the current key so services are not rebuilt needlessly
+                if best_room is None or room > best_room or (room == best_room and idx == self.current_index):
+                    best_index, best_room = idx, room
+            if best_index is None:
+                return ""
+            self.current_index = best_index
+            return self.keys[best_index]
+
+    def spend(self, key: str, units: int):
+        """記錄一次 API 呼叫的預估額度"""
+        if not key or units <= 0:
+            return
+        with self._lock:
+            entry = self._entry(key)
+            entry["units"] += units
+            self.spent += units
+            kid = self.key_id(key)
+            self._pending[kid] = self._pending.get(kid, 0) + units
+            self._sync()
+        if self.metrics is not None:
+            self.metrics.incr("quota_units", units, key=self.mask_key(key))
+
+    def mark_exhausted(self, key: str):
+        """標記 Key 今日額度已用盡，直到太平洋時間午夜重置前不再使用"""
+        if not key:
+            return
+        with self._lock:
+            self._entry(key)["exhausted"] = True
+            self._sync(force=True)
+        if self.metrics is not None:
+            self.metrics.incr("keys_exhausted", key=self.mask_key(key))
+
+    def rotate_key(self, failed_key: str | None = None) -> str:
+        """將額度用盡的 Key 移出輪替，並切換到剩餘額度最多的 Key"""
+        with self._lock:
+            if not self.keys:
+                return ""
+            self.mark_exhausted(failed_key or self.keys[self.current_index])
+            new_key = self.get_current_key()
+        if self.metrics is not None:
+            self.metrics.incr("key_rotations")
+        logging.info(f"Rotated to API Key index: {self.current_index if new_key else 'none left'}")
+        return new_key
+
+    def flush(self):
+        """立即將使用量寫入檔案"""
+        with self._lock:
+            self._sync(force=True)
+
+    def _sync(self, force: bool = False):
+        """
+        與使用量檔案同步 (需持有鎖)
+        本行程的增量累加到檔案內容後再寫回，多個行程同時使用時計數不會互相覆蓋
+        """
+        if not self.usage_path:
+            return
+        if not force and time.monotonic() - self._last_sync < USAGE_SYNC_INTERVAL:
+            return
+        self._last_sync = time.monotonic()
+        sync_start = time.perf_counter()
+
+        today = quota_day()
+        try:
+            with FileLock(self.usage_path):
+                disk = {}
+                if os.path.exists(self.usage_path):
+                    try:
+                        with open(self.usage_path, 'r', encoding='utf-8') as f:
+                            disk = json.load(f)
+                    except ValueError:
+                        logging.warning(f"Corrupt usage file {self.usage_path}, starting over")
+                # Entries from previous quota days have been reset
+                disk = {kid: e for kid, e in disk.items() if e.get("day") == today}
+
+                for kid, entry in self._usage.items():
+                    if entry["day"] != today:
+                        continue
+                    merged = disk.setdefault(kid, {"day": today, "units": 0, "exhausted": False})
+                    merged["units"] += self._pending.get(kid, 0)
+                    merged["exhausted"] = merged["exhausted"] or entry["exhausted"]
+
+                atomic_write_json(self.usage_path, disk)
+            self._pending.clear()
+            for kid, entry in disk.items():
+                self._usage[kid] = dict(entry)
+        except TimeoutError as e:
+            # Nothing was read or written; the pending units are merged on the next sync
+            logging.warning(f"Key usage not synced: {e}")
+        except Exception as e:
+            logging.error(f"Failed to sync key usage: {e}")
+        if self.metrics is not None:
+            self.metrics.add_time("usage_sync", time.perf_counter() - sync_start)
+
+    def usage_report(self) -> list[dict]:
+        """各 Key 的使用量摘要 (Key 已遮罩)"""
+        with self._lock:
+            report = []
+            for key in self.keys:
+                entry = self._entry(key)
+                report.append({
+                    "key": self.mask_key(key),
+                    "units": entry["units"],
+                    "headroom": 0 if entry["exhausted"] else max(0, self.daily_quota - entry["units"]),
+                    "exhausted": entry["exhausted"],
+                })
+            return report
 
     def set_keys(self, new_keys: list[str]):
         """更新 Key 列表 (從 UI 設定)"""
         # Filter empty strings
         valid_keys = [k.strip() for k in new_keys if k.strip()]
-        self.keys = valid_keys
-        self.current_index = 0
+        with self._lock:
+            self.keys = valid_keys
+            self.current_index = 0
         self.save_keys()
 
     def validate_key(self, key: str) -> bool:
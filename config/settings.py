@@ -7,12 +7,23 @@ import sys
 if getattr(sys, 'frozen', False):
     # Running as compiled exe
     BASE_DIR = Path(sys.executable).parent
+    # Bundled data files are unpacked next to the frozen modules
+    ASSETS_DIR = Path(getattr(sys, '_MEIPASS', BASE_DIR)) / "assets"
 else:
     # Running from source
     BASE_DIR = Path(__file__).resolve().parent.parent
+    ASSETS_DIR = BASE_DIR / "assets"
 
 # Files
 API_KEYS_FILE = BASE_DIR / "api_keys.json"
+CACHE_FILE = BASE_DIR / "api_cache.db"
+KEY_USAGE_FILE = BASE_DIR / "key_usage.json"
+SNAPSHOT_FILE = BASE_DIR / "snapshots.db"
+YIELD_HISTORY_FILE = BASE_DIR / "yield_history.json"
+DELTA_FILE = BASE_DIR / "delta_state.db"
+CORPUS_FILE = BASE_DIR / "candidate_corpus.json"
+DISCOVERY_DOC_FILE = ASSETS_DIR / "youtube_v3_discovery.json"  # Trimmed, see core/service_pool.py
+STYLE_FILE = ASSETS_DIR / "style.css"
 
 # Defaults
 DEFAULT_KEYWORDS = ["CAT", "CUTE"]
@@ -21,11 +32,79 @@ DEFAULT_MAX_PAGES = 5
 DEFAULT_LIMIT_PER_KEYWORD = 50
 DEFAULT_MIN_VIEWS = 100000
 DEFAULT_MAX_DURATION = 60  # Seconds
+DEFAULT_MAX_WORKERS = 4  # Concurrent API requests
+DEFAULT_TRANSPORT = "direct"  # "direct" or "batch"
+DEFAULT_SHARDS = 1  # Max publishedAfter/publishedBefore windows per keyword, 1 = single query
+DEFAULT_PROJECTION = "card"  # Response fields profile, see core.api_client.PROJECTIONS
+
+# API Endpoint
+YOUTUBE_API_ROOT_URL = os.environ.get("YOUTUBE_API_ROOT_URL", "")  # Empty = Google production endpoint
+BATCH_MAX_REQUESTS = 50  # Sub-requests per BatchHttpRequest
+HTTP_POOL_MAX_IDLE = 32  # Idle keep-alive connections kept per API root, shared by all clients and threads
+RETRY_MAX_ATTEMPTS = 5  # Per request, for 5xx / rate-limit / network errors
+RETRY_BASE_DELAY = 0.5  # Seconds, doubled per attempt (full jitter)
+RETRY_MAX_DELAY = 16.0
+
+# Time-window Sharding
+SHARD_MIN_HOURS = 6  # Windows are never split below this span
+
+# Adaptive Search Depth
+ADAPTIVE_MIN_YIELD = 1.0  # Passing videos per 100 quota units below which paging stops
+YIELD_HISTORY_ALPHA = 0.5  # Weight of the latest run in the per-page yield average
+
+# Incremental Refresh
+DELTA_OVERLAP = 3600  # Seconds before the last search that are searched again (late-indexed uploads)
+DELTA_RETENTION_DAYS = 30  # Unused delta state is dropped after this
+
+# API Quota
+DAILY_QUOTA_UNITS = 10_000  # Default daily quota per key, resets at Pacific midnight
+USAGE_SYNC_INTERVAL = 2.0  # Seconds between key usage file writes
+
+# Response Cache
+SEARCH_CACHE_TTL = 6 * 3600  # Seconds, search result pages
+VIDEO_CACHE_TTL = 3600  # Seconds, video statistics
+CHANNEL_CACHE_TTL = 7 * 86400  # Seconds, channel statistics (subscriber counts move slowly)
+CACHE_MAX_BYTES = 50 * 1024 * 1024
+CACHE_EVICT_RATIO = 0.9  # Eviction frees space down to this share of CACHE_MAX_BYTES
+CACHE_TOUCH_INTERVAL = 30  # Seconds between writing back the access times of cache hits
+
+# Shared Result Cache (in memory, per process)
+RESULT_CACHE_TTL = 15 * 60  # Seconds, filtered results per keyword + settings
+RESULT_CACHE_MAX_BYTES = 64 * 1024 * 1024
+
+# Candidate Corpus (unfiltered details of the last search, re-filtered locally)
+CORPUS_MAX_AGE = VIDEO_CACHE_TTL  # Seconds; an older corpus is searched again instead of re-filtered
+
+# Duplicate Detection (re-uploads collapsed into one card, see core/dedup.py)
+DEDUP_NUM_PERM = 64  # MinHash signature length
+DEDUP_BANDS = 16  # LSH bands; DEDUP_NUM_PERM // DEDUP_BANDS rows each
+DEDUP_SHINGLE = 3  # Characters per title shingle
+DEDUP_MIN_TITLE_CHARS = 6  # Shorter normalized titles (e.g. only hashtags) are never matched
+DEDUP_SIMILARITY = 0.8  # Title similarity that marks a copy on its own (durations must still match)
+DEDUP_LOOSE_SIMILARITY = 0.5  # Lower similarity counts only when published close together too
+DEDUP_DURATION_GAP = 2  # Seconds
+DEDUP_PUBLISH_GAP = 7 * 86400  # Seconds
+DEDUP_BUCKET_WINDOW = 8  # Neighbours compared within an LSH bucket, so huge buckets stay linear
+
+# View Snapshots
+SNAPSHOT_MIN_GAP = 600  # Seconds between snapshots used for views-per-hour
+SNAPSHOT_TRACK_DAYS = 7  # Videos snapshotted within this window are re-polled
+SNAPSHOT_RETENTION_DAYS = 30
+
+# Background Jobs
+JOB_MAX_WORKERS = 2  # Searches running at once per process, others queue
+JOB_HISTORY = 20  # Finished jobs kept in the registry
+JOB_POLL_INTERVAL = 1.0  # Seconds between UI progress refreshes
+JOB_PREVIEW_CARDS = 20  # Partial results shown while a search runs
+
+# Export
+EXPORT_CHUNK_SIZE = 5_000  # Rows converted and written at a time; bounds export memory
 
 # UI Settings
 WINDOW_TITLE = "YouTube Shorts 爆款搜索神器"
 WINDOW_SIZE = (1200, 800)
 SPLIT_RATIO = [300, 900]  # Width ratio 3:7 approx
+RESULTS_PAGE_SIZES = [20, 50, 100]  # Cards per page in the results list
 
 APP_VERSION = "20251218v.1"
 
@@ -1,155 +1,762 @@
 import logging
-from googleapiclient.discovery import build
+import queue
+import threading
+import time
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
+import httplib2
 from googleapiclient.errors import HttpError
 from datetime import datetime, timedelta, timezone
-from config.key_manager import KeyManager
+from config.key_manager import KeyManager, QUOTA_COSTS
+from config.settings import (
+    DEFAULT_MAX_WORKERS, DEFAULT_TRANSPORT, DEFAULT_SHARDS, DEFAULT_PROJECTION, SHARD_MIN_HOURS, ADAPTIVE_MIN_YIELD,
+    DELTA_OVERLAP, YOUTUBE_API_ROOT_URL
+)
+from core.batch_transport import BatchTransport
+from core.cache import ResponseCache
+from core.corpus import CandidateCorpus
 from core.data_processor import DataProcessor
+from core.delta_store import DeltaStore
+from core.detail_store import DetailStore
+from core.metrics import Metrics
+from core.models import VideoRecord
+from core.result_cache import BUSY, LEAD, SharedResultCache
+from core.retry import RetryPolicy
+from core.service_pool import ServicePool
+from core.snapshot_store import SnapshotStore
+from core.yield_history import YieldHistory
+
+VIDEO_PARTS = "snippet,contentDetails,statistics"
+
+# Partial-response masks (the `fields` parameter) for videos().list with VIDEO_PARTS; None = whole parts
+PROJECTIONS = {
+    # Everything a VideoRecord (result card) keeps
+    "card": "items(id,snippet(publishedAt,channelId,title,channelTitle,thumbnails/medium/url),"
+            "contentDetails/duration,statistics/viewCount)",
+    # Unmasked, for exports that need more than the card
+    "export": None,
+}
+# What the filter reads, plus the publish time for daily views; not a projection of its own, since the
+# records it yields have no title or channel
+FILTER_FIELDS = "items(id,snippet/publishedAt,contentDetails/duration,statistics/viewCount)"
+# FILTER_FIELDS for every candidate, then the rest of "card" (CARD_REST_FIELDS) for the survivors only
+TWO_PHASE = "two-phase"
+CARD_REST_FIELDS = "items(id,snippet(channelId,title,channelTitle,thumbnails/medium/url))"
+# Search pages are only read for IDs, the next page token and the window size
+SEARCH_FIELDS = "nextPageToken,pageInfo/totalResults,items/id/videoId"
+STATISTICS_FIELDS = "items(id,statistics)"
+CHANNEL_FIELDS = "items(id,statistics(viewCount,subscriberCount,hiddenSubscriberCount,videoCount))"
 
 class YouTubeAPIClient:
-    def __init__(self, key_manager: KeyManager):
+    def __init__(self, key_manager: KeyManager, max_workers: int = DEFAULT_MAX_WORKERS,
+                 cache: ResponseCache | None = None, transport: str = DEFAULT_TRANSPORT,
+                 root_url: str = YOUTUBE_API_ROOT_URL, snapshots: SnapshotStore | None = None,
+                 metrics: Metrics | None = None, retry: RetryPolicy | None = None,
+                 yield_history: YieldHistory | None = None, results_cache: SharedResultCache | None = None,
+                 delta_store: DeltaStore | None = None, projection: str = DEFAULT_PROJECTION,
+                 corpus: CandidateCorpus | None = None):
+        """
+        :param transport: "direct" 每個請求一次 HTTP 往返；"batch" 以 BatchHttpRequest 合併請求
+        :param root_url: 替代的 API 根網址 (例如本機測試伺服器)，空字串表示使用 Google 正式端點
+        :param snapshots: 觀看數快照儲存區，每次向 API 取得 statistics 時記錄
+        :param metrics: 統計資料，未指定時沿用 KeyManager 的 (兩者皆無則建立新的)
+        :param retry: 暫時性錯誤的重試策略
+        :param yield_history: 各關鍵字每頁產出率的紀錄，自動調整搜尋深度時用來決定起始深度
+        :param results_cache: 行程共用的結果快取；相同關鍵字與條件的搜尋直接使用或等待進行中的結果
+        :param delta_store: 增量更新的狀態，settings['incremental'] 為 True 時使用 (見 refresh_delta)
+        :param projection: videos().list 回應的欄位範圍，PROJECTIONS 中的名稱或 TWO_PHASE
+                           (先只取過濾所需欄位，通過篩選的影片再補上卡片欄位)
+        :param corpus: 記錄各關鍵字過濾前的所有候選影片，之後只改變篩選條件時可在本地重新過濾
+                       (共用結果快取命中時只有過濾後的影片，該關鍵字標記為不完整)
+        """
+        if projection != TWO_PHASE and projection not in PROJECTIONS:
+            raise ValueError(f"Unknown projection '{projection}', expected one of {[*PROJECTIONS, TWO_PHASE]}")
         self.key_manager = key_manager
-        self.service = None
+        self.metrics = metrics or key_manager.metrics or Metrics()
+        if key_manager.metrics is None:
+            # Quota and rotation counts land next to the client's own numbers
+            key_manager.metrics = self.metrics
+        self.cache = cache
+        self.snapshots = snapshots
+        self.yield_history = yield_history
+        self.results_cache = results_cache
+        self.delta_store = delta_store
+        self.corpus = corpus
+        self.transport = transport
+        self.projection = projection
+        self.root_url = root_url.rstrip('/') + '/' if root_url else ''
+        self.max_workers = max(1, int(max_workers))
+        self.retry = retry or RetryPolicy()
+        # Services are shared per key across clients; keep-alive connections are lent out per request
+        self._pool = ServicePool.shared(self.root_url)
+        self._local = threading.local()
+        # Requests that ended a search early or dropped a detail chunk, per keyword label;
+        # a result fetched while its count went up is incomplete and stays out of results_cache
+        self._failures = Counter()
+        self._failures_lock = threading.Lock()
+        # Caps concurrent HTTP requests across keyword and chunk workers
+        self._slots = threading.BoundedSemaphore(self.max_workers)
         self._init_service()
 
-    def _init_service(self):
-        """初始化 YouTube Service"""
+    @property
+    def service(self):
+        """目前執行緒使用的 YouTube Service，每次取用時選擇剩餘額度最多的 Key"""
         key = self.key_manager.get_current_key()
+        self._local.key = key
         if not key:
-            self.service = None
-            return
-        
-        try:
-            self.service = build('youtube', 'v3', developerKey=key, cache_discovery=False)
-        except Exception as e:
-            logging.error(f"Failed to create YouTube service: {e}")
-            self.service = None
+            return None
+        return self._pool.get(key)
+
+    def _init_service(self):
+        """預先建立所有 Key 的 YouTube Service，輪替 Key 時不必重建"""
+        self._pool.retain(self, self.key_manager.keys)
+        return self.service
+
+    def _execute(self, request, cost: int | None = None) -> dict:
+        """
+        執行 API 請求 (受並行數上限控制)，並將預估額度記到發出請求的 Key
+        :param cost: 額度單位，未指定時依 API 方法推算
+        """
+        method = getattr(request, 'methodId', None)
+        if cost is None:
+            cost = QUOTA_COSTS.get(method, 0)
+        key = getattr(self._local, 'key', '')
+        if method:
+            # Batch sub-requests are instrumented by BatchTransport
+            self._instrument(request, cost, self._keyword())
+        self.key_manager.spend(key, cost)
+        self.metrics.incr("http_requests", key=KeyManager.mask_key(key))
+        with self._slots, self._pool.http() as http:
+            try:
+                return request.execute(http=http)
+            except HttpError as e:
+                self.metrics.incr("api_errors", status=e.resp.status)
+                raise
+
+    def _call(self, make_request, cost: int | None = None) -> dict | None:
+        """
+        執行單一請求並在失敗時重送同一個請求 (同一頁、同一批 ID)
+        額度用盡：輪替 Key 後立即重送 (最多輪替 Key 的數量次)；5xx、速率限制、網路錯誤：指數退避加抖動後重送
+        :param make_request: factory(service) -> HttpRequest，換 Key 後以新的 Service 重建請求
+        :return: API 回應，沒有可用的 Key 時為 None
+        :raises HttpError: 非暫時性錯誤，或重試次數用盡
+        """
+        attempt = 0
+        rotations = 0
+        while True:
+            service = self.service
+            if service is None:
+                logging.error("No valid API Key available.")
+                return None
+            try:
+                return self._execute(make_request(service), cost)
+            except (HttpError, OSError, httplib2.HttpLib2Error) as e:
+                if self.retry.is_quota_error(e):
+                    if rotations >= len(self.key_manager.keys) or not self._handle_api_error(e):
+                        return None
+                    rotations += 1
+                    self.metrics.incr("retries", reason="quota")
+                    continue
+                attempt += 1
+                if not self.retry.is_transient(e) or attempt >= self.retry.max_attempts:
+                    raise
+                delay = self.retry.delay(attempt)
+                logging.warning(f"Transient API error ({e}), retrying in {delay:.2f}s")
+                self.metrics.incr("retries", reason="transient")
+                time.sleep(delay)
+
+    def _keyword(self) -> str:
+        """目前執行緒正在處理的關鍵字 (統計用)"""
+        return getattr(self._local, 'keyword', '')
+
+    def _record_failure(self, keyword: str | None = None):
+        """記錄一次讓結果不完整的失敗 (搜尋提早中斷或詳情批次遺失)，未指定時記在目前執行緒的關鍵字"""
+        with self._failures_lock:
+            self._failures[self._keyword() if keyword is None else keyword] += 1
+
+    def _failure_count(self, *keywords: str) -> int:
+        with self._failures_lock:
+            return sum(self._failures[kw] for kw in keywords)
+
+    def _instrument(self, request, cost: int, keyword: str):
+        """記錄單一 API 呼叫的次數、額度與回應大小"""
+        method = request.methodId
+        self.metrics.incr("api_calls", method=method, keyword=keyword)
+        self.metrics.incr("keyword_quota_units", cost, keyword=keyword)
+        postproc = request.postproc
+
+        def counting_postproc(resp, content):
+            self.metrics.incr("response_bytes", len(content), method=method)
+            return postproc(resp, content)
+        request.postproc = counting_postproc
+
+    def _cache_get(self, kind: str, params: dict):
+        if self.cache is None:
+            return None
+        value = self.cache.get(kind, params)
+        self.metrics.incr("cache_lookups", kind=kind, result="miss" if value is None else "hit")
+        return value
+
+    def _cache_put(self, kind: str, params: dict, value):
+        if self.cache is not None:
+            self.cache.put(kind, params, value)
+
+    def _cache_put_many(self, kind: str, entries: list[tuple[dict, object]]):
+        """一次寫入多筆 (同一個交易)"""
+        if self.cache is not None:
+            self.cache.put_many(kind, entries)
 
     def _handle_api_error(self, error: HttpError) -> bool:
         """
         處理 API 錯誤，如果是 Quota Exceeded 則嘗試輪替 Key
         :return: True if rotated and retry is possible, False otherwise
         """
-        if error.resp.status in [403, 429]:
-            reason = error.error_details[0].get('reason') if error.error_details else ""
-            if reason in ['quotaExceeded', 'dailyLimitExceeded']:
-                logging.warning("Quota exceeded, rotating key...")
-                new_key = self.key_manager.rotate_key()
-                if new_key:
-                    self._init_service()
-                    return True
+        if self.retry.is_quota_error(error):
+            logging.warning("Quota exceeded, rotating key...")
+            # The failed key stays out of rotation until its quota resets
+            new_key = self.key_manager.rotate_key(getattr(self._local, 'key', None))
+            return bool(new_key)
         return False
 
-    def search_shorts(self, keyword: str, days_ago: int = 30, max_pages: int = 5) -> list[str]:
+    def search_shorts(self, keyword: str, days_ago: int = 30, max_pages: int = 5, shards: int = DEFAULT_SHARDS,
+                      cancel: threading.Event | None = None) -> list[str]:
         """
         第一階段：搜尋並取得 Video IDs
+        :param shards: 大於 1 時改用分段搜尋 (search_shards)
+        :param cancel: set 之後不再送出下一頁請求，回傳目前為止的 IDs
+        """
+        if shards > 1:
+            return self.search_shards(keyword, days_ago, max_pages, shards, cancel)
+        video_ids = []
+        for page_ids in self.iter_search_pages(keyword, days_ago, max_pages, cancel):
+            video_ids.extend(page_ids)
+        return video_ids
+
+    def iter_search_pages(self, keyword: str, days_ago: int = 30, max_pages: int = 5,
+                          cancel: threading.Event | None = None):
+        """
+        逐頁產出搜尋結果的 Video IDs；呼叫端停止迭代或 cancel 被 set 後不會再送出下一頁請求
         """
         if not self.service:
-            self._init_service()
-            if not self.service:
-                logging.error("No valid API Key available.")
-                return []
+            logging.error("No valid API Key available.")
+            self._record_failure(keyword)
+            return
 
-        # Use timezone aware UTC
-        now_utc = datetime.now(timezone.utc)
-        published_after = (now_utc - timedelta(days=days_ago)).replace(microsecond=0).isoformat()
-        video_ids = []
+        published_after = self._published_after(days_ago)
         next_page_token = None
         
         for _ in range(max_pages):
-            try:
-                request = self.service.search().list(
-                    part="id",
-                    q=keyword,
-                    type="video",
-                    videoDuration="short",  # 鎖定短影音
-                    publishedAfter=published_after,
-                    maxResults=50,
-                    pageToken=next_page_token
-                )
-                response = request.execute()
-                
-                for item in response.get("items", []):
-                    vid = item["id"].get("videoId")
-                    if vid:
-                        video_ids.append(vid)
-                
-                next_page_token = response.get("nextPageToken")
+            if cancel is not None and cancel.is_set():
+                self._record_failure(keyword)  # Cut short, not the keyword's full result
+                break
+            self._local.keyword = keyword
+            # Cache by days instead of the exact timestamp so repeated runs hit
+            cache_params = {"q": keyword, "days": days_ago, "pageToken": next_page_token}
+            cached = self._cache_get("search", cache_params)
+            if cached is not None:
+                if next_page_token is None:
+                    # Keep the cached window so live follow-up pages match the cached page tokens
+                    published_after = cached.get("publishedAfter", published_after)
+                next_page_token = cached.get("nextPageToken")
+                yield cached.get("ids", [])
                 if not next_page_token:
                     break
+                continue
+
+            try:
+                with self.metrics.stage("search"):
+                    response = self._call(
+                        lambda service: self._search_request(service, keyword, published_after, next_page_token)
+                    )
+                if response is None:
+                    logging.error(f"Search for '{keyword}' stopped: all API keys exhausted")
+                    self._record_failure(keyword)
+                    break
+
+                page_ids = self._page_ids(response)
+                self._cache_put("search", cache_params, {
+                    "ids": page_ids,
+                    "nextPageToken": response.get("nextPageToken"),
+                    "publishedAfter": published_after,
+                })
+                next_page_token = response.get("nextPageToken")
                     
             except HttpError as e:
-                if self._handle_api_error(e):
-                    continue # Retry logic could be more complex, but for now loop continues with new key next iteration
-                    # Note: Strict retry for the *same* page requires loop restructuring, but here we just try next iteration or fail
                 logging.error(f"Search API Error: {e}")
+                self._record_failure(keyword)
                 break
             except Exception as e:
                 logging.error(f"Unexpected error during search: {e}")
+                self._record_failure(keyword)
                 break
-                
-        return video_ids
+
+            yield page_ids
+            if not next_page_token:
+                break
+
+    @staticmethod
+    def _published_after(days_ago: int) -> str:
+        # Use timezone aware UTC
+        now_utc = datetime.now(timezone.utc)
+        return (now_utc - timedelta(days=days_ago)).replace(microsecond=0).isoformat()
+
+    @staticmethod
+    def _search_request(service, keyword: str, published_after: str, page_token: str | None,
+                        published_before: str | None = None):
+        return service.search().list(
+            part="id",
+            q=keyword,
+            type="video",
+            videoDuration="short",  # 鎖定短影音
+            publishedAfter=published_after,
+            publishedBefore=published_before,
+            maxResults=50,
+            pageToken=page_token,
+            fields=SEARCH_FIELDS
+        )
+
+    @staticmethod
+    def _page_ids(response: dict) -> list[str]:
+        page_ids = []
+        for item in response.get("items", []):
+            vid = item["id"].get("videoId")
+            if vid:
+                page_ids.append(vid)
+        return page_ids
+
+    def search_shards(self, keyword: str, days_ago: int = 30, max_pages: int = 5,
+                      max_windows: int = DEFAULT_SHARDS, cancel: threading.Event | None = None) -> list[str]:
+        """分段搜尋的所有 Video IDs (去重，較新的時間窗在前，結果與完成順序無關)"""
+        windows = sorted(self._iter_windows(keyword, days_ago, max_pages, max_windows, cancel),
+                         key=lambda w: w[0], reverse=True)
+        return list(dict.fromkeys(vid for _, pages in windows for page_ids in pages for vid in page_ids))
+
+    def iter_search_shards(self, keyword: str, days_ago: int = 30, max_pages: int = 5,
+                           max_windows: int = DEFAULT_SHARDS, cancel: threading.Event | None = None):
+        """
+        分段搜尋的串流版本：每完成一個時間窗就產出其中尚未出現過的 Video IDs
+        呼叫端停止迭代或 cancel 被 set 後，進行中的時間窗不會再翻下一頁
+        """
+        seen = set()
+        for _, pages in self._iter_windows(keyword, days_ago, max_pages, max_windows, cancel):
+            new_ids = [vid for page_ids in pages for vid in page_ids if vid not in seen]
+            seen.update(new_ids)
+            if new_ids:
+                yield new_ids
+
+    def _iter_windows(self, keyword: str, days_ago: int, max_pages: int, max_windows: int,
+                      cancel: threading.Event | None = None):
+        """
+        把 days_ago 範圍切成 publishedAfter / publishedBefore 時間窗並行搜尋，依完成順序產出 (窗起點, 各頁 IDs)
+        cancel 被 set 後各時間窗不再翻頁，也不再開始新的時間窗
+        單一查詢能翻的頁數有限，每個時間窗各自翻頁，範圍越寬能取得越多不同的影片
+        時間窗大小依結果數調整：先以較少的時間窗開始，第一頁的 totalResults 超過 max_pages 頁能取得的數量時
+        對半切開重新搜尋 (總數不超過 max_windows，也不小於 SHARD_MIN_HOURS)；結果少的時間窗則直接翻完
+        被切開的時間窗已經取得第一頁 (結果照樣產出)，所以搜尋頁數最多為
+        max_windows × max_pages + (max_windows − 初始時間窗數)，而不是 max_windows × max_pages
+        """
+        # Hour-aligned bounds keep window queries cacheable across runs
+        end = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0) + timedelta(hours=1)
+        start = end - timedelta(days=days_ago)
+        max_windows = max(1, max_windows)
+        initial = max(1, max_windows // 4)
+        span = (end - start) / initial
+        capacity = max_pages * 50
+        min_span = timedelta(hours=SHARD_MIN_HOURS)
+        stop = threading.Event()
+        reserved = initial  # Windows started plus splits that may still happen
+
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, max_windows)) as pool:
+            def submit(after, before):
+                nonlocal reserved
+                # A window may split only if a slot for its second half is free
+                can_split = reserved < max_windows and before - after >= 2 * min_span
+                if can_split:
+                    reserved += 1
+                self.metrics.incr("search_windows", keyword=keyword)
+                future = pool.submit(self._search_window, keyword, after, before, max_pages,
+                                     capacity if can_split else None, stop, cancel)
+                pending[future] = (after, before, can_split)
+
+            pending = {}
+            for i in range(initial):
+                submit(start + span * i, start + span * (i + 1))
+            try:
+                while pending:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        after, before, can_split = pending.pop(future)
+                        try:
+                            pages, split = future.result()
+                        except Exception as e:
+                            logging.error(f"Search window {after:%Y-%m-%d %H:%M} failed for '{keyword}': {e}")
+                            self._record_failure(keyword)
+                            pages, split = [], False
+                        if can_split and not split:
+                            reserved -= 1
+                        if split and cancel is not None and cancel.is_set():
+                            self._record_failure(keyword)
+                        elif split:
+                            self.metrics.incr("window_splits", keyword=keyword)
+                            # The halves take the parent's slot and the one reserved for the split
+                            middle = after + (before - after) / 2
+                            submit(after, middle)
+                            submit(middle, before)
+                        yield after, pages
+            finally:
+                stop.set()
+                for future in pending:
+                    future.cancel()
+
+    def _search_window(self, keyword: str, after: datetime, before: datetime, max_pages: int,
+                       split_above: int | None, stop: threading.Event,
+                       cancel: threading.Event | None = None) -> tuple[list[list[str]], bool]:
+        """
+        翻完單一時間窗
+        :param split_above: 第一頁的 totalResults 超過此值時停止翻頁，回傳 split=True 交由呼叫端切開
+        :param stop: 呼叫端不再需要結果 (不算失敗)；cancel: 搜尋被取消 (結果不完整)
+        :return: (各頁 IDs, 是否需要切開)
+        """
+        self._local.keyword = keyword
+        published_after = after.isoformat().replace("+00:00", "Z")
+        published_before = before.isoformat().replace("+00:00", "Z")
+        pages = []
+        token = None
+        for page in range(max_pages):
+            if stop.is_set():
+                break
+            if cancel is not None and cancel.is_set():
+                self._record_failure(keyword)
+                break
+            cache_params = {"q": keyword, "after": published_after, "before": published_before, "pageToken": token}
+            cached = self._cache_get("search", cache_params)
+            if cached is None:
+                try:
+                    with self.metrics.stage("search"):
+                        response = self._call(lambda service: self._search_request(
+                            service, keyword, published_after, token, published_before
+                        ))
+                except HttpError as e:
+                    logging.error(f"Search API Error: {e}")
+                    self._record_failure(keyword)
+                    break
+                if response is None:
+                    self._record_failure(keyword)
+                    break
+                cached = {
+                    "ids": self._page_ids(response),
+                    "nextPageToken": response.get("nextPageToken"),
+                    "totalResults": response.get("pageInfo", {}).get("totalResults", 0),
+                }
+                self._cache_put("search", cache_params, cached)
+
+            pages.append(cached["ids"])
+            if page == 0 and split_above is not None and cached.get("totalResults", 0) > split_above:
+                return pages, True
+            token = cached.get("nextPageToken")
+            if not token:
+                break
+        return pages, False
+
+    def search_many(self, keywords: list[str], days_ago: int = 30, max_pages: int = 5,
+                    cancel: threading.Event | None = None) -> list[list[str]]:
+        """
+        批次模式的第一階段：每一輪把所有關鍵字的下一頁合併成一次批次請求
+        :param cancel: set 之後不再送出下一輪，尚未翻完的關鍵字只有目前為止的 IDs
+        :return: 與 keywords 對應的 Video ID 列表
+        """
+        published_after = self._published_after(days_ago)
+        states = [
+            {"ids": [], "token": None, "pages": 0, "published_after": published_after, "done": False}
+            for _ in keywords
+        ]
+        transport = BatchTransport(self, labels={str(idx): kw for idx, kw in enumerate(keywords)})
+
+        while True:
+            jobs = {}
+            for idx, (kw, state) in enumerate(zip(keywords, states)):
+                # Consume cached pages before queueing a live request
+                while not state["done"] and state["pages"] < max_pages:
+                    cached = self._cache_get("search", {"q": kw, "days": days_ago, "pageToken": state["token"]})
+                    if cached is None:
+                        break
+                    if state["token"] is None:
+                        state["published_after"] = cached.get("publishedAfter", published_after)
+                    self._advance_search_state(state, cached.get("ids", []), cached.get("nextPageToken"))
+
+                if not state["done"] and state["pages"] < max_pages:
+                    jobs[str(idx)] = (
+                        lambda service, kw=kw, state=state:
+                        self._search_request(service, kw, state["published_after"], state["token"])
+                    )
+            if not jobs:
+                break
+            if cancel is not None and cancel.is_set():
+                for request_id in jobs:
+                    self._record_failure(keywords[int(request_id)])
+                break
+
+            with self.metrics.stage("search"):
+                responses = transport.run(jobs)
+            for request_id in jobs:
+                idx = int(request_id)
+                state = states[idx]
+                response = responses.get(request_id)
+                if response is None:
+                    # Same as the direct path: a page that keeps failing ends this keyword
+                    state["done"] = True
+                    self._record_failure(keywords[idx])
+                    continue
+                page_ids = self._page_ids(response)
+                next_page_token = response.get("nextPageToken")
+                self._cache_put("search", {"q": keywords[idx], "days": days_ago, "pageToken": state["token"]}, {
+                    "ids": page_ids,
+                    "nextPageToken": next_page_token,
+                    "publishedAfter": state["published_after"],
+                })
+                self._advance_search_state(state, page_ids, next_page_token)
+
+        logging.info(f"Batched search: {transport.round_trips} round trips for {len(keywords)} keywords")
+        return [state["ids"] for state in states]
+
+    @staticmethod
+    def _advance_search_state(state: dict, page_ids: list[str], next_page_token: str | None):
+        state["ids"].extend(page_ids)
+        state["token"] = next_page_token
+        state["pages"] += 1
+        if not next_page_token:
+            state["done"] = True
 
     def get_video_details(self, video_ids: list[str]) -> list[dict]:
         """
-        第二階段：取得詳細資訊 (Statistics, ContentDetails)
+        第二階段：取得詳細資訊 (Statistics, ContentDetails)，欄位依 projection 而定
         """
-        if not video_ids or not self.service:
+        fields = FILTER_FIELDS if self.projection == TWO_PHASE else PROJECTIONS[self.projection]
+        return self._video_items(video_ids, VIDEO_PARTS, fields)
+
+    def _video_items(self, video_ids: list[str], part: str, fields: str | None) -> list[dict]:
+        """以快取與 videos().list 取得指定 part / fields 的影片項目 (依輸入順序)"""
+        if not video_ids:
             return []
 
-        results = []
+        def cache_params(vid):
+            # Unmasked entries keep the key they had before projections existed
+            return {"id": vid, "part": part, "fields": fields} if fields else {"id": vid, "part": part}
+
+        # Serve fresh statistics from the cache, fetch only the rest
+        by_id = {}
+        missing = []
+        for vid in dict.fromkeys(video_ids):
+            cached = self._cache_get("video", cache_params(vid))
+            if cached is not None:
+                by_id[vid] = cached
+            else:
+                missing.append(vid)
+
+        if missing and self.service:
+            with self.metrics.stage("details"):
+                fetched = self._fetch_chunks(missing, part, fields)
+            if self.snapshots is not None:
+                self.snapshots.record_items(fetched)
+
+            for item in fetched:
+                by_id[item["id"]] = item
+            self._cache_put_many("video", [(cache_params(item["id"]), item) for item in fetched])
+
+        # Input order keeps the output deterministic regardless of cache hits
+        return [by_id[vid] for vid in dict.fromkeys(video_ids) if vid in by_id]
+
+    def complete_cards(self, items: list[dict]):
+        """
+        兩階段模式的第二步：替只有過濾欄位的項目補上卡片欄位 (直接更新 items)
+        只有通過篩選的影片需要標題與縮圖，其餘影片的這些欄位不必下載
+        """
+        partial = [item for item in items if 'title' not in item.get('snippet', {})]
+        if not partial:
+            return
+        self.metrics.incr("card_completions", len(partial))
+        rest = {item["id"]: item for item in self._video_items([item["id"] for item in partial], "snippet", CARD_REST_FIELDS)}
+        for item in partial:
+            snippet = rest.get(item["id"], {}).get("snippet")
+            if snippet:
+                item["snippet"] = {**item.get("snippet", {}), **snippet}
+
+    def poll_statistics(self, video_ids: list[str]) -> dict:
+        """
+        重新輪詢觀看數：只取 statistics，每 50 部影片 1 單位額度 (不使用快取)
+        :return: {video_id: view_count}
+        """
+        video_ids = list(dict.fromkeys(video_ids))
+        if not video_ids or not self.service:
+            return {}
+
+        self._local.keyword = "(poll)"
+        with self.metrics.stage("poll"):
+            items = self._fetch_chunks(video_ids, "statistics", STATISTICS_FIELDS)
+        if self.snapshots is not None:
+            self.snapshots.record_items(items)
+
+        view_counts = {}
+        for item in items:
+            try:
+                view_counts[item['id']] = int(item.get('statistics', {}).get('viewCount', 0))
+            except (ValueError, TypeError):
+                continue
+        return view_counts
+
+    def get_channel_stats(self, channel_ids: list[str]) -> dict:
+        """
+        頻道統計：去重後以 50 個一批呼叫 channels().list (每批 1 單位額度)，並以較長的 TTL 快取
+        :return: {channel_id: {"subscribers": 訂閱數 (頻道隱藏時為 None), "views": 總觀看數, "videos": 影片數}}
+        """
+        channel_ids = [cid for cid in dict.fromkeys(channel_ids) if cid]
+        by_id = {}
+        missing = []
+        for cid in channel_ids:
+            cached = self._cache_get("channel", {"id": cid})
+            if cached is not None:
+                by_id[cid] = cached
+            else:
+                missing.append(cid)
+
+        if missing and self.service:
+            self._local.keyword = "(channels)"
+            with self.metrics.stage("channels"):
+                fetched = self._fetch_chunks(missing, "statistics", CHANNEL_FIELDS, resource="channels")
+            for item in fetched:
+                by_id[item["id"]] = item
+            self._cache_put_many("channel", [({"id": item["id"]}, item) for item in fetched])
+        return {cid: self._channel_stats(by_id[cid]) for cid in channel_ids if cid in by_id}
+
+    @staticmethod
+    def _channel_stats(item: dict) -> dict:
+        stats = item.get('statistics', {})
+
+        def count(name):
+            try:
+                return int(stats.get(name, 0))
+            except (ValueError, TypeError):
+                return 0
+        hidden = stats.get('hiddenSubscriberCount') or 'subscriberCount' not in stats
+        return {"subscribers": None if hidden else count('subscriberCount'),
+                "views": count('viewCount'), "videos": count('videoCount')}
+
+    def enrich_channels(self, records: list[VideoRecord]) -> int:
+        """
+        搜尋完成後的頻道補充：替所有結果加上頻道訂閱數 (所有關鍵字的頻道一起查詢，同一頻道只查一次)
+        :return: 取得統計的頻道數
+        """
+        stats = self.get_channel_stats([vid.channel_id for vid in records])
+        for vid in records:
+            channel = stats.get(vid.channel_id)
+            if channel is not None:
+                vid.subscriber_count = channel["subscribers"]
+        self.metrics.incr("channels_enriched", len(stats))
+        return len(stats)
+
+    def _fetch_chunks(self, video_ids: list[str], part: str, fields: str | None = None,
+                      resource: str = "videos") -> list[dict]:
+        """
+        以目前的傳輸模式分批 (50 筆) 呼叫 videos().list，結果依批次順序排列
+        :param fields: 回應的欄位遮罩 (partial response)，None 表示完整的 part
+        :param resource: 改為呼叫其他同樣以 id 查詢的 list 方法，例如 "channels"
+        """
         # API 限制一次最多 50 筆
         chunk_size = 50
-        
-        for i in range(0, len(video_ids), chunk_size):
-            chunk = video_ids[i:i + chunk_size]
-            ids_str = ",".join(chunk)
-            
-            try:
-                request = self.service.videos().list(
-                    part="snippet,contentDetails,statistics",
-                    id=ids_str
-                )
-                response = request.execute()
-                results.extend(response.get("items", []))
-                
-            except HttpError as e:
-                if self._handle_api_error(e):
-                    # Retry current chunk
-                    # Minimal retry logic: re-init and try once more
-                    try:
-                        if self.service:
-                            request = self.service.videos().list(
-                                part="snippet,contentDetails,statistics",
-                                id=ids_str
-                            )
-                            response = request.execute()
-                            results.extend(response.get("items", []))
-                    except:
-                         logging.error(f"Retry failed for chunk {i}")
-                else:
-                    logging.error(f"Video Details API Error: {e}")
-            except Exception as e:
-                logging.error(f"Unexpected error details fetch: {e}")
-                
+        chunks = [video_ids[i:i + chunk_size] for i in range(0, len(video_ids), chunk_size)]
+
+        fetched = []
+        if self.transport == "batch":
+            fetched = self._fetch_detail_chunks_batched(chunks, part, fields, resource)
+        elif self.max_workers > 1 and len(chunks) > 1:
+            keyword = self._keyword()
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(chunks))) as pool:
+                for items in pool.map(
+                    lambda chunk: self._fetch_detail_chunk(chunk, part, keyword, fields, resource), chunks
+                ):
+                    fetched.extend(items)
+        else:
+            for chunk in chunks:
+                fetched.extend(self._fetch_detail_chunk(chunk, part, fields=fields, resource=resource))
+        return fetched
+
+    def _fetch_detail_chunks_batched(self, chunks: list[list[str]], part: str = VIDEO_PARTS,
+                                     fields: str | None = None, resource: str = "videos") -> list[dict]:
+        """以批次請求取得多個 50 筆批次，結果依批次順序排列"""
+        jobs = {
+            str(i): (lambda service, chunk=chunk:
+                     getattr(service, resource)().list(part=part, id=",".join(chunk), fields=fields))
+            for i, chunk in enumerate(chunks)
+        }
+        transport = BatchTransport(self)
+        responses = transport.run(jobs)
+        logging.info(f"Batched details: {transport.round_trips} round trips for {len(chunks)} chunks")
+
+        results = []
+        for i in range(len(chunks)):
+            if str(i) not in responses:
+                self._record_failure()
+            results.extend(responses.get(str(i), {}).get("items", []))
         return results
 
-    def fetch_and_filter(self, keyword: str, settings: dict, progress_callback=None) -> list[dict]:
+    def _fetch_detail_chunk(self, chunk: list[str], part: str = VIDEO_PARTS, keyword: str | None = None,
+                            fields: str | None = None, resource: str = "videos") -> list[dict]:
+        """
+        取得單一批次 (最多 50 筆) 的影片詳細資訊，失敗時由 _call 重送同一批
+        :param keyword: 在工作執行緒中執行時，統計歸屬的關鍵字
+        """
+        if keyword is not None:
+            self._local.keyword = keyword
+        ids_str = ",".join(chunk)
+        
+        try:
+            response = self._call(
+                lambda service: getattr(service, resource)().list(part=part, id=ids_str, fields=fields)
+            )
+            if response is None:
+                logging.error(f"Details for chunk starting at {chunk[0]} dropped: all API keys exhausted")
+                self._record_failure()
+                return []
+            return response.get("items", [])
+        except HttpError as e:
+            logging.error(f"Video Details API Error: {e}")
+        except Exception as e:
+            logging.error(f"Unexpected error details fetch: {e}")
+        self._record_failure()
+        return []
+
+    def fetch_and_filter(self, keyword: str, settings: dict, progress_callback=None,
+                         detail_store: DetailStore | None = None) -> list[dict]:
         """
         整合流程：搜尋 -> 詳情 -> 過濾 -> 封裝
         :param settings: 包含 min_views, min_duration, days_ago, max_pages 等
+        :param detail_store: 共用的 DetailStore，已取得過的影片不會重複呼叫 API
         """
+        if self._adaptive(settings):
+            # Depth is decided page by page, which is what the streaming path does
+            return list(self.iter_fetch(keyword, settings, detail_store))
+        if self.results_cache is not None:
+            return self._cached_result(keyword, settings, lambda: self._fetch_and_filter(
+                keyword, settings, progress_callback, detail_store
+            ))
+        return self._fetch_and_filter(keyword, settings, progress_callback, detail_store)
+
+    def _fetch_and_filter(self, keyword: str, settings: dict, progress_callback=None,
+                          detail_store: DetailStore | None = None) -> list[dict]:
+        # Sharded searches run in worker threads; detail requests from here count toward this keyword
+        self._local.keyword = keyword
+        if self._incremental(settings):
+            return self.refresh_delta(keyword, settings, detail_store)
+
         # Unpack settings
         days = settings.get('days', 30)
         max_pages = settings.get('max_pages', 5)
-        min_views = settings.get('min_views', 100000)
-        max_duration = settings.get('max_duration', 60)
-        limit_per_kw = settings.get('limit', 50)
         
         if progress_callback:
             progress_callback(10, f"Searching for '{keyword}'...")
 
         # 1. Search
-        vids = self.search_shorts(keyword, days, max_pages)
+        vids = self.search_shorts(keyword, days, max_pages, settings.get('shards', DEFAULT_SHARDS))
         if not vids:
             return []
 
@@ -157,30 +764,511 @@ class YouTubeAPIClient:
             progress_callback(50, f"Fetching details for {len(vids)} videos...")
 
         # 2. Details
-        raw_items = self.get_video_details(vids)
+        if detail_store is not None:
+            detail_store.fetch(self, vids)
+            raw_items = detail_store.items_for(vids)
+        else:
+            raw_items = self.get_video_details(vids)
         
         if progress_callback:
             progress_callback(80, "Processing and filtering data...")
 
         # 3. Filter & Process
-        processed_videos = []
-        for item in raw_items:
-            if DataProcessor.filter_video(item, min_views, max_duration):
-                # Enhance item with calculated stats
-                stats = item.get('statistics', {})
-                snippet = item.get('snippet', {})
-                
-                view_count = int(stats.get('viewCount', 0))
-                pub_at = snippet.get('publishedAt', '')
-                
-                item['_daily_views'] = DataProcessor.calculate_daily_views(view_count, pub_at)
-                item['_rating'] = DataProcessor.get_flame_rating(view_count)
-                item['_duration_sec'] = DataProcessor.parse_iso_duration(item['contentDetails']['duration'])
-                item['_formatted_duration'] = DataProcessor.format_duration(item['_duration_sec'])
-                
-                processed_videos.append(item)
-                
-                if len(processed_videos) >= limit_per_kw:
-                    break
-        
+        return self._filter_and_enrich(raw_items, settings, keyword=keyword)
+
+    def _filter_and_enrich(self, raw_items: list[dict], settings: dict, complete: bool = True,
+                           keyword: str | None = None) -> list[dict]:
+        """
+        過濾影片並加上計算欄位，最多回傳每個關鍵字的數量上限
+        :param complete: 兩階段模式下是否立即補上卡片欄位 (呼叫端要合併多個關鍵字一起補時傳 False)
+        :param keyword: 候選影片所屬的關鍵字，設定 corpus 時記錄於其中
+        """
+        if keyword is not None and self.corpus is not None:
+            self.corpus.add(keyword, raw_items)
+        min_views = settings.get('min_views', 100000)
+        max_duration = settings.get('max_duration', 60)
+        limit_per_kw = settings.get('limit', 50)
+
+        # Columnar pass over the whole page; identical to filtering item by item
+        with self.metrics.stage("filter"):
+            processed_videos = DataProcessor.process_batch(raw_items, min_views, max_duration, metrics=self.metrics)
+        self.metrics.incr("items_filtered", max(0, len(processed_videos) - limit_per_kw), rule="limit")
+        processed_videos = processed_videos[:limit_per_kw]
+        if complete and self.projection == TWO_PHASE:
+            self.complete_cards(processed_videos)
         return processed_videos
+
+    def fetch_many(self, keywords: list[str], settings: dict, progress_callback=None,
+                   cancel: threading.Event | None = None, results_callback=None) -> list[VideoRecord]:
+        """
+        多關鍵字並行搜尋：
+        1. 各關鍵字並行搜尋 Video IDs (批次模式下改以 search_many 合併請求)
+        2. 所有關鍵字的 ID 合併去重後，以完整的 50 筆批次取得詳細資訊
+        3. 依關鍵字順序過濾；同一部影片只出現一次，並以 keywords 標記所有符合的關鍵字
+        :return: 精簡的 VideoRecord 列表
+        :param progress_callback: callback(done, total, keyword)，每完成一個關鍵字的搜尋呼叫一次 (於呼叫端執行緒)
+        :param cancel: set 之後不再翻頁、尚未開始的關鍵字不再搜尋，回傳已完成的關鍵字的結果
+        :param results_callback: callback(records)，每個關鍵字過濾完成就以新出現的影片呼叫 (於呼叫端執行緒)；
+                                 各關鍵字搜尋完成後立即取得詳情，結果較早出現，但每個關鍵字的最後一批可能不滿 50 筆
+                                 之後符合的關鍵字會附加到已提供影片的 keywords，回傳值也是同一批物件
+        """
+        keywords = list(keywords)
+        if not keywords:
+            return []
+        if self._adaptive(settings) or self._incremental(settings):
+            # Per-keyword paths; iter_fetch_many runs them in parallel and merges the same way
+            records = []
+            stream = self.iter_fetch_many(keywords, settings, progress_callback, cancel)
+            try:
+                for record in stream:
+                    records.append(record)
+                    if results_callback:
+                        results_callback([record])
+                    if cancel is not None and cancel.is_set():
+                        break  # Closing the stream stops further requests
+            finally:
+                stream.close()
+            return records
+
+        merged = {}  # video_id -> VideoRecord, in the order keywords finished
+
+        def on_filtered(kw, items):
+            new = []
+            for item in items:
+                record = merged.get(item['id'])
+                if record is not None:
+                    record.keywords.append(kw)
+                    continue
+                item['_keywords'] = [kw]
+                record = merged[item['id']] = VideoRecord.from_item(item)
+                new.append(record)
+            if new and results_callback:
+                results_callback(new)
+
+        fetch = self._fetch_many_cached if self.results_cache is not None else self._fetch_filtered
+        filtered = fetch(keywords, settings, progress_callback, cancel, on_filtered if results_callback else None)
+        if not results_callback:
+            for kw, items in zip(keywords, filtered):
+                on_filtered(kw, items)
+        return self._keyword_order(keywords, filtered, merged)
+
+    @staticmethod
+    def _keyword_order(keywords: list[str], items_per_keyword: list[list[dict]],
+                       merged: dict) -> list[VideoRecord]:
+        """依關鍵字順序排列合併後的影片 (與完成順序無關)，keywords 也依關鍵字順序排列"""
+        rank = {}
+        for idx, kw in enumerate(keywords):
+            rank.setdefault(kw, idx)
+        ordered = {}
+        for items in items_per_keyword:
+            for item in items:
+                if item['id'] in merged:
+                    ordered.setdefault(item['id'], merged[item['id']])
+        for record in ordered.values():
+            record.keywords.sort(key=lambda kw: rank.get(kw, len(rank)))
+        return list(ordered.values())
+
+    def _fetch_filtered(self, keywords: list[str], settings: dict, progress_callback=None,
+                        cancel: threading.Event | None = None, on_filtered=None) -> list[list[dict]]:
+        """
+        fetch_many 的步驟 1、2 與各關鍵字的過濾，回傳各關鍵字通過的影片 (依輸入順序)
+        :param on_filtered: callback(keyword, items)，指定時每個關鍵字搜尋完成就取得詳情、過濾並呼叫
+        取消後不再取得詳情：已交給 on_filtered 的關鍵字保留結果，其餘為空並記為失敗 (不進入共用結果快取)
+        """
+        days = settings.get('days', 30)
+        max_pages = settings.get('max_pages', 5)
+        shards = settings.get('shards', DEFAULT_SHARDS)
+        store = DetailStore()
+        filtered = [[] for _ in keywords]
+        ids_per_keyword = [[] for _ in keywords]
+        finished = set()
+
+        def finish(indexes):
+            if cancel is not None and cancel.is_set():
+                return
+            # One detail fetch for several keywords keeps the chunks full
+            self._local.keyword = "(shared)" if len(indexes) > 1 else keywords[indexes[0]]
+            store.fetch(self, [vid for idx in indexes for vid in ids_per_keyword[idx]])
+            for idx in indexes:
+                filtered[idx] = self._filter_and_enrich(store.items_for(ids_per_keyword[idx]), settings,
+                                                        complete=False, keyword=keywords[idx])
+            if self.projection == TWO_PHASE:
+                # One pass for every keyword's survivors, so the chunks stay full
+                self.complete_cards([item for idx in indexes for item in filtered[idx]])
+            finished.update(indexes)
+            if on_filtered:
+                for idx in indexes:
+                    on_filtered(keywords[idx], filtered[idx])
+
+        # Window splits depend on each first page, so sharded searches cannot be batched up front
+        if self.transport == "batch" and shards <= 1:
+            ids_per_keyword = self.search_many(keywords, days, max_pages, cancel)
+            if progress_callback:
+                for idx, kw in enumerate(keywords):
+                    progress_callback(idx + 1, len(keywords), kw)
+        else:
+            def on_searched(idx, ids):
+                ids_per_keyword[idx] = ids
+                if on_filtered:
+                    finish([idx])
+            self._search_parallel(keywords, days, max_pages, progress_callback, shards, cancel, on_searched)
+
+        pending = [idx for idx in range(len(keywords)) if idx not in finished]
+        if pending:
+            finish(pending)
+            logging.info(f"Detail store: {store.fetched} unique IDs fetched for {store.requested} search hits")
+        for idx in range(len(keywords)):
+            if idx not in finished:
+                self._record_failure(keywords[idx])
+        return filtered
+
+    def _fetch_many_cached(self, keywords: list[str], settings: dict, progress_callback=None,
+                           cancel: threading.Event | None = None, on_filtered=None) -> list[list[dict]]:
+        """
+        _fetch_filtered 的共用快取版本：快取命中的關鍵字不再搜尋，其他執行緒正在搜尋的關鍵字等待其結果
+        自己負責的關鍵字先一起取得並交出結果，之後才等待別人的，避免兩個執行緒互相等待
+        :param on_filtered: callback(keyword, items)，每個關鍵字有結果時呼叫 (命中的關鍵字最先)
+        """
+        results = {}
+        leading, busy = [], []
+        for kw in dict.fromkeys(keywords):
+            state, value = self._acquire_result(SharedResultCache.make_key(kw, settings), block=False)
+            if state == LEAD:
+                leading.append(kw)
+            elif state == BUSY:
+                busy.append(kw)
+            else:
+                results[kw] = self._shared_result(kw, value)
+                if on_filtered:
+                    on_filtered(kw, results[kw])
+
+        done = len(results)
+        total = done + len(leading) + len(busy)
+        if progress_callback:
+            for idx, kw in enumerate(results, start=1):
+                progress_callback(idx, total, kw)
+
+        if leading:
+            def on_searched(count, _, kw):
+                progress_callback(done + count, total, kw)
+
+            before = {kw: self._failure_count(kw) for kw in [*leading, "(shared)"]}
+            try:
+                fetched = self._fetch_filtered(leading, settings, on_searched if progress_callback else None,
+                                               cancel, on_filtered)
+            except BaseException:
+                for kw in leading:
+                    self.results_cache.release(SharedResultCache.make_key(kw, settings), ok=False)
+                raise
+            # A dropped detail chunk may have held any keyword's videos
+            shared_ok = self._failure_count("(shared)") == before["(shared)"]
+            for kw, items in zip(leading, fetched):
+                ok = shared_ok and self._failure_count(kw) == before[kw]
+                self.results_cache.release(SharedResultCache.make_key(kw, settings), [dict(item) for item in items],
+                                           ok=ok)
+                results[kw] = items
+            done += len(leading)
+
+        for kw in busy:
+            if cancel is not None and cancel.is_set():
+                break
+            results[kw] = self._cached_result(kw, settings, lambda: self._fetch_and_filter(kw, settings))
+            if on_filtered:
+                on_filtered(kw, results[kw])
+            done += 1
+            if progress_callback:
+                progress_callback(done, total, kw)
+        return [results.get(kw, []) for kw in keywords]
+
+    def _cached_result(self, keyword: str, settings: dict, fetch) -> list[dict]:
+        """
+        經由共用結果快取取得單一關鍵字的結果；未命中時由 fetch() 取得並提供給等待中的其他執行緒
+        取得期間發生搜尋或詳情錯誤 (例如 Key 額度用盡) 時，結果只回傳給呼叫端，不保存也不交給等待者
+        """
+        key = SharedResultCache.make_key(keyword, settings)
+        state, value = self._acquire_result(key)
+        if state != LEAD:
+            return self._shared_result(keyword, value)
+        before = self._failure_count(keyword)
+        try:
+            value = fetch()
+        except BaseException:
+            self.results_cache.release(key, ok=False)
+            raise
+        ok = self._failure_count(keyword) == before
+        self.results_cache.release(key, [dict(item) for item in value], ok=ok)
+        return value
+
+    def _shared_result(self, keyword: str, value: list[dict]) -> list[dict]:
+        """共用結果快取提供的結果；過濾前的候選不在其中，corpus 只能記錄通過的影片"""
+        # Callers annotate result dicts, so the cached ones are never handed out directly
+        items = [dict(item) for item in value]
+        if self.corpus is not None:
+            self.corpus.add(keyword, items)
+            self.corpus.mark_partial(keyword)
+        return items
+
+    def _acquire_result(self, key: str, block: bool = True):
+        """查詢共用結果快取；強制刷新時忽略已保存的結果"""
+        refresh = self.cache is not None and self.cache.refresh
+        state, value = self.results_cache.acquire(key, block=block, refresh=refresh)
+        if state != BUSY:
+            self.metrics.incr("result_cache", result=state)
+        return state, value
+
+    def _search_parallel(self, keywords: list[str], days: int, max_pages: int, progress_callback=None,
+                         shards: int = DEFAULT_SHARDS, cancel: threading.Event | None = None,
+                         on_searched=None) -> list[list[str]]:
+        """
+        各關鍵字並行執行 search_shorts
+        :param cancel: set 之後進行中的關鍵字不再翻頁，尚未開始的關鍵字不再搜尋
+        :param on_searched: callback(index, ids)，每個關鍵字搜尋完成時呼叫 (於呼叫端執行緒，取消後不再呼叫)
+        """
+        ids_per_keyword = [[] for _ in keywords]
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(keywords))) as pool:
+            futures = {
+                pool.submit(self.search_shorts, kw, days, max_pages, shards, cancel): idx
+                for idx, kw in enumerate(keywords)
+            }
+            for done, future in enumerate(as_completed(futures), start=1):
+                idx = futures[future]
+                if cancel is not None and cancel.is_set():
+                    # Queued keywords never start; running ones stop at their next page
+                    for pending in futures:
+                        pending.cancel()
+                    if future.cancelled():
+                        continue
+                try:
+                    ids_per_keyword[idx] = future.result()
+                except Exception as e:
+                    logging.error(f"Keyword '{keywords[idx]}' failed: {e}")
+                    self._record_failure(keywords[idx])
+                if progress_callback:
+                    progress_callback(done, len(keywords), keywords[idx])
+                if on_searched and not (cancel is not None and cancel.is_set()):
+                    on_searched(idx, ids_per_keyword[idx])
+        return ids_per_keyword
+
+    def _incremental(self, settings: dict) -> bool:
+        return bool(settings.get('incremental')) and self.delta_store is not None
+
+    def refresh_delta(self, keyword: str, settings: dict, detail_store: DetailStore | None = None) -> list[dict]:
+        """
+        增量更新：只搜尋上次搜尋之後發布的影片，已知影片以 50 筆一批只重新取得 statistics，
+        合併後重新過濾 (重新計算日均觀看數與評級)；沒有可用的紀錄時執行完整搜尋並建立紀錄
+        超出 days 範圍的舊影片直接捨棄，不再輪詢
+        """
+        days = settings.get('days', 30)
+        max_pages = settings.get('max_pages', 5)
+        key = DeltaStore.make_key(keyword, days)
+        state = self.delta_store.load(key)
+        searched_at = time.time()
+        cutoff = searched_at - days * 86400
+        self._local.keyword = keyword
+
+        if state is None or state[0] < cutoff:
+            self.metrics.incr("delta_refresh", mode="full")
+            new_ids = self.search_shorts(keyword, days, max_pages, settings.get('shards', DEFAULT_SHARDS))
+            known = {}
+        else:
+            last_searched, known = state
+            self.metrics.incr("delta_refresh", mode="delta")
+            known = {vid: item for vid, item in known.items() if self._published_ts(item) >= cutoff}
+
+            # Uploads can show up in search a while after publishing, so the slice overlaps the last one
+            since = datetime.fromtimestamp(last_searched - DELTA_OVERLAP, timezone.utc).replace(microsecond=0)
+            until = datetime.fromtimestamp(searched_at, timezone.utc).replace(microsecond=0)
+            pages, _ = self._search_window(keyword, since, until, max_pages, None, threading.Event())
+            if not pages:
+                # The slice search failed; search it again next time
+                searched_at = last_searched
+            new_ids = [vid for page_ids in pages for vid in page_ids if vid not in known]
+
+            if known:
+                with self.metrics.stage("poll"):
+                    polled = self._fetch_chunks(list(known), "statistics", STATISTICS_FIELDS)
+                if self.snapshots is not None:
+                    self.snapshots.record_items(polled)
+                fresh = {item['id']: item.get('statistics', {}) for item in polled}
+                # Videos missing from the poll keep their last statistics
+                known = {vid: dict(item, statistics=fresh.get(vid, item.get('statistics', {})))
+                         for vid, item in known.items()}
+
+        if detail_store is not None:
+            detail_store.fetch(self, new_ids)
+            new_items = detail_store.items_for(new_ids)
+        else:
+            new_items = self.get_video_details(new_ids)
+        self.metrics.incr("delta_new_videos", len(new_items), keyword=keyword)
+
+        candidates = {item['id']: item for item in new_items}
+        candidates.update(known)
+        # Filter first so card fields filled in by the two-phase projection are kept for next time
+        results = self._filter_and_enrich(list(candidates.values()), settings, keyword=keyword)
+        if candidates or state is not None:
+            # An empty first search may just have failed; it is not worth a state that skips the window
+            self.delta_store.save(key, searched_at, {
+                vid: {k: v for k, v in item.items() if not k.startswith('_')} for vid, item in candidates.items()
+            })
+        return results
+
+    @staticmethod
+    def _published_ts(item: dict) -> float:
+        try:
+            return datetime.fromisoformat(item['snippet']['publishedAt'].replace('Z', '+00:00')).timestamp()
+        except (KeyError, ValueError, AttributeError):
+            return 0.0
+
+    @staticmethod
+    def _adaptive(settings: dict) -> bool:
+        """是否自動調整搜尋深度 (分段搜尋時各時間窗一次取完，不適用)"""
+        return bool(settings.get('adaptive')) and settings.get('shards', DEFAULT_SHARDS) <= 1
+
+    @staticmethod
+    def _page_yield(passed: int, page_size: int) -> float:
+        """每 100 額度單位通過篩選的影片數；以未快取時的額度計算，快取命中的頁面與新取得的頁面一致"""
+        cost = QUOTA_COSTS["youtube.search.list"] + -(-page_size // 50) * QUOTA_COSTS["youtube.videos.list"]
+        return passed / cost * 100
+
+    def iter_fetch(self, keyword: str, settings: dict, detail_store: DetailStore | None = None,
+                   cancel: threading.Event | None = None):
+        """
+        串流模式：每取得一頁搜尋結果就立即取得詳情並過濾，逐筆產出通過的影片
+        達到數量上限後即停止翻頁與詳情請求，不再消耗額度
+        settings['adaptive'] 為 True 時，max_pages 只是上限：某一頁每 100 單位通過的影片數低於
+        settings['min_yield'] (預設 ADAPTIVE_MIN_YIELD) 就停止翻頁；歷史產出率達標的前幾頁不會提早停止
+        設定 results_cache 時，命中或等待到的結果一次產出；自己搜尋的結果完整跑完且沒有錯誤才會保存
+        :param cancel: set 之後不再翻頁 (結果不完整，不會保存)
+        """
+        if self.results_cache is None:
+            yield from self._iter_fetch(keyword, settings, detail_store, cancel)
+            return
+
+        key = SharedResultCache.make_key(keyword, settings)
+        state, cached = self._acquire_result(key)
+        if state != LEAD:
+            yield from self._shared_result(keyword, cached)
+            return
+        items = []
+        complete = False
+        before = self._failure_count(keyword)
+        try:
+            for item in self._iter_fetch(keyword, settings, detail_store, cancel):
+                items.append(dict(item))
+                yield item
+            complete = self._failure_count(keyword) == before
+        finally:
+            # A stream closed early or cut short by an error holds only part of the result
+            self.results_cache.release(key, items, ok=complete)
+
+    def _iter_fetch(self, keyword: str, settings: dict, detail_store: DetailStore | None = None,
+                    cancel: threading.Event | None = None):
+        if self._incremental(settings):
+            yield from self.refresh_delta(keyword, settings, detail_store)
+            return
+
+        days = settings.get('days', 30)
+        max_pages = settings.get('max_pages', 5)
+        limit_per_kw = settings.get('limit', 50)
+        store = detail_store if detail_store is not None else DetailStore()
+
+        shards = settings.get('shards', DEFAULT_SHARDS)
+        if shards > 1:
+            pages = self.iter_search_shards(keyword, days, max_pages, shards, cancel)
+        else:
+            pages = self.iter_search_pages(keyword, days, max_pages, cancel)
+
+        adaptive = self._adaptive(settings)
+        min_yield = settings.get('min_yield', ADAPTIVE_MIN_YIELD)
+        start_depth = 0
+        if adaptive and self.yield_history is not None:
+            start_depth = self.yield_history.start_depth(keyword, settings, min_yield)
+        yields = []
+
+        found = 0
+        seen = set()
+        try:
+            for page_ids in pages:
+                page_ids = [vid for vid in page_ids if vid not in seen]
+                seen.update(page_ids)
+                self._local.keyword = keyword
+                store.fetch(self, page_ids)
+
+                passed = 0
+                page_settings = dict(settings, limit=limit_per_kw - found)
+                for item in self._filter_and_enrich(store.items_for(page_ids), page_settings, keyword=keyword):
+                    found += 1
+                    passed += 1
+                    yield item
+                if found >= limit_per_kw:
+                    if self.corpus is not None:
+                        self.corpus.mark_partial(keyword)
+                    # Leaving the loop closes the search generator before the next page is requested
+                    return
+                if adaptive:
+                    # Pages cut short by the limit are left out: their yield is only a lower bound
+                    yields.append(self._page_yield(passed, len(page_ids)))
+                    if len(yields) >= start_depth and yields[-1] < min_yield:
+                        self.metrics.incr("adaptive_stops", keyword=keyword)
+                        if self.corpus is not None:
+                            self.corpus.mark_partial(keyword)
+                        logging.info(f"'{keyword}': page {len(yields)} yielded {yields[-1]:.1f} per 100 units, "
+                                     f"stopping")
+                        return
+        finally:
+            if yields and self.yield_history is not None:
+                self.yield_history.record(keyword, settings, yields)
+
+    def iter_fetch_many(self, keywords: list[str], settings: dict, progress_callback=None,
+                        cancel: threading.Event | None = None):
+        """
+        多關鍵字串流模式：各關鍵字並行執行 iter_fetch，依抵達順序產出影片
+        同一部影片只產出一次 (VideoRecord)，之後符合的關鍵字會附加到已產出影片的 keywords
+        :param progress_callback: callback(done, total, keyword)，每完成一個關鍵字呼叫一次 (於呼叫端執行緒)
+        :param cancel: set 之後各關鍵字不再翻頁，尚未開始的關鍵字不再搜尋，串流在進行中的頁面處理完後結束
+        """
+        keywords = list(keywords)
+        if not keywords:
+            return
+
+        finished = object()
+        results = queue.Queue()
+        stop = threading.Event()
+        store = DetailStore()
+
+        def worker(kw):
+            try:
+                if stop.is_set() or (cancel is not None and cancel.is_set()):
+                    return  # Queued behind other keywords when the consumer stopped
+                for item in self.iter_fetch(kw, settings, store, cancel):
+                    if stop.is_set():
+                        break
+                    results.put((kw, item))
+            except Exception as e:
+                logging.error(f"Keyword '{kw}' failed: {e}")
+            finally:
+                results.put((kw, finished))
+
+        merged = {}
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(keywords))) as pool:
+            for kw in keywords:
+                pool.submit(worker, kw)
+            try:
+                done = 0
+                while done < len(keywords):
+                    kw, item = results.get()
+                    if item is finished:
+                        done += 1
+                        if progress_callback:
+                            progress_callback(done, len(keywords), kw)
+                        continue
+                    if item['id'] in merged:
+                        merged[item['id']].keywords.append(kw)
+                        continue
+                    item['_keywords'] = [kw]
+                    record = VideoRecord.from_item(item)
+                    merged[item['id']] = record
+                    yield record
+            finally:
+                # The consumer may stop early; let workers wind down without further requests
+                stop.set()
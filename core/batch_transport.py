@@ -0,0 +1,103 @@
+import logging
+import time
+from config.key_manager import QUOTA_COSTS
+from config.settings import BATCH_MAX_REQUESTS
+
+class BatchTransport:
+    """
+    以 BatchHttpRequest 將多個 API 請求合併為少數幾次 HTTP 往返
+    每個子請求各自處理錯誤，只重送失敗的子請求：額度用盡時輪替 Key，暫時性錯誤依 client.retry 退避
+    """
+    def __init__(self, client, batch_size: int = BATCH_MAX_REQUESTS, labels: dict | None = None):
+        """
+        :param labels: {request_id: keyword}，統計時子請求歸屬的關鍵字
+        """
+        self.client = client
+        self.retry = client.retry
+        self.labels = labels or {}
+        self.batch_size = max(1, batch_size)
+        self.round_trips = 0
+
+    def run(self, jobs: dict) -> dict:
+        """
+        執行所有請求
+        :param jobs: {request_id: factory(service) -> HttpRequest}
+        :return: {request_id: response}，最終失敗的請求不會出現在結果中
+        """
+        results = {}
+        attempts = dict.fromkeys(jobs, 0)
+        rotations = 0
+        pending = list(jobs)
+
+        while pending:
+            service = self.client.service
+            if not service:
+                logging.error("No valid API Key available.")
+                break
+
+            requeue = []
+            backoff_attempt = 0
+            for start in range(0, len(pending), self.batch_size):
+                group = pending[start:start + self.batch_size]
+                errors = self._run_group(service, group, jobs, results)
+
+                quota_error = None
+                for request_id, error in errors.items():
+                    if self.retry.is_quota_error(error):
+                        # Quota failures are retried on the next key and do not use up the attempt budget
+                        quota_error = error
+                        requeue.append(request_id)
+                        self.client.metrics.incr("retries", reason="quota")
+                        continue
+                    attempts[request_id] += 1
+                    if self.retry.is_transient(error) and attempts[request_id] < self.retry.max_attempts:
+                        requeue.append(request_id)
+                        backoff_attempt = max(backoff_attempt, attempts[request_id])
+                        self.client.metrics.incr("retries", reason="transient")
+                    else:
+                        logging.error(f"Batch sub-request {request_id} failed: {error}")
+
+                if quota_error is not None:
+                    # Rotate right away so the remaining groups of this round use the new key
+                    if rotations >= len(self.client.key_manager.keys) or not self.client._handle_api_error(quota_error):
+                        logging.error("All API keys exhausted, dropping remaining batch requests")
+                        return results
+                    rotations += 1
+                    service = self.client.service
+
+            pending = requeue
+            if backoff_attempt:
+                time.sleep(self.retry.delay(backoff_attempt))
+
+        return results
+
+    def _run_group(self, service, group: list[str], jobs: dict, results: dict) -> dict:
+        """送出一個批次，回傳失敗子請求的錯誤"""
+        errors = {}
+
+        def on_response(request_id, response, exception):
+            if exception is None:
+                results[request_id] = response
+            else:
+                errors[request_id] = exception
+                self.client.metrics.incr("api_errors", status=exception.resp.status)
+
+        batch = service.new_batch_http_request(callback=on_response)
+        cost = 0
+        for request_id in group:
+            request = jobs[request_id](service)
+            request_cost = QUOTA_COSTS.get(request.methodId, 0)
+            cost += request_cost
+            self.client._instrument(request, request_cost, self.labels.get(request_id, self.client._keyword()))
+            batch.add(request, request_id=request_id)
+
+        try:
+            self.round_trips += 1
+            self.client._execute(batch, cost)
+        except Exception as e:
+            # The whole multipart call failed; every sub-request without an answer is retried
+            logging.warning(f"Batch request failed: {e}")
+            for request_id in group:
+                if request_id not in results:
+                    errors.setdefault(request_id, e)
+        return errors
@@ -0,0 +1,174 @@
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from config.settings import (
+    CACHE_FILE, CACHE_MAX_BYTES, CACHE_EVICT_RATIO, CACHE_TOUCH_INTERVAL, SEARCH_CACHE_TTL, VIDEO_CACHE_TTL, CHANNEL_CACHE_TTL
+)
+from core.sqlite_util import connect
+
+_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS responses (
+        key TEXT PRIMARY KEY,
+        kind TEXT NOT NULL,
+        payload TEXT NOT NULL,
+        size INTEGER NOT NULL,
+        created_at REAL NOT NULL,
+        accessed_at REAL NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses (accessed_at);
+"""
+
+
+class ResponseCache:
+    """
+    YouTube API 回應的本地快取 (SQLite)
+    以正規化後的請求參數為 Key，依類型套用不同 TTL，超過容量時淘汰最久未使用的項目
+    總容量在記憶體中累計，超過上限時才查詢實際大小並淘汰；命中時的使用時間先記在記憶體，
+    隨下一次寫入或每 CACHE_TOUCH_INTERVAL 秒一起寫回
+    """
+    def __init__(self, path=CACHE_FILE, ttls: dict | None = None, max_bytes: int = CACHE_MAX_BYTES):
+        self.path = path
+        self.ttls = {"search": SEARCH_CACHE_TTL, "video": VIDEO_CACHE_TTL, "channel": CHANNEL_CACHE_TTL}
+        if ttls:
+            self.ttls.update(ttls)
+        self.max_bytes = max_bytes
+        self.enabled = True   # False: bypass, never read or write
+        self.refresh = False  # True: ignore stored entries but store fresh responses
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._touched = {}       # key -> accessed_at not yet written
+        self._touched_since = 0.0
+        self._conn = connect(self.path, _SCHEMA, "Cache")
+        # Running payload total; other processes sharing the file are picked up when it crosses max_bytes
+        self._total = self._stored_bytes()
+
+    def _stored_bytes(self) -> int:
+        with self._lock:
+            try:
+                return self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+            except sqlite3.Error:
+                return 0
+
+    @staticmethod
+    def make_key(kind: str, params: dict) -> str:
+        """將請求參數正規化為快取 Key"""
+        normalized = {
+            k: (v.strip().lower() if isinstance(v, str) and k == "q" else v)
+            for k, v in params.items()
+            if v is not None
+        }
+        raw = json.dumps(normalized, sort_keys=True, ensure_ascii=False)
+        return f"{kind}:{hashlib.sha1(raw.encode('utf-8')).hexdigest()}"
+
+    def get(self, kind: str, params: dict):
+        """讀取快取，未命中或已過期回傳 None"""
+        if not self.enabled or self.refresh:
+            return None
+
+        key = self.make_key(kind, params)
+        now = time.time()
+        with self._lock:
+            try:
+                row = self._conn.execute(
+                    "SELECT payload, created_at FROM responses WHERE key = ?", (key,)
+                ).fetchone()
+                # Expired rows stay until the refetched response replaces them or eviction drops them
+                if row and now - row[1] <= self.ttls.get(kind, 0):
+                    if not self._touched:
+                        self._touched_since = now
+                    self._touched[key] = now
+                    if now - self._touched_since >= CACHE_TOUCH_INTERVAL:
+                        self._flush_touched()
+                        self._conn.commit()
+                    self.hits += 1
+                    return json.loads(row[0])
+            except sqlite3.Error as e:
+                logging.error(f"Cache read error: {e}")
+            self.misses += 1
+        return None
+
+    def put(self, kind: str, params: dict, value):
+        """寫入快取並在超過容量時淘汰舊項目"""
+        self.put_many(kind, [(params, value)])
+
+    def put_many(self, kind: str, entries: list[tuple[dict, object]]):
+        """以單一交易寫入多筆 (params, value)，例如一次詳情請求取得的所有影片"""
+        if not self.enabled or not entries:
+            return
+
+        now = time.time()
+        rows = []
+        for params, value in entries:
+            payload = json.dumps(value, ensure_ascii=False)
+            rows.append((self.make_key(kind, params), kind, payload, len(payload), now, now))
+        with self._lock:
+            try:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO responses (key, kind, payload, size, created_at, accessed_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    rows
+                )
+                # Replaced rows are counted twice until the next exact total
+                self._total += sum(row[3] for row in rows)
+                self._flush_touched()
+                if self._total > self.max_bytes:
+                    self._evict()
+                self._conn.commit()
+            except sqlite3.Error as e:
+                logging.error(f"Cache write error: {e}")
+
+    def _flush_touched(self):
+        """寫回累積的使用時間，由呼叫端 commit (需持有鎖)"""
+        if self._touched:
+            self._conn.executemany(
+                "UPDATE responses SET accessed_at = ? WHERE key = ?",
+                [(accessed, key) for key, accessed in self._touched.items()]
+            )
+            self._touched.clear()
+
+    def _evict(self):
+        """
+        以實際總容量為準，超過上限時刪除最久未使用的項目，直到低於上限的 CACHE_EVICT_RATIO (需持有鎖)
+        留下餘裕，之後的寫入不會每次都觸發淘汰
+        """
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total > self.max_bytes:
+            target = self.max_bytes * CACHE_EVICT_RATIO
+            doomed = []
+            for key, size in self._conn.execute("SELECT key, size FROM responses ORDER BY accessed_at"):
+                if total <= target:
+                    break
+                doomed.append((key,))
+                total -= size
+            self._conn.executemany("DELETE FROM responses WHERE key = ?", doomed)
+        self._total = total
+
+    def clear(self):
+        """清除所有快取"""
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+            self._touched.clear()
+            self._total = 0
+
+    def stats(self) -> dict:
+        """命中統計"""
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+    def close(self):
+        with self._lock:
+            try:
+                self._flush_touched()
+                self._conn.commit()
+            except sqlite3.Error as e:
+                logging.error(f"Cache write error: {e}")
+            self._conn.close()
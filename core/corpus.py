@@ -0,0 +1,171 @@
+import logging
+import os
+import threading
+import time
+from config.key_manager import atomic_write_json
+from core.data_processor import DataProcessor, _duration_seconds, _view_count
+from core.models import VideoRecord
+
+CORPUS_VERSION = 1
+
+
+class CandidateCorpus:
+    """
+    一次搜尋的所有候選影片 (過濾前的 videos().list 項目)
+    以欄位陣列 (觀看數、時長) 與各關鍵字的候選順序建立索引：搜尋條件 (關鍵字、天數、深度) 不變、
+    只改變篩選條件或數量限制時，在本地重新過濾即可得到與重新搜尋相同的結果，不必呼叫 API
+    """
+    # Settings that decide which candidates a search returns; anything else only filters them
+    SEARCH_FIELDS = ("days", "max_pages", "shards", "adaptive", "incremental")
+
+    def __init__(self, settings: dict):
+        self.keywords = list(settings.get('keywords', []))
+        self.search = self.search_params(settings)
+        self.created_at = time.time()
+        self._items = []          # row -> videos().list item
+        self._rows = {}           # video_id -> row
+        self._keyword_rows = {}   # keyword -> rows in search order
+        self._partial = set()     # keywords whose search stopped before max_pages
+        self._columns = None      # (views, seconds) arrays, rebuilt after add()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def search_params(cls, settings: dict) -> dict:
+        params = {k: settings.get(k) for k in cls.SEARCH_FIELDS}
+        params["keywords"] = [k.strip().casefold() for k in settings.get('keywords', [])]
+        return params
+
+    def matches(self, settings: dict) -> bool:
+        """settings 的搜尋條件 (關鍵字、天數、深度等) 是否與這次搜尋相同，篩選條件不影響"""
+        return self.search_params(settings) == self.search
+
+    def add(self, keyword: str, items: list[dict]):
+        """記錄關鍵字的候選影片 (依搜尋順序，可分多次加入)"""
+        with self._lock:
+            rows = self._keyword_rows.setdefault(keyword, [])
+            known = set(rows)
+            for item in items:
+                row = self._rows.get(item['id'])
+                if row is None:
+                    row = self._rows[item['id']] = len(self._items)
+                    # Kept by reference: card fields filled in later (two-phase projection) show up here too
+                    self._items.append(item)
+                if row not in known:
+                    known.add(row)
+                    rows.append(row)
+            self._columns = None
+
+    def update_views(self, view_counts: dict):
+        """以重新取得的觀看數 ({video_id: 觀看數}) 更新候選影片，之後的過濾使用新的數字"""
+        with self._lock:
+            for vid, views in view_counts.items():
+                row = self._rows.get(vid)
+                if row is not None:
+                    item = self._items[row]
+                    item['statistics'] = dict(item.get('statistics', {}), viewCount=str(views))
+            self._columns = None
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._items)
+
+    def _index(self):
+        """觀看數與時長的欄位陣列，加入新候選後第一次查詢時重建 (需持有鎖)"""
+        if self._columns is None:
+            import numpy as np
+            count = len(self._items)
+            views = np.fromiter(
+                (_view_count(item.get('statistics', {}).get('viewCount', 0)) for item in self._items),
+                dtype=np.int64, count=count
+            )
+            seconds = np.fromiter(
+                (_duration_seconds(item.get('contentDetails', {}).get('duration', 'PT0S')) for item in self._items),
+                dtype=np.int64, count=count
+            )
+            self._columns = views, seconds
+        return self._columns
+
+    def mark_partial(self, keyword: str):
+        """關鍵字的搜尋提早停止 (達到數量限制或自動調整深度)，之後的頁面不在候選中"""
+        with self._lock:
+            self._partial.add(keyword)
+
+    def query(self, settings: dict, complete=None) -> list[VideoRecord] | None:
+        """
+        以 settings 的篩選條件 (min_views, max_duration, limit) 重新過濾，結果與重新搜尋相同：
+        依關鍵字順序，每個關鍵字取前 limit 部通過的影片，同一部影片只出現一次並標記所有符合的關鍵字
+        :param complete: callback(items)，補上缺少的卡片欄位 (例如 client.complete_cards)；
+                         兩階段模式下原本未通過篩選的影片只有過濾所需的欄位
+        :return: 提早停止的關鍵字在候選中湊不滿 limit 部時為 None (需要重新搜尋)
+        """
+        import numpy as np
+        min_views = settings.get('min_views', 100000)
+        max_duration = settings.get('max_duration', 60)
+        limit = settings.get('limit', 50)
+        with self._lock:
+            views, seconds = self._index()
+            passed = (views >= min_views) & (seconds <= max_duration) & (seconds <= 60)
+            picked = {}
+            for kw in self.keywords:
+                rows = np.asarray(self._keyword_rows.get(kw, []), dtype=np.int64)
+                picked[kw] = [self._items[row] for row in rows[passed[rows]][:limit].tolist()]
+                if kw in self._partial and len(picked[kw]) < limit:
+                    # The pages the search skipped might have held more matches
+                    return None
+
+        if complete is not None:
+            missing = {item['id']: item for items in picked.values() for item in items
+                       if 'title' not in item.get('snippet', {})}
+            if missing:
+                complete(list(missing.values()))
+
+        merged = {}
+        for kw, items in picked.items():
+            # Copies: process_batch and the keyword merge write into the items
+            for item in DataProcessor.process_batch([dict(item) for item in items], min_views, max_duration):
+                if item['id'] in merged:
+                    merged[item['id']]['_keywords'].append(kw)
+                else:
+                    item['_keywords'] = [kw]
+                    merged[item['id']] = item
+        return [VideoRecord.from_item(item) for item in merged.values()]
+
+    def save(self, path):
+        """寫入磁碟 (JSON)，下次啟動時可以 load 後直接重新過濾"""
+        with self._lock:
+            data = {
+                "version": CORPUS_VERSION,
+                "created_at": self.created_at,
+                "keywords": self.keywords,
+                "search": self.search,
+                "items": [{k: v for k, v in item.items() if not k.startswith('_')} for item in self._items],
+                "keyword_rows": self._keyword_rows,
+                "partial": sorted(self._partial),
+            }
+        try:
+            atomic_write_json(path, data)
+        except OSError as e:
+            logging.warning(f"Failed to save candidate corpus: {e}")
+
+    @classmethod
+    def load(cls, path) -> "CandidateCorpus | None":
+        """讀取 save 寫入的檔案，沒有檔案或格式不符時為 None"""
+        if not path or not os.path.exists(path):
+            return None
+        import json
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get("version") != CORPUS_VERSION:
+                return None
+            corpus = cls({"keywords": data["keywords"]})
+            corpus.search = data["search"]
+            corpus.created_at = data["created_at"]
+            corpus._items = data["items"]
+            corpus._rows = {item['id']: row for row, item in enumerate(corpus._items)}
+            corpus._keyword_rows = data["keyword_rows"]
+            corpus._partial = set(data["partial"])
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logging.warning(f"Candidate corpus {path} unreadable ({e}), ignoring it")
+            return None
+        return corpus
@@ -1,12 +1,43 @@
-import isodate
+import re
 from datetime import datetime, timezone
+from functools import lru_cache
 import logging
 from config.settings import DEFAULT_MIN_VIEWS, DEFAULT_MAX_DURATION
 
+# Shorts durations are almost always plain "PT#M#S"; anything else falls back to isodate
+_SIMPLE_DURATION_RE = re.compile(r"^PT(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?$")
+# The two layouts calculate_days_ago accepts
+_PUBLISHED_AT_PATTERN = r"^\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}(?:\.\d+)?Z$"
+
+FLAME_LEVELS = [(10_000_000, "🔥🔥🔥"), (1_000_000, "🔥🔥"), (500_000, "🔥")]
+
+
+@lru_cache(maxsize=4096)
+def _duration_seconds(duration_str: str) -> int:
+    """parse_iso_duration 的快速版本 (正規表示式 + 快取)"""
+    match = _SIMPLE_DURATION_RE.match(duration_str)
+    if match:
+        hours, minutes, seconds = (int(g) if g else 0 for g in match.groups())
+        return hours * 3600 + minutes * 60 + seconds
+    return DataProcessor.parse_iso_duration(duration_str)
+
+
+@lru_cache(maxsize=4096)
+def _formatted_duration(seconds: int) -> str:
+    return DataProcessor.format_duration(seconds)
+
+
+def _view_count(value) -> int:
+    try:
+        return int(value)
+    except (ValueError, TypeError):
+        return 0
+
 class DataProcessor:
     @staticmethod
     def parse_iso_duration(duration_str: str) -> int:
         """解析 ISO 8601 時長格式為秒數"""
+        import isodate  # Only non-"PT#M#S" durations get here, so load it on first use
         try:
             td = isodate.parse_duration(duration_str)
             return int(td.total_seconds())
@@ -51,12 +82,9 @@ class DataProcessor:
     @staticmethod
     def get_flame_rating(view_count: int) -> str:
         """取得火焰評級"""
-        if view_count >= 10_000_000:
-            return "🔥🔥🔥"
-        elif view_count >= 1_000_000:
-            return "🔥🔥"
-        elif view_count >= 500_000:
-            return "🔥"
+        for threshold, rating in FLAME_LEVELS:
+            if view_count >= threshold:
+                return rating
         return ""
 
     @staticmethod
@@ -92,3 +120,69 @@ class DataProcessor:
             return False
             
         return True
+
+    @staticmethod
+    def process_batch(items: list[dict], min_views: int = DEFAULT_MIN_VIEWS, max_duration: int = DEFAULT_MAX_DURATION,
+                      only_shorts: bool = True, now: datetime | None = None, metrics=None) -> list[dict]:
+        """
+        批次過濾與計算欄位，結果與逐筆呼叫 filter_video 及各計算函式相同
+        以欄位陣列一次處理：時長以快取解析，發布時間以單一「現在」時間一次轉換
+        :param now: 計算天數的基準時間 (預設為目前 UTC 時間)
+        :param metrics: core.metrics.Metrics，記錄各規則淘汰的影片數 (以第一個未通過的規則計)
+        :return: 通過過濾的影片 (維持原順序)，並加上 _daily_views / _rating / _duration_sec / _formatted_duration
+        """
+        count = len(items)
+        if not count:
+            return []
+        # Heavy imports wait for the first batch so the app starts without them
+        import numpy as np
+        import pandas as pd
+
+        views = np.fromiter(
+            (_view_count(item.get('statistics', {}).get('viewCount', 0)) for item in items),
+            dtype=np.int64, count=count
+        )
+        seconds = np.fromiter(
+            (_duration_seconds(item.get('contentDetails', {}).get('duration', 'PT0S')) for item in items),
+            dtype=np.int64, count=count
+        )
+
+        views_ok = views >= min_views
+        duration_ok = seconds <= max_duration
+        mask = views_ok & duration_ok
+        if only_shorts:
+            mask &= seconds <= 60
+        kept = np.flatnonzero(mask)
+        if metrics is not None:
+            metrics.incr("items_checked", count)
+            metrics.incr("items_filtered", int((~views_ok).sum()), rule="min_views")
+            metrics.incr("items_filtered", int((views_ok & ~duration_ok).sum()), rule="max_duration")
+            metrics.incr("items_filtered", int((views_ok & duration_ok & ~mask).sum()), rule="only_shorts")
+        if not len(kept):
+            return []
+
+        # Unsupported timestamp layouts become NaT and count as 1 day, like calculate_days_ago
+        published = pd.Series([items[i].get('snippet', {}).get('publishedAt', '') for i in kept], dtype=object)
+        published = published.where(published.str.match(_PUBLISHED_AT_PATTERN, na=False))
+        pub_dates = pd.to_datetime(published, format="ISO8601", utc=True, errors="coerce")
+        now_ts = pd.Timestamp(now) if now is not None else pd.Timestamp.now(tz=timezone.utc)
+        days = ((now_ts - pub_dates) // pd.Timedelta(days=1)).fillna(1).clip(lower=1).to_numpy(dtype=np.int64)
+
+        kept_views = views[kept]
+        daily_views = kept_views / days
+        ratings = np.select(
+            [kept_views >= threshold for threshold, _ in FLAME_LEVELS],
+            [rating for _, rating in FLAME_LEVELS],
+            default=""
+        )
+
+        results = []
+        for pos, i in enumerate(kept.tolist()):
+            item = items[i]
+            duration_sec = int(seconds[i])
+            item['_daily_views'] = float(daily_views[pos])
+            item['_rating'] = str(ratings[pos])
+            item['_duration_sec'] = duration_sec
+            item['_formatted_duration'] = _formatted_duration(duration_sec)
+            results.append(item)
+        return results
@@ -0,0 +1,178 @@
+"""
+重複上傳偵測：爆紅的 Shorts 常被許多頻道重新上傳，結果的前幾百名可能大多是同幾支影片的拷貝
+以標題的 MinHash 簽章與 LSH 分桶找出候選配對 (耗時與結果數約成線性，不必兩兩比較標題)，
+再以標題相似度、時長與發布時間確認，每組拷貝合併為一張代表卡片
+
+    records = collapse_duplicates(records)  # 代表影片的 duplicate_ids 為同組的其他影片
+"""
+import re
+import unicodedata
+from dataclasses import replace
+from config.settings import (
+    DEDUP_NUM_PERM, DEDUP_BANDS, DEDUP_SHINGLE, DEDUP_MIN_TITLE_CHARS, DEDUP_SIMILARITY, DEDUP_LOOSE_SIMILARITY,
+    DEDUP_DURATION_GAP, DEDUP_PUBLISH_GAP, DEDUP_BUCKET_WINDOW
+)
+from core.models import VideoRecord
+
+_HASHTAG_RE = re.compile(r"#\S+")
+_NON_WORD_RE = re.compile(r"[\W_]+")  # Punctuation, symbols and emoji
+# Odd 64-bit multipliers; uint64 arithmetic wraps, which both hashes rely on
+_SHINGLE_MIX = 0x100000001B3
+_BAND_MIX = 0x9E3779B97F4A7C15
+# Candidate pairs verified per block, bounding the (signature rows x pairs) comparison array
+_VERIFY_BLOCK = 100_000
+
+
+def normalize_title(title: str) -> str:
+    """比較用的標題：全形轉半形、不分大小寫，去除 hashtag、標點與表情符號"""
+    title = unicodedata.normalize("NFKC", title).casefold()
+    return _NON_WORD_RE.sub(" ", _HASHTAG_RE.sub(" ", title)).strip()
+
+
+def shingle_hashes(titles: list[str], size: int = DEDUP_SHINGLE):
+    """
+    所有標題正規化後的字元 n-gram (中文標題沒有空白可以分詞)，以 32 位元雜湊表示，依標題順序串接
+    正規化後太短的標題 (例如只有 hashtag) 沒有 n-gram，不與任何影片比對
+    :return: (雜湊陣列, 每個標題的 n-gram 數)
+    """
+    import numpy as np
+    texts = [normalize_title(title) for title in titles]
+    texts = [text if len(text) >= max(size, DEDUP_MIN_TITLE_CHARS) else "" for text in texts]
+    lengths = np.fromiter(map(len, texts), dtype=np.int64, count=len(texts))
+    codes = np.frombuffer("".join(texts).encode("utf-32-le"), dtype=np.uint32).astype(np.uint64)
+    counts = np.where(lengths > 0, lengths - size + 1, 0)
+
+    # Start of every n-gram in the joined code points, never crossing into the next title
+    first = np.repeat(np.cumsum(lengths) - lengths, counts)
+    offset = np.arange(int(counts.sum())) - np.repeat(np.cumsum(counts) - counts, counts)
+    positions = first + offset
+    hashes = np.zeros(len(positions), dtype=np.uint64)
+    for k in range(size):
+        hashes = hashes * np.uint64(_SHINGLE_MIX) + codes[positions + k]
+    return (hashes ^ (hashes >> np.uint64(32))) & np.uint64(0xFFFFFFFF), counts
+
+
+def minhash_signatures(hashes, counts, num_perm: int = DEDUP_NUM_PERM, seed: int = 0):
+    """
+    每個標題的 MinHash 簽章 (num_perm x 標題數的 uint32 陣列)，counts 都必須大於 0
+    兩個簽章相同位置的比例即兩組 n-gram 集合 Jaccard 相似度的估計值
+    """
+    import numpy as np
+    rng = np.random.default_rng(seed)
+    # Multiply-shift hashing: the high 32 bits of a * x + b (mod 2**64), a odd
+    a = rng.integers(0, 1 << 63, num_perm, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+    b = rng.integers(0, 1 << 63, num_perm, dtype=np.uint64)
+    starts = np.cumsum(counts) - counts
+
+    signatures = np.empty((num_perm, len(counts)), dtype=np.uint32)
+    for row in range(num_perm):
+        # One permutation at a time keeps memory at one hash per n-gram
+        signatures[row] = np.minimum.reduceat((a[row] * hashes + b[row]) >> np.uint64(32), starts)
+    return signatures
+
+
+def candidate_pairs(signatures, bands: int = DEDUP_BANDS, window: int = DEDUP_BUCKET_WINDOW):
+    """
+    LSH：簽章切成 bands 段，任一段完全相同的標題成為候選配對
+    同一桶內只與排序後前 window 個成員配對 (一組拷貝仍會串成一個群組)，桶再大也維持線性
+    :return: (2, 配對數) 的欄索引陣列，每組配對只出現一次且 [0] < [1]
+    """
+    import numpy as np
+    rows = signatures.shape[0] // bands
+    count = signatures.shape[1]
+    found = [np.empty((2, 0), dtype=np.int64)]
+    for band in range(bands):
+        keys = np.zeros(count, dtype=np.uint64)
+        for row in signatures[band * rows:(band + 1) * rows]:
+            keys = keys * np.uint64(_BAND_MIX) + row
+        order = np.argsort(keys, kind='stable')
+        sorted_keys = keys[order]
+        for step in range(1, window + 1):
+            same = sorted_keys[step:] == sorted_keys[:-step]
+            if not same.any():
+                break  # Sorted, so no bucket has more than `step` members
+            found.append(np.stack([order[:-step][same], order[step:][same]]))
+    pairs = np.sort(np.concatenate(found, axis=1), axis=0)
+    unique = np.unique(pairs[0] * count + pairs[1])
+    return np.stack([unique // count, unique % count])
+
+
+def _published_seconds(records: list[VideoRecord]):
+    """發布時間 (epoch 秒)，無法解析時為 NaN (不算發布時間相近)"""
+    import numpy as np
+    import pandas as pd
+    published = pd.to_datetime(pd.Series([v.published_at for v in records], dtype=object),
+                               format="ISO8601", utc=True, errors="coerce")
+    return (published - pd.Timestamp(0, tz="UTC")).dt.total_seconds().to_numpy(dtype=np.float64)
+
+
+def find_duplicates(records: list[VideoRecord]) -> list[list[int]]:
+    """
+    找出互為拷貝的影片群組：時長相差不超過 DEDUP_DURATION_GAP 秒，且標題相似度達 DEDUP_SIMILARITY，
+    或達 DEDUP_LOOSE_SIMILARITY 並在 DEDUP_PUBLISH_GAP 內發布
+    :return: 各群組的索引 (依 records 順序，至少兩部影片)
+    """
+    import numpy as np
+    hashes, counts = shingle_hashes([v.title for v in records])
+    indexed = np.flatnonzero(counts).tolist()
+    if len(indexed) < 2:
+        return []
+    signatures = minhash_signatures(hashes, counts[indexed])
+    left, right = candidate_pairs(signatures)
+
+    subset = [records[i] for i in indexed]
+    durations = np.fromiter((v.duration_sec for v in subset), dtype=np.int64, count=len(subset))
+    published = _published_seconds(subset)
+
+    def verify(i, j):
+        similarity = (signatures[:, i] == signatures[:, j]).mean(axis=0)
+        same_length = np.abs(durations[i] - durations[j]) <= DEDUP_DURATION_GAP
+        with np.errstate(invalid='ignore'):
+            close = np.abs(published[i] - published[j]) <= DEDUP_PUBLISH_GAP
+        ok = same_length & ((similarity >= DEDUP_SIMILARITY) | ((similarity >= DEDUP_LOOSE_SIMILARITY) & close))
+        return ok, similarity
+
+    accepted, scores = [np.empty((2, 0), dtype=np.int64)], [np.empty(0)]
+    for start in range(0, len(left), _VERIFY_BLOCK):
+        i, j = left[start:start + _VERIFY_BLOCK], right[start:start + _VERIFY_BLOCK]
+        ok, similarity = verify(i, j)
+        accepted.append(np.stack([i[ok], j[ok]]))
+        scores.append(similarity[ok])
+    accepted = np.concatenate(accepted, axis=1)[:, np.argsort(-np.concatenate(scores), kind='stable')]
+
+    # Union-find, closest pairs first; two groups only merge when their first members match as well,
+    # so a chain of small title edits cannot drift into an unrelated video
+    parent = list(range(len(indexed)))
+
+    def find(x):
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    for i, j in accepted.T.tolist():
+        ri, rj = find(i), find(j)
+        if ri != rj and (ri in (i, j) and rj in (i, j) or verify(ri, rj)[0]):
+            parent[max(ri, rj)] = min(ri, rj)
+    groups = {}
+    for pos, idx in enumerate(indexed):
+        groups.setdefault(find(pos), []).append(idx)
+    return [members for members in groups.values() if len(members) > 1]
+
+
+def collapse_duplicates(records: list[VideoRecord]) -> list[VideoRecord]:
+    """
+    每組拷貝只保留觀看數最高的影片 (複本，duplicate_ids 為同組的其他影片)，放在該組最早出現的位置
+    其他影片維持原順序；records 本身不會被修改
+    """
+    chosen = {}
+    for members in find_duplicates(records):
+        best = max(members, key=lambda i: (records[i].view_count, -i))
+        chosen[members[0]] = replace(records[best], duplicate_ids=[records[i].id for i in members if i != best])
+        chosen.update((i, None) for i in members[1:])
+    collapsed = []
+    for i, vid in enumerate(records):
+        vid = chosen.get(i, vid)
+        if vid is not None:
+            collapsed.append(vid)
+    return collapsed
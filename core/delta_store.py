@@ -0,0 +1,76 @@
+import json
+import logging
+import sqlite3
+import threading
+import time
+from config.settings import DELTA_FILE, DELTA_RETENTION_DAYS
+from core.sqlite_util import connect
+
+_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS delta_state (
+        key TEXT PRIMARY KEY,
+        searched_at REAL NOT NULL,
+        items TEXT NOT NULL
+    );
+"""
+
+
+class DeltaStore:
+    """
+    增量更新的狀態 (SQLite)
+    每個「關鍵字 + 天數」記錄上次搜尋的時間與所有候選影片的詳細資訊；
+    下次只搜尋之後新發布的影片，已知的影片只重新取得 statistics，其餘欄位沿用
+    """
+    def __init__(self, path=DELTA_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = connect(self.path, _SCHEMA, "Delta state")
+        self.prune()
+
+    @staticmethod
+    def make_key(keyword: str, days: int) -> str:
+        return f"{keyword.strip().lower()}|{days}"
+
+    def load(self, key: str) -> tuple[float, dict] | None:
+        """
+        :return: (上次搜尋的時間戳記, {video_id: videos().list 項目})，沒有紀錄時為 None
+        """
+        with self._lock:
+            try:
+                row = self._conn.execute(
+                    "SELECT searched_at, items FROM delta_state WHERE key = ?", (key,)
+                ).fetchone()
+            except sqlite3.Error as e:
+                logging.error(f"Delta state read error: {e}")
+                return None
+        if row is None:
+            return None
+        try:
+            return row[0], json.loads(row[1])
+        except ValueError:
+            return None
+
+    def save(self, key: str, searched_at: float, items: dict):
+        with self._lock:
+            try:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO delta_state (key, searched_at, items) VALUES (?, ?, ?)",
+                    (key, searched_at, json.dumps(items, ensure_ascii=False))
+                )
+                self._conn.commit()
+            except sqlite3.Error as e:
+                logging.error(f"Delta state write error: {e}")
+
+    def prune(self, retention_days: int = DELTA_RETENTION_DAYS):
+        """刪除太久沒有更新的狀態"""
+        with self._lock:
+            try:
+                self._conn.execute("DELETE FROM delta_state WHERE searched_at < ?",
+                                   (time.time() - retention_days * 86400,))
+                self._conn.commit()
+            except sqlite3.Error as e:
+                logging.error(f"Delta state prune error: {e}")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,57 @@
+import threading
+
+class DetailStore:
+    """
+    單次搜尋共用的影片詳細資訊儲存區
+    各關鍵字的搜尋結果先在此去重，只有尚未取得的 Video ID 才會送出 videos().list
+    """
+    def __init__(self):
+        self._items = {}      # video_id -> videos().list item
+        self._inflight = {}   # video_id -> Event, set once its chunk has been fetched
+        self._lock = threading.Lock()
+        self.requested = 0    # IDs asked for by callers (with duplicates)
+        self.fetched = 0      # IDs actually sent to the API
+
+    def fetch(self, client, video_ids: list[str]):
+        """
+        取得尚未存在的影片資訊；其他執行緒正在取得的 ID 會等待其完成而非重複呼叫
+        :param client: YouTubeAPIClient，使用其 get_video_details 分批 (50 筆) 取得
+        """
+        wait_for = []
+        new_ids = []
+        with self._lock:
+            self.requested += len(video_ids)
+            for vid in dict.fromkeys(video_ids):
+                if vid in self._inflight:
+                    wait_for.append(self._inflight[vid])
+                else:
+                    self._inflight[vid] = threading.Event()
+                    new_ids.append(vid)
+            self.fetched += len(new_ids)
+
+        try:
+            # new_ids is contiguous, so every chunk except the last one is a full 50
+            items = client.get_video_details(new_ids) if new_ids else []
+            with self._lock:
+                for item in items:
+                    self._items[item["id"]] = item
+        finally:
+            with self._lock:
+                for vid in new_ids:
+                    self._inflight[vid].set()
+
+        for event in wait_for:
+            event.wait()
+
+    def items_for(self, video_ids: list[str]) -> list[dict]:
+        """依輸入順序回傳已取得的影片 (每個 ID 只出現一次)"""
+        with self._lock:
+            return [self._items[vid] for vid in dict.fromkeys(video_ids) if vid in self._items]
+
+    def __contains__(self, video_id: str) -> bool:
+        with self._lock:
+            return video_id in self._items
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._items)
@@ -0,0 +1,216 @@
+"""
+搜尋結果匯出：CSV、NDJSON (JSON Lines)、Parquet 與獨立的 HTML 報告
+結果以 chunk 為單位轉換並寫出，記憶體用量只與 chunk 大小有關，與結果數無關；
+records 可以是任何 VideoRecord 的可迭代物件 (例如 iter_fetch_many 的串流)
+
+    with open("results.csv", "wb") as f:
+        write_export(records, f, "csv", columns=["id", "title", "view_count"])
+
+    for chunk in iter_export(records, "parquet"):  # bytes
+        ...
+"""
+import csv
+import html
+import io
+import json
+import time
+from collections.abc import Iterable, Iterator
+from itertools import islice
+from config.settings import APP_VERSION, EXPORT_CHUNK_SIZE, STYLE_FILE
+from core.models import VideoRecord
+from core.result_view import card_html
+
+# Format -> (MIME type, file extension)
+EXPORT_FORMATS = {
+    "csv": ("text/csv", ".csv"),
+    "ndjson": ("application/x-ndjson", ".ndjson"),
+    "parquet": ("application/vnd.apache.parquet", ".parquet"),
+    "html": ("text/html", ".html"),
+}
+
+# Exportable column -> Parquet type name (see _arrow_schema); VideoRecord fields plus derived values
+EXPORT_COLUMNS = {
+    "id": "string",
+    "title": "string",
+    "url": "string",
+    "channel_id": "string",
+    "channel_title": "string",
+    "channel_url": "string",
+    "thumbnail_url": "string",
+    "published_at": "string",
+    "view_count": "int64",
+    "duration_sec": "int64",
+    "formatted_duration": "string",
+    "daily_views": "float64",
+    "rating": "string",
+    "keywords": "list",
+    "views_per_hour": "float64",
+    "subscriber_count": "int64",
+    "views_per_subscriber": "float64",
+    "copies": "int64",
+    "duplicate_ids": "list",
+}
+
+
+def record_row(vid: VideoRecord, columns: list[str]) -> dict:
+    return {column: getattr(vid, column) for column in columns}
+
+
+def _chunks(records: Iterable[VideoRecord], chunk_size: int) -> Iterator[list[VideoRecord]]:
+    iterator = iter(records)
+    while True:
+        chunk = list(islice(iterator, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _check_columns(columns: list[str] | None) -> list[str]:
+    if not columns:
+        return list(EXPORT_COLUMNS)
+    unknown = [c for c in columns if c not in EXPORT_COLUMNS]
+    if unknown:
+        raise ValueError(f"Unknown export columns: {unknown}")
+    return list(columns)
+
+
+def iter_export(records: Iterable[VideoRecord], fmt: str, columns: list[str] | None = None,
+                chunk_size: int = EXPORT_CHUNK_SIZE, title: str = "") -> Iterator[bytes]:
+    """
+    逐段產出匯出檔的內容
+    :param columns: 匯出的欄位與順序 (EXPORT_COLUMNS 的子集)，None 表示全部；HTML 報告固定為結果卡片
+    :param title: HTML 報告的標題 (例如搜尋的關鍵字)
+    """
+    columns = _check_columns(columns)
+    if fmt == "csv":
+        return _iter_csv(records, columns, chunk_size)
+    if fmt == "ndjson":
+        return _iter_ndjson(records, columns, chunk_size)
+    if fmt == "parquet":
+        return _iter_parquet(records, columns, chunk_size)
+    if fmt == "html":
+        return _iter_html(records, chunk_size, title)
+    raise ValueError(f"Unknown export format '{fmt}', expected one of {list(EXPORT_FORMATS)}")
+
+
+def write_export(records: Iterable[VideoRecord], file, fmt: str, columns: list[str] | None = None,
+                 chunk_size: int = EXPORT_CHUNK_SIZE, title: str = "") -> int:
+    """
+    寫入匯出檔
+    :param file: 以二進位模式開啟的檔案 (或 BytesIO)
+    :return: 寫入的位元組數
+    """
+    written = 0
+    for data in iter_export(records, fmt, columns, chunk_size, title):
+        file.write(data)
+        written += len(data)
+    return written
+
+
+def _iter_csv(records, columns, chunk_size):
+    # BOM so Excel opens Chinese titles as UTF-8
+    yield "\ufeff".encode("utf-8")
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    for chunk in _chunks(records, chunk_size):
+        for vid in chunk:
+            writer.writerow([
+                "; ".join(value) if isinstance(value, list) else ("" if value is None else value)
+                for value in (getattr(vid, column) for column in columns)
+            ])
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+
+
+def _iter_ndjson(records, columns, chunk_size):
+    for chunk in _chunks(records, chunk_size):
+        yield "".join(
+            json.dumps(record_row(vid, columns), ensure_ascii=False) + "\n" for vid in chunk
+        ).encode("utf-8")
+
+
+class _ChunkSink:
+    """Parquet 的輸出目標：保留位置計數 (檔尾索引需要絕對位移)，但寫入的資料交給呼叫端後即釋放"""
+    def __init__(self):
+        self.closed = False
+        self._parts = []
+        self._position = 0
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._parts.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def writable(self) -> bool:
+        return True
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def take(self) -> bytes:
+        data = b"".join(self._parts)
+        self._parts = []
+        return data
+
+
+def _arrow_schema(columns: list[str]):
+    import pyarrow as pa
+    types = {"string": pa.string(), "int64": pa.int64(), "float64": pa.float64(), "list": pa.list_(pa.string())}
+    return pa.schema([(column, types[EXPORT_COLUMNS[column]]) for column in columns])
+
+
+def _iter_parquet(records, columns, chunk_size):
+    """每個 chunk 一個 row group"""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise RuntimeError("Parquet export requires pyarrow (pip install pyarrow)") from e
+
+    schema = _arrow_schema(columns)
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(pa.PythonFile(sink, mode='w'), schema)
+    try:
+        for chunk in _chunks(records, chunk_size):
+            writer.write_table(pa.Table.from_pylist([record_row(vid, columns) for vid in chunk], schema=schema))
+            yield sink.take()
+    finally:
+        writer.close()
+    yield sink.take()
+
+
+def _iter_html(records, chunk_size, title):
+    """單一 HTML 檔 (樣式內嵌)，卡片與網頁版相同"""
+    heading = html.escape(f"YouTube Shorts 爆款報告{' - ' + title if title else ''}")
+    yield f"""<!DOCTYPE html>
+<html lang="zh-Hant">
+<head>
+<meta charset="utf-8">
+<title>{heading}</title>
+<style>
+body {{ font-family: sans-serif; max-width: 960px; margin: 0 auto; padding: 20px; }}
+{STYLE_FILE.read_text(encoding='utf-8')}
+</style>
+</head>
+<body>
+<h1>{heading}</h1>
+<p style="color: gray;">產生時間: {time.strftime('%Y-%m-%d %H:%M')} · Version {APP_VERSION}</p>
+""".encode("utf-8")
+    count = 0
+    for chunk in _chunks(records, chunk_size):
+        count += len(chunk)
+        yield "\n".join(card_html(vid) for vid in chunk).encode("utf-8")
+    yield f"""
+<p style="color: gray;">共 {count:,} 部影片</p>
+</body>
+</html>
+""".encode("utf-8")
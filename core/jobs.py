@@ -0,0 +1,175 @@
+import itertools
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from config.settings import JOB_MAX_WORKERS, JOB_HISTORY
+
+# Job states
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED_STATES = (DONE, FAILED, CANCELLED)
+
+
+class JobCancelled(Exception):
+    """工作被取消時由 Job.check_cancelled 拋出，讓同步執行的步驟提早結束"""
+
+
+class Job:
+    """
+    背景工作的狀態、進度與目前為止的結果
+    執行中的函式以 set_progress / add_results 更新，UI 以 snapshot 讀取 (多執行緒共用)
+    """
+    def __init__(self, job_id: str, name: str):
+        self.id = job_id
+        self.name = name
+        self.state = PENDING
+        self.message = ""
+        self.done = 0
+        self.total = 0
+        self.error = ""
+        self.summary = {}  # Set by the job function when it finishes
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self._results = []
+        self._lock = threading.Lock()
+        self._cancel = threading.Event()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel.is_set()
+
+    @property
+    def cancel_event(self) -> threading.Event:
+        """要求取消時 set 的 Event，交給在請求之間自行檢查的步驟 (例如 fetch_many 的 cancel)"""
+        return self._cancel
+
+    @property
+    def finished(self) -> bool:
+        return self.state in FINISHED_STATES
+
+    def cancel(self):
+        """要求取消；執行中的函式在下一次檢查時停止"""
+        self._cancel.set()
+        with self._lock:
+            if self.state == PENDING:
+                self.state = CANCELLED
+                self.finished_at = time.time()
+
+    def _start(self) -> bool:
+        """標記為執行中；排隊時已被取消則回傳 False"""
+        with self._lock:
+            if self.state != PENDING:
+                return False
+            self.state = RUNNING
+            self.started_at = time.time()
+            return True
+
+    def _finish(self, state: str, error: str = ""):
+        with self._lock:
+            self.state = state
+            self.error = error
+            self.finished_at = time.time()
+
+    def check_cancelled(self):
+        if self._cancel.is_set():
+            raise JobCancelled(self.id)
+
+    def set_progress(self, done: int, total: int, message: str = ""):
+        with self._lock:
+            self.done, self.total = done, total
+            if message:
+                self.message = message
+
+    def add_results(self, items: list):
+        with self._lock:
+            self._results.extend(items)
+
+    def results(self) -> list:
+        """目前為止的結果 (複本)"""
+        with self._lock:
+            return list(self._results)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "id": self.id,
+                "name": self.name,
+                "state": self.state,
+                "message": self.message,
+                "done": self.done,
+                "total": self.total,
+                "results": len(self._results),
+                "error": self.error,
+                "elapsed": ((self.finished_at or time.time()) - self.started_at) if self.started_at else 0.0,
+            }
+
+
+class JobManager:
+    """
+    背景工作池與工作登記表 (行程共用)
+    工作在自己的執行緒中執行，不受 Streamlit 重新執行腳本影響；已結束的工作保留最近 history 筆供查詢
+    """
+    def __init__(self, max_workers: int = JOB_MAX_WORKERS, history: int = JOB_HISTORY):
+        self.history = history
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job")
+        self._jobs = {}  # job id -> Job, in submission order
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def submit(self, fn, name: str) -> Job:
+        """
+        排入工作
+        :param fn: fn(job)，回傳值作為最終結果附加到 job (也可以在執行中自行 add_results)
+        """
+        with self._lock:
+            job = Job(f"job-{next(self._ids)}", name)
+            self._jobs[job.id] = job
+            self._prune()
+        self._pool.submit(self._run, job, fn)
+        return job
+
+    def _run(self, job: Job, fn):
+        if not job._start():
+            return  # Cancelled while queued
+        try:
+            result = fn(job)
+            if result:
+                job.add_results(result)
+            job._finish(CANCELLED if job.cancelled else DONE)
+        except JobCancelled:
+            job._finish(CANCELLED)
+        except Exception as e:
+            logging.exception(f"Job {job.id} ({job.name}) failed")
+            job._finish(FAILED, str(e) or type(e).__name__)
+
+    def _prune(self):
+        """只保留最近 history 筆已結束的工作 (需持有鎖)"""
+        finished = [job_id for job_id, job in self._jobs.items() if job.finished]
+        for job_id in finished[:max(0, len(finished) - self.history)]:
+            del self._jobs[job_id]
+
+    def get(self, job_id: str) -> Job | None:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def jobs(self) -> list[Job]:
+        with self._lock:
+            return list(self._jobs.values())
+
+    def cancel(self, job_id: str) -> bool:
+        job = self.get(job_id)
+        if job is None or job.finished:
+            return False
+        job.cancel()
+        return True
+
+    def shutdown(self, cancel: bool = True):
+        if cancel:
+            for job in self.jobs():
+                job.cancel()
+        self._pool.shutdown(wait=True)
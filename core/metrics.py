@@ -0,0 +1,115 @@
+import json
+import threading
+import time
+from contextlib import contextmanager
+
+# Prefix for exported Prometheus metric names
+PROMETHEUS_PREFIX = "yt_shorts_"
+
+
+class Metrics:
+    """
+    執行期間的統計 (多執行緒共用)
+    計數器以名稱加標籤區分 (例如 api_calls{method, keyword})，各階段記錄累計耗時與次數
+    可輸出為 JSON 或 Prometheus 文字格式
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {}  # (name, ((label, value), ...)) -> value
+        self._stages = {}    # stage -> [calls, seconds, max seconds]
+
+    def incr(self, name: str, value: float = 1, **labels):
+        """累加計數器"""
+        if not value:
+            return
+        series = (name, tuple(sorted((k, str(v)) for k, v in labels.items())))
+        with self._lock:
+            self._counters[series] = self._counters.get(series, 0) + value
+
+    def add_time(self, stage: str, seconds: float):
+        with self._lock:
+            entry = self._stages.setdefault(stage, [0, 0.0, 0.0])
+            entry[0] += 1
+            entry[1] += seconds
+            entry[2] = max(entry[2], seconds)
+
+    @contextmanager
+    def stage(self, name: str):
+        """記錄區塊耗時；多個執行緒同時處於同一階段時耗時會累加"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - start)
+
+    def total(self, name: str, **labels) -> float:
+        """符合指定標籤的計數器總和"""
+        wanted = {k: str(v) for k, v in labels.items()}
+        with self._lock:
+            return sum(
+                value for (series_name, series_labels), value in self._counters.items()
+                if series_name == name and wanted.items() <= dict(series_labels).items()
+            )
+
+    def by_label(self, name: str, label: str) -> dict:
+        """依單一標籤彙總計數器，例如各關鍵字的額度"""
+        grouped = {}
+        with self._lock:
+            for (series_name, series_labels), value in self._counters.items():
+                if series_name != name:
+                    continue
+                key = dict(series_labels).get(label, "")
+                grouped[key] = grouped.get(key, 0) + value
+        return grouped
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._stages.clear()
+
+    def snapshot(self) -> dict:
+        """可序列化的統計快照"""
+        with self._lock:
+            counters = [
+                {"name": name, "labels": dict(labels), "value": value}
+                for (name, labels), value in sorted(self._counters.items())
+            ]
+            stages = {
+                stage: {"calls": calls, "seconds": round(seconds, 6), "max_seconds": round(longest, 6)}
+                for stage, (calls, seconds, longest) in sorted(self._stages.items())
+            }
+        return {"counters": counters, "stages": stages}
+
+    def to_json(self, indent: int | None = 2) -> str:
+        return json.dumps(self.snapshot(), ensure_ascii=False, indent=indent)
+
+    def to_prometheus(self, prefix: str = PROMETHEUS_PREFIX) -> str:
+        """Prometheus text exposition format"""
+        snapshot = self.snapshot()
+        lines = []
+        declared = set()
+        for counter in snapshot["counters"]:
+            metric = f"{prefix}{counter['name']}_total"
+            if metric not in declared:
+                declared.add(metric)
+                lines.append(f"# TYPE {metric} counter")
+            lines.append(f"{metric}{self._labels(counter['labels'])} {counter['value']}")
+
+        if snapshot["stages"]:
+            for suffix, field in (("stage_seconds_total", "seconds"), ("stage_calls_total", "calls"),
+                                  ("stage_max_seconds", "max_seconds")):
+                metric = f"{prefix}{suffix}"
+                lines.append(f"# TYPE {metric} {'gauge' if suffix.endswith('max_seconds') else 'counter'}")
+                for stage, values in snapshot["stages"].items():
+                    lines.append(f"{metric}{self._labels({'stage': stage})} {values[field]}")
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    def _labels(labels: dict) -> str:
+        if not labels:
+            return ""
+        pairs = []
+        for k, v in labels.items():
+            value = str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+            pairs.append(f'{k}="{value}"')
+        return "{" + ",".join(pairs) + "}"
@@ -0,0 +1,76 @@
+from dataclasses import asdict, dataclass, field
+from core.data_processor import DataProcessor
+
+@dataclass(slots=True)
+class VideoRecord:
+    """
+    結果卡片與匯出所需的精簡影片資料
+    只保留介面使用的欄位 (數值已轉為 int / float)，取代完整的 videos().list 回應
+    """
+    id: str
+    title: str
+    channel_id: str
+    channel_title: str
+    thumbnail_url: str
+    published_at: str
+    view_count: int
+    duration_sec: int
+    formatted_duration: str
+    daily_views: float
+    rating: str
+    keywords: list[str] = field(default_factory=list)
+    views_per_hour: float | None = None  # From view snapshots, None until two are far enough apart
+    subscriber_count: int | None = None  # From channels().list, None until enriched or when the channel hides it
+    duplicate_ids: list[str] = field(default_factory=list)  # Re-uploads collapsed into this card (core.dedup)
+
+    @property
+    def url(self) -> str:
+        return f"https://www.youtube.com/watch?v={self.id}"
+
+    @property
+    def channel_url(self) -> str:
+        return f"https://www.youtube.com/channel/{self.channel_id}"
+
+    @property
+    def views_per_subscriber(self) -> float | None:
+        """觀看數 / 頻道訂閱數：小頻道的爆款遠大於 1"""
+        if not self.subscriber_count:
+            return None
+        return self.view_count / self.subscriber_count
+
+    @property
+    def copies(self) -> int:
+        """此卡片代表的影片數 (含重複上傳)"""
+        return 1 + len(self.duplicate_ids)
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+    def update_views(self, view_count: int):
+        """套用重新輪詢的觀看數並重算日均與評級"""
+        self.view_count = view_count
+        self.daily_views = DataProcessor.calculate_daily_views(view_count, self.published_at)
+        self.rating = DataProcessor.get_flame_rating(view_count)
+
+    @classmethod
+    def from_item(cls, item: dict) -> "VideoRecord":
+        """由已加上計算欄位 (_daily_views 等) 的 videos().list 項目建立"""
+        snippet = item.get('snippet', {})
+        try:
+            view_count = int(item.get('statistics', {}).get('viewCount', 0))
+        except (ValueError, TypeError):
+            view_count = 0
+        return cls(
+            id=item.get('id', ''),
+            title=snippet.get('title', 'No Title'),
+            channel_id=snippet.get('channelId', ''),
+            channel_title=snippet.get('channelTitle', 'Unknown'),
+            thumbnail_url=snippet.get('thumbnails', {}).get('medium', {}).get('url', ''),
+            published_at=snippet.get('publishedAt', ''),
+            view_count=view_count,
+            duration_sec=item.get('_duration_sec', 0),
+            formatted_duration=item.get('_formatted_duration', '00:00'),
+            daily_views=item.get('_daily_views', 0.0),
+            rating=item.get('_rating', ''),
+            keywords=list(item.get('_keywords', [])),
+        )
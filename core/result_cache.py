@@ -0,0 +1,114 @@
+import hashlib
+import json
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from config.settings import RESULT_CACHE_TTL, RESULT_CACHE_MAX_BYTES
+
+# acquire() outcomes
+HIT = "hit"        # Fresh entry
+JOINED = "joined"  # Result of another thread's fetch the caller waited for
+LEAD = "lead"      # Caller must fetch and then call release()
+BUSY = "busy"      # Another thread is fetching (only when block=False)
+
+
+class _Flight:
+    """進行中的取得作業；等待的一方在 done 之後讀取結果"""
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.ok = False
+
+
+class SharedResultCache:
+    """
+    行程內共用的關鍵字結果快取 (記憶體)
+    以「關鍵字 + 搜尋條件」為 Key，保存過濾後的結果；多個 Streamlit session 或批次工作同時搜尋相同條件時，
+    只有一方實際呼叫 API，其餘等待其完成後直接使用 (single-flight)
+    超過 TTL 的項目視為未命中，總容量超過上限時淘汰最久未使用的項目
+    """
+    def __init__(self, ttl: float = RESULT_CACHE_TTL, max_bytes: int = RESULT_CACHE_MAX_BYTES):
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # key -> (value, size, stored_at), least recently used first
+        self._flights = {}             # key -> _Flight
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(keyword: str, settings: dict) -> str:
+        """關鍵字不分大小寫；settings 中除了 keywords 以外的欄位都會影響結果"""
+        params = {k: v for k, v in settings.items() if k != "keywords"}
+        raw = json.dumps([keyword.strip().lower(), params], sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+    def acquire(self, key: str, block: bool = True, refresh: bool = False):
+        """
+        查詢快取
+        :param block: 其他執行緒正在取得相同結果時是否等待；False 時回傳 BUSY 而非等待
+                      (一次取得多個 Key 的呼叫端應先處理自己負責的，避免互相等待)
+        :param refresh: 忽略已保存的結果 (進行中的取得本來就是新的，仍會等待)
+        :return: (HIT 或 JOINED, 結果) / (LEAD, None) / (BUSY, None)；LEAD 表示由呼叫端取得，完成後必須呼叫 release
+        """
+        while True:
+            with self._lock:
+                entry = None if refresh else self._entries.get(key)
+                if entry is not None:
+                    if time.monotonic() - entry[2] <= self.ttl:
+                        self._entries.move_to_end(key)
+                        return HIT, entry[0]
+                    self._drop(key)
+                flight = self._flights.get(key)
+                if flight is None:
+                    self._flights[key] = _Flight()
+                    return LEAD, None
+            if not block:
+                return BUSY, None
+            flight.done.wait()
+            if flight.ok:
+                return JOINED, flight.value
+            # The leader failed; retry and possibly take over
+
+    def release(self, key: str, value=None, ok: bool = True):
+        """結束 acquire 取得的 LEAD：ok 時保存結果並交給等待中的執行緒，否則讓它們自行重試"""
+        if ok:
+            self.put(key, value)
+        with self._lock:
+            flight = self._flights.pop(key, None)
+        if flight is not None:
+            flight.value = value
+            flight.ok = ok
+            flight.done.set()
+
+    def put(self, key: str, value):
+        """寫入結果；超過容量上限的單一結果不保存"""
+        size = len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            self._drop(key)
+            self._entries[key] = (value, size, time.monotonic())
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                self._drop(next(iter(self._entries)))
+
+    def _drop(self, key: str):
+        """移除項目 (需持有鎖)"""
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry[1]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    @property
+    def size_bytes(self) -> int:
+        with self._lock:
+            return self._bytes
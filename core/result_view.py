@@ -0,0 +1,158 @@
+import html
+from core.models import VideoRecord
+
+# Sort option label -> VideoRecord field, high to low; a leading "-" sorts low to high
+SORT_OPTIONS = {
+    "總觀看數量 (High to Low)": "view_count",
+    "日均觀看數 (High to Low)": "daily_views",
+    "每小時增長 (High to Low)": "views_per_hour",
+    "觀看/訂閱比 (High to Low)": "views_per_subscriber",
+    "頻道訂閱數 (Low to High)": "-subscriber_count",
+}
+
+
+def card_html(vid: VideoRecord) -> str:
+    """單一結果卡片的 HTML"""
+    title = html.escape(vid.title)
+    channel = html.escape(vid.channel_title)
+    matched = html.escape(", ".join(vid.keywords))
+    daily = int(vid.daily_views)
+    velocity = f" · 📈 {vid.views_per_hour:+,.0f}/小時" if vid.views_per_hour is not None else ""
+    subscribers = f" · 👥 {vid.subscriber_count:,} 訂閱" if vid.subscriber_count is not None else ""
+    ratio = f" · 觀看/訂閱 {vid.views_per_subscriber:,.1f}x" if vid.views_per_subscriber is not None else ""
+    copies = ""
+    if vid.duplicate_ids:
+        others = html.escape(", ".join(vid.duplicate_ids))
+        copies = f'\n<span class="copies-badge" title="其他上傳: {others}">🔁 {vid.copies} 個上傳版本</span>'
+    url = vid.url
+    channel_url = vid.channel_url
+
+    # No leading indentation: markdown would turn indented lines into a code block
+    return f"""<div class="video-card">
+<div style="display: flex; gap: 15px;">
+<div style="flex: 0 0 160px;">
+<img src="{html.escape(vid.thumbnail_url)}" style="width: 100%; border-radius: 4px;">
+</div>
+<div style="flex: 1;">
+<a href="{url}" target="_blank" class="video-title">{title}</a>
+<div class="channel-name">{channel}{subscribers} · 🏷️ {matched}</div>
+<div class="stats-row">
+<span>👀 {vid.view_count:,} {vid.rating}</span>
+<span>⏱️ {vid.formatted_duration}</span>{copies}
+</div>
+<div class="daily-views">🔥 日均: {daily:,}/天{velocity}{ratio}</div>
+<div style="margin-top: 10px;">
+<a href="{url}" target="_blank" class="action-btn">▶ 觀看影片</a>
+<a href="{channel_url}" target="_blank" class="action-btn">🏠 頻道首頁</a>
+</div>
+</div>
+</div>
+</div>"""
+
+
+def channel_summary(records: list[VideoRecord]) -> list[dict]:
+    """依頻道彙總結果 (影片數多、總觀看數高的頻道在前)；subscribers 與 views_per_subscriber 在未取得訂閱數時為 None"""
+    channels = {}
+    for vid in records:
+        entry = channels.get(vid.channel_id)
+        if entry is None:
+            entry = channels[vid.channel_id] = {
+                "channel_id": vid.channel_id, "channel_title": vid.channel_title, "channel_url": vid.channel_url,
+                "subscribers": vid.subscriber_count, "videos": 0, "total_views": 0, "top_views": 0,
+            }
+        entry["videos"] += 1
+        entry["total_views"] += vid.view_count
+        entry["top_views"] = max(entry["top_views"], vid.view_count)
+    for entry in channels.values():
+        subscribers = entry["subscribers"]
+        entry["views_per_subscriber"] = entry["total_views"] / subscribers if subscribers else None
+    return sorted(channels.values(), key=lambda e: (-e["videos"], -e["total_views"]))
+
+
+class ResultView:
+    """
+    結果列表的排序與分頁檢視
+    每組結果只取一次排序欄位並為每種排序建立一次 argsort，各頁的 HTML 也會快取，
+    Streamlit 重新執行腳本時不必重新排序或重建卡片
+    觀看數更新後 (VideoRecord.update_views) 需建立新的 ResultView
+    collapse_copies 為 True 時，重複上傳的影片合併為一張卡片 (見 core.dedup)，records 為合併後的列表
+    """
+    def __init__(self, records: list[VideoRecord], max_cached_pages: int = 64, collapse_copies: bool = False):
+        import numpy as np  # Only needed once there are results, not at app start
+        self.source = records
+        self.collapse_copies = collapse_copies
+        if collapse_copies:
+            from core.dedup import collapse_duplicates  # Loaded only when the option is on
+            records = collapse_duplicates(records)
+        self.records = records
+        self.max_cached_pages = max_cached_pages
+        velocity = [v.views_per_hour for v in records]
+        ratios = [v.views_per_subscriber for v in records]
+        subscribers = [v.subscriber_count for v in records]
+        self._columns = {
+            "view_count": np.fromiter((v.view_count for v in records), dtype=np.int64, count=len(records)),
+            "daily_views": np.fromiter((v.daily_views for v in records), dtype=np.float64, count=len(records)),
+            # Videos without a velocity yet sort last and never pass a velocity filter
+            "views_per_hour": np.array([np.nan if v is None else v for v in velocity], dtype=np.float64),
+            # Channels without subscriber counts sort last either way
+            "views_per_subscriber": np.array([np.nan if v is None else v for v in ratios], dtype=np.float64),
+            "subscriber_count": np.array([np.nan if v is None else v for v in subscribers], dtype=np.float64),
+        }
+        self._orders = {}   # sort field -> argsort (high to low)
+        self._visible = {}  # (sort field, min_velocity) -> record indices
+        self._pages = {}    # (sort field, min_velocity, page, page_size) -> HTML
+        self._channels = None
+
+    def order(self, sort_key: str) -> "np.ndarray":
+        """依欄位由高到低的索引 (同值維持原順序)；"-欄位" 為由低到高"""
+        import numpy as np
+        if sort_key not in self._orders:
+            ascending = sort_key.startswith("-")
+            column = self._columns[sort_key.lstrip("-")]
+            if ascending:
+                column = -column
+            if column.dtype.kind == 'f':
+                column = np.nan_to_num(column, nan=-np.inf)
+            self._orders[sort_key] = np.argsort(-column, kind='stable')
+        return self._orders[sort_key]
+
+    def visible(self, sort_key: str, min_velocity: float = 0) -> "np.ndarray":
+        """排序後並套用每小時增長門檻的索引"""
+        import numpy as np
+        cache_key = (sort_key, min_velocity)
+        if cache_key not in self._visible:
+            order = self.order(sort_key)
+            if min_velocity > 0:
+                with np.errstate(invalid='ignore'):
+                    mask = self._columns["views_per_hour"] >= min_velocity
+                order = order[mask[order]]
+            self._visible[cache_key] = order
+        return self._visible[cache_key]
+
+    def channels(self) -> list[dict]:
+        """頻道彙總 (見 channel_summary)，每組結果只計算一次"""
+        if self._channels is None:
+            self._channels = channel_summary(self.records)
+        return self._channels
+
+    def count(self, sort_key: str, min_velocity: float = 0) -> int:
+        return len(self.visible(sort_key, min_velocity))
+
+    def page_count(self, page_size: int, sort_key: str, min_velocity: float = 0) -> int:
+        return max(1, -(-self.count(sort_key, min_velocity) // page_size))
+
+    def page_html(self, sort_key: str, page: int, page_size: int, min_velocity: float = 0) -> str:
+        """
+        第 page 頁 (從 1 開始) 所有卡片合併成的單一 HTML 區塊
+        """
+        cache_key = (sort_key, min_velocity, page, page_size)
+        cached = self._pages.get(cache_key)
+        if cached is not None:
+            return cached
+
+        indices = self.visible(sort_key, min_velocity)[(page - 1) * page_size:page * page_size]
+        block = "\n".join(card_html(self.records[i]) for i in indices)
+        if len(self._pages) >= self.max_cached_pages:
+            self._pages.clear()
+        self._pages[cache_key] = block
+        return block
@@ -0,0 +1,46 @@
+import random
+from googleapiclient.errors import HttpError
+from config.settings import RETRY_MAX_ATTEMPTS, RETRY_BASE_DELAY, RETRY_MAX_DELAY
+
+RATE_LIMIT_REASONS = ('rateLimitExceeded', 'userRateLimitExceeded')
+QUOTA_REASONS = ('quotaExceeded', 'dailyLimitExceeded')
+
+
+class RetryPolicy:
+    """
+    API 錯誤的重試判斷與退避時間
+    額度用盡：輪替 Key 後立即重送；5xx、速率限制與網路錯誤：以指數退避加隨機抖動重送
+    """
+    def __init__(self, max_attempts: int = RETRY_MAX_ATTEMPTS, base_delay: float = RETRY_BASE_DELAY,
+                 max_delay: float = RETRY_MAX_DELAY, rng: random.Random | None = None):
+        """
+        :param max_attempts: 暫時性錯誤的最多嘗試次數 (含第一次)
+        """
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._rng = rng or random.Random()
+
+    @staticmethod
+    def reason(error: Exception) -> str:
+        details = getattr(error, 'error_details', None)
+        if isinstance(details, list) and details and isinstance(details[0], dict):
+            return details[0].get('reason', '')
+        return ''
+
+    @classmethod
+    def is_quota_error(cls, error: Exception) -> bool:
+        return (isinstance(error, HttpError) and error.resp.status in (403, 429)
+                and cls.reason(error) in QUOTA_REASONS)
+
+    @classmethod
+    def is_transient(cls, error: Exception) -> bool:
+        """5xx、速率限制或網路錯誤可直接重送"""
+        if isinstance(error, HttpError):
+            return error.resp.status >= 500 or cls.reason(error) in RATE_LIMIT_REASONS
+        return True
+
+    def delay(self, attempt: int) -> float:
+        """第 attempt 次失敗後的等待秒數 (full jitter：0 到 base * 2^(attempt-1) 之間，不超過 max_delay)"""
+        ceiling = min(self.max_delay, self.base_delay * (2 ** max(0, attempt - 1)))
+        return self._rng.uniform(0, ceiling)
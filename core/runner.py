@@ -0,0 +1,269 @@
+"""
+無介面批次執行器：讀取工作檔，並行執行多組關鍵字搜尋，結果以 NDJSON 串流輸出
+
+    python -m core.runner jobs.json [-o results.ndjson] [--summary summary.json] [--parallel 2]
+                                    [--metrics metrics.prom | metrics.json] [--repoll [DAYS]]
+
+--repoll 在工作完成後重新輪詢最近 DAYS 天 (預設 SNAPSHOT_TRACK_DAYS) 內記錄過快照的影片觀看數
+(每 50 部影片 1 單位額度)，累積每小時增長所需的快照；搭配排程定期執行時工作檔的 jobs 可以是空的
+
+工作檔格式：
+    {
+      "api_keys": ["AI..."],                  # 省略時使用 api_keys.json
+      "max_workers": 4, "transport": "direct", "cache": true,
+      "projection": "card",                   # card / two-phase / export (完整回應)
+      "channels": false,                      # 加上頻道訂閱數 (工作完成後才輸出該工作的結果)
+      "dedupe": false,                        # 重複上傳只輸出一筆，加上 duplicate_ids (同上)
+      "defaults": {"days": 30, "max_pages": 5, "shards": 1, "adaptive": false, "incremental": false,
+                   "limit": 50, "min_views": 100000, "max_duration": 60},
+      "jobs": [
+        {"name": "cats", "keywords": ["CAT", "CUTE"], "days": 7},
+        {"name": "dogs", "keywords": ["DOG"], "min_views": 500000}
+      ]
+    }
+"""
+import argparse
+import json
+import logging
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from config.key_manager import KeyManager
+from config.settings import (
+    DEFAULT_DAYS, DEFAULT_MAX_PAGES, DEFAULT_LIMIT_PER_KEYWORD, DEFAULT_MIN_VIEWS, DEFAULT_MAX_DURATION,
+    DEFAULT_SHARDS, DEFAULT_MAX_WORKERS, DEFAULT_TRANSPORT, DEFAULT_PROJECTION, ADAPTIVE_MIN_YIELD, CACHE_FILE,
+    SNAPSHOT_FILE, SNAPSHOT_TRACK_DAYS, YIELD_HISTORY_FILE, DELTA_FILE
+)
+from core.api_client import PROJECTIONS, TWO_PHASE, YouTubeAPIClient
+from core.cache import ResponseCache
+from core.dedup import collapse_duplicates
+from core.delta_store import DeltaStore
+from core.metrics import Metrics
+from core.result_cache import SharedResultCache
+from core.snapshot_store import SnapshotStore
+from core.yield_history import YieldHistory
+
+SETTING_DEFAULTS = {
+    "days": DEFAULT_DAYS,
+    "max_pages": DEFAULT_MAX_PAGES,
+    "shards": DEFAULT_SHARDS,
+    "adaptive": False,
+    "incremental": False,
+    "min_yield": ADAPTIVE_MIN_YIELD,
+    "limit": DEFAULT_LIMIT_PER_KEYWORD,
+    "min_views": DEFAULT_MIN_VIEWS,
+    "max_duration": DEFAULT_MAX_DURATION,
+}
+
+
+class NDJSONWriter:
+    """多執行緒共用的 NDJSON 輸出 (每行一筆，寫入後立即 flush)"""
+    def __init__(self, stream):
+        self.stream = stream
+        self.lines = 0
+        self._lock = threading.Lock()
+
+    def write(self, record: dict):
+        line = json.dumps(record, ensure_ascii=False)
+        with self._lock:
+            self.stream.write(line + "\n")
+            self.stream.flush()
+            self.lines += 1
+
+
+def _check_settings(settings: dict, where: str):
+    """設定值的型別須與 SETTING_DEFAULTS 相同 (浮點數設定也接受整數)，錯誤時引發 ValueError"""
+    for key, default in SETTING_DEFAULTS.items():
+        value = settings[key]
+        expected = (int, float) if isinstance(default, float) else type(default)
+        # bool is an int subclass: true/false is neither a count nor a ratio, 0/1 is not a switch
+        if isinstance(value, bool) != isinstance(default, bool) or not isinstance(value, expected):
+            raise ValueError(f"{where}: '{key}' must be {type(default).__name__}, got {value!r}")
+
+
+def load_jobs(path: str, require_jobs: bool = True) -> dict:
+    """讀取並驗證工作檔，每個工作的設定會合併 defaults"""
+    with open(path, 'r', encoding='utf-8') as f:
+        spec = json.load(f)
+    if not isinstance(spec, dict) or not isinstance(spec.get("jobs", []), list) \
+            or not isinstance(spec.get("defaults", {}), dict):
+        raise ValueError("Job file must be an object with a 'jobs' list and a 'defaults' object")
+
+    projection = spec.get("projection", DEFAULT_PROJECTION)
+    if projection != TWO_PHASE and projection not in PROJECTIONS:
+        raise ValueError(f"Unknown projection '{projection}', expected one of {[*PROJECTIONS, TWO_PHASE]}")
+
+    defaults = dict(SETTING_DEFAULTS, **spec.get("defaults", {}))
+    _check_settings(defaults, "defaults")
+    jobs = []
+    for idx, job in enumerate(spec.get("jobs", [])):
+        keywords = job.get("keywords", []) if isinstance(job, dict) else None
+        # A bare string would otherwise be searched letter by letter, 100 units each
+        if not isinstance(keywords, list) or not all(isinstance(k, str) for k in keywords):
+            raise ValueError(f"Job {idx}: 'keywords' must be a list of strings")
+        keywords = [k.strip() for k in keywords if k.strip()]
+        if not keywords:
+            raise ValueError(f"Job {idx} has no keywords")
+        settings = {k: job.get(k, v) for k, v in defaults.items()}
+        _check_settings(settings, f"Job {idx}")
+        settings["keywords"] = keywords
+        jobs.append({"name": job.get("name", f"job{idx}"), "settings": settings})
+    if not jobs and require_jobs:
+        raise ValueError("Job file contains no jobs")
+    spec["jobs"] = jobs
+    return spec
+
+
+def run_job(client: YouTubeAPIClient, job: dict, writer: NDJSONWriter, stream: bool, channels: bool = False,
+            dedupe: bool = False) -> dict:
+    """
+    執行單一工作並輸出結果，回傳該工作的摘要
+    :param channels: 輸出前替結果加上頻道訂閱數 (需要整個工作的結果，所以不逐筆輸出)
+    :param dedupe: 重複上傳的影片合併為一筆 (見 core.dedup，同樣需要整個工作的結果)
+    """
+    settings = job["settings"]
+    start = time.perf_counter()
+    count = 0
+    error = None
+    try:
+        if stream:
+            videos = client.iter_fetch_many(settings["keywords"], settings)
+        else:
+            videos = client.fetch_many(settings["keywords"], settings)
+        if channels:
+            videos = list(videos)
+            client.enrich_channels(videos)
+        if dedupe:
+            videos = collapse_duplicates(list(videos))
+        for video in videos:
+            writer.write(dict(video.to_dict(), job=job["name"]))
+            count += 1
+    except Exception as e:
+        logging.error(f"Job '{job['name']}' failed: {e}")
+        error = str(e)
+    return {
+        "name": job["name"],
+        "keywords": settings["keywords"],
+        "results": count,
+        "seconds": round(time.perf_counter() - start, 3),
+        "error": error,
+    }
+
+
+def run(spec: dict, writer: NDJSONWriter, parallel: int = 1, stream: bool = True,
+        metrics: Metrics | None = None, repoll_days: int | None = None) -> dict:
+    """
+    執行所有工作，回傳機器可讀的執行摘要
+    :param metrics: 收集本次執行的統計，未指定時建立新的 (摘要中的 metrics 欄位)
+    :param repoll_days: 工作完成後重新輪詢這幾天內有快照的影片觀看數 (摘要中的 repoll 欄位)
+    """
+    metrics = metrics or Metrics()
+    if spec.get("api_keys"):
+        key_manager = KeyManager(file_path=None, metrics=metrics)
+        key_manager.set_keys(spec["api_keys"])
+    else:
+        key_manager = KeyManager(metrics=metrics)
+    if not key_manager.keys:
+        raise ValueError("No API keys: set api_keys in the job file or api_keys.json")
+
+    cache = ResponseCache(CACHE_FILE)
+    cache.enabled = spec.get("cache", True)
+    snapshots = SnapshotStore(SNAPSHOT_FILE)
+    delta_store = DeltaStore(DELTA_FILE)
+    client = YouTubeAPIClient(
+        key_manager,
+        max_workers=spec.get("max_workers", DEFAULT_MAX_WORKERS),
+        cache=cache,
+        transport=spec.get("transport", DEFAULT_TRANSPORT),
+        projection=spec.get("projection", DEFAULT_PROJECTION),
+        snapshots=snapshots,
+        metrics=metrics,
+        yield_history=YieldHistory(YIELD_HISTORY_FILE),
+        # Jobs repeating a keyword with the same settings share one search
+        results_cache=SharedResultCache() if cache.enabled else None,
+        delta_store=delta_store,
+    )
+
+    units_before = key_manager.spent
+    start = time.perf_counter()
+    # Jobs share one client, so its max_workers still bounds concurrent HTTP requests
+    channels = spec.get("channels", False)
+    dedupe = spec.get("dedupe", False)
+    with ThreadPoolExecutor(max_workers=max(1, parallel)) as pool:
+        job_summaries = list(pool.map(lambda job: run_job(client, job, writer, stream, channels, dedupe),
+                                      spec["jobs"]))
+    repoll = None
+    if repoll_days is not None:
+        tracked = snapshots.tracked_ids(repoll_days)
+        polled = client.poll_statistics(tracked)
+        repoll = {"days": repoll_days, "tracked": len(tracked), "polled": len(polled)}
+    elapsed = time.perf_counter() - start
+
+    key_manager.flush()
+    summary = {
+        "started_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(time.time() - elapsed)),
+        "seconds": round(elapsed, 3),
+        "jobs": job_summaries,
+        "results": sum(j["results"] for j in job_summaries),
+        "failed_jobs": sum(1 for j in job_summaries if j["error"]),
+        "repoll": repoll,
+        "quota_units": key_manager.spent - units_before,
+        "keys": key_manager.usage_report(),
+        "cache": cache.stats(),
+        "metrics": metrics.snapshot(),
+    }
+    cache.close()
+    snapshots.close()
+    delta_store.close()
+    return summary
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m core.runner", description="YouTube Shorts 批次搜尋 (NDJSON 輸出)")
+    parser.add_argument("job_file", help="工作檔 (JSON)")
+    parser.add_argument("-o", "--output", help="結果輸出檔，預設為 stdout")
+    parser.add_argument("--summary", help="執行摘要輸出檔，預設寫到 stderr")
+    parser.add_argument("--parallel", type=int, default=1, help="同時執行的工作數")
+    parser.add_argument("--metrics", help="統計輸出檔，副檔名 .prom 為 Prometheus 文字格式，其餘為 JSON")
+    parser.add_argument("--no-stream", action="store_true", help="每個工作完成後才輸出 (會翻完所有頁數)")
+    parser.add_argument("--repoll", type=int, nargs="?", const=SNAPSHOT_TRACK_DAYS, metavar="DAYS",
+                        help=f"工作完成後重新輪詢最近 DAYS 天 (預設 {SNAPSHOT_TRACK_DAYS}) 內有快照的影片觀看數")
+    parser.add_argument("-v", "--verbose", action="store_true")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING, stream=sys.stderr,
+                        format="%(asctime)s %(levelname)s %(message)s")
+
+    try:
+        spec = load_jobs(args.job_file, require_jobs=args.repoll is None)
+    except (OSError, ValueError) as e:
+        logging.error(f"Invalid job file: {e}")
+        return 2
+
+    metrics = Metrics()
+    out = open(args.output, 'w', encoding='utf-8') if args.output else sys.stdout
+    try:
+        summary = run(spec, NDJSONWriter(out), parallel=args.parallel, stream=not args.no_stream, metrics=metrics,
+                      repoll_days=args.repoll)
+    except ValueError as e:
+        logging.error(str(e))
+        return 2
+    finally:
+        if args.output:
+            out.close()
+
+    summary_text = json.dumps(summary, ensure_ascii=False, indent=2)
+    if args.summary:
+        with open(args.summary, 'w', encoding='utf-8') as f:
+            f.write(summary_text + "\n")
+    else:
+        sys.stderr.write(summary_text + "\n")
+    if args.metrics:
+        with open(args.metrics, 'w', encoding='utf-8') as f:
+            f.write(metrics.to_prometheus() if args.metrics.endswith(".prom") else metrics.to_json() + "\n")
+    return 1 if summary["failed_jobs"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,146 @@
+"""
+YouTube Service 的建立與共用
+
+discovery 文件使用 assets/ 內預先裁切的版本 (只保留用到的 list 方法，約 7 KB，完整版約 380 KB)，
+google-api-python-client 更新後可重新產生：
+    python -m core.service_pool
+"""
+import json
+import logging
+import sys
+import threading
+import weakref
+from contextlib import contextmanager
+from functools import lru_cache
+from googleapiclient.discovery import build_from_document
+from googleapiclient.discovery_cache import get_static_doc
+from googleapiclient.http import build_http
+from config.settings import DISCOVERY_DOC_FILE, HTTP_POOL_MAX_IDLE
+
+# Resources whose list() method the app calls
+USED_RESOURCES = ("search", "videos", "channels")
+
+
+def trim_discovery_document(doc: dict, resources=USED_RESOURCES) -> dict:
+    """
+    只保留指定 resource 的 list 方法，移除說明文字與完整 schema
+    回應 schema 以空物件代替：JSON 回應的解析不受影響，建立請求時也不必產生 schema 說明文件
+    """
+    def strip(node):
+        if isinstance(node, dict):
+            return {k: strip(v) for k, v in node.items() if k not in ("description", "enumDescriptions")}
+        if isinstance(node, list):
+            return [strip(v) for v in node]
+        return node
+
+    trimmed = {k: v for k, v in doc.items() if k not in ("resources", "schemas", "description", "icons")}
+    trimmed["resources"] = {name: {"methods": {"list": doc["resources"][name]["methods"]["list"]}} for name in resources}
+    refs = [method["methods"]["list"]["response"]["$ref"] for method in trimmed["resources"].values()]
+    trimmed["schemas"] = {ref: {"id": ref, "type": "object"} for ref in refs}
+    return strip(trimmed)
+
+
+@lru_cache(maxsize=None)
+def discovery_document(root_url: str = "") -> dict:
+    """
+    YouTube Data API v3 discovery 文件 (整個行程只解析一次，回傳的 dict 不可修改)
+    :param root_url: 替代的 API 根網址；批次請求的網址也由 rootUrl 決定，所以直接改寫文件
+    """
+    try:
+        with open(DISCOVERY_DOC_FILE, 'r', encoding='utf-8') as f:
+            doc = json.load(f)
+    except (OSError, ValueError) as e:
+        logging.warning(f"Bundled discovery document unavailable ({e}), trimming the library copy")
+        doc = trim_discovery_document(json.loads(get_static_doc('youtube', 'v3')))
+    if root_url:
+        doc['rootUrl'] = doc['mtlsRootUrl'] = root_url
+    return doc
+
+
+class ServicePool:
+    """
+    每個 API Key 一個預先建立的 YouTube Service，同一個行程內的所有 client 與執行緒共用
+    Service 只負責組出請求；實際連線由 http() 借出的 httplib2.Http 負責 (httplib2 不是 thread-safe，
+    同一時間只給一個請求使用)，用完放回供其他執行緒使用，連線保持 keep-alive：
+    輪替 Key 時不必重建 Service，每次呼叫各自建立的工作執行緒也不必重新連線
+    只保留仍存活的 client 登記的 Key (retain)，session 換了 Key 之後舊 Key 的 Service 會被移除
+    """
+    _shared = {}
+    _shared_lock = threading.Lock()
+
+    def __init__(self, root_url: str = "", max_idle: int = HTTP_POOL_MAX_IDLE):
+        """
+        :param max_idle: 最多保留幾個閒置的連線，超過的用完即關閉
+        """
+        self.root_url = root_url
+        self.max_idle = max_idle
+        self._services = {}
+        self._owners = weakref.WeakKeyDictionary()  # client -> keys it uses
+        self._idle = []  # Keep-alive Http objects not lent out
+        self._lock = threading.Lock()
+
+    @classmethod
+    def shared(cls, root_url: str = "") -> "ServicePool":
+        """行程共用的 pool (依 API 根網址區分)"""
+        with cls._shared_lock:
+            if root_url not in cls._shared:
+                cls._shared[root_url] = cls(root_url)
+            return cls._shared[root_url]
+
+    def get(self, key: str):
+        """取得 Key 的 Service，第一次使用時建立"""
+        service = self._services.get(key)
+        if service is not None:
+            return service
+        with self._lock:
+            if key not in self._services:
+                try:
+                    self._services[key] = build_from_document(discovery_document(self.root_url), developerKey=key)
+                except Exception as e:
+                    logging.error(f"Failed to create YouTube service: {e}")
+                    return None
+            return self._services[key]
+
+    def retain(self, owner, keys: list[str]):
+        """
+        登記 owner (通常是 client) 使用的 Key 並預先建立其 Service，之後輪替只是查表
+        已被回收的 owner 不再計入；沒有任何 owner 使用的 Key 的 Service 會被移除
+        """
+        with self._lock:
+            self._owners[owner] = set(keys)
+            live = set().union(*list(self._owners.values()))
+            for key in [key for key in self._services if key not in live]:
+                del self._services[key]
+        for key in keys:
+            self.get(key)
+
+    @contextmanager
+    def http(self):
+        """借出一個 HTTP 連線 (keep-alive，跨 Key 與執行緒共用)，區塊結束時放回"""
+        with self._lock:
+            http = self._idle.pop() if self._idle else None
+        if http is None:
+            http = build_http()
+        try:
+            yield http
+        finally:
+            with self._lock:
+                keep = len(self._idle) < self.max_idle
+                if keep:
+                    self._idle.append(http)
+            if not keep:
+                for conn in list(http.connections.values()):
+                    conn.close()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._services)
+
+
+if __name__ == "__main__":
+    # Regenerate the trimmed document from the installed library
+    trimmed = trim_discovery_document(json.loads(get_static_doc('youtube', 'v3')))
+    target = sys.argv[1] if len(sys.argv) > 1 else DISCOVERY_DOC_FILE
+    with open(target, 'w', encoding='utf-8') as f:
+        json.dump(trimmed, f, separators=(',', ':'))
+    print(f"Wrote {target}")
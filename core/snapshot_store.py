@@ -0,0 +1,109 @@
+import logging
+import sqlite3
+import threading
+import time
+from config.settings import SNAPSHOT_FILE, SNAPSHOT_MIN_GAP, SNAPSHOT_RETENTION_DAYS, SNAPSHOT_TRACK_DAYS
+from core.sqlite_util import connect
+
+_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS snapshots (
+        video_id TEXT NOT NULL,
+        taken_at REAL NOT NULL,
+        view_count INTEGER NOT NULL,
+        PRIMARY KEY (video_id, taken_at)
+    );
+    CREATE INDEX IF NOT EXISTS idx_snapshots_taken ON snapshots (taken_at);
+"""
+
+
+class SnapshotStore:
+    """
+    影片觀看數的時間序列 (SQLite)
+    每次取得 statistics 就記錄一筆快照，以相鄰快照計算每小時觀看增長
+    """
+    def __init__(self, path=SNAPSHOT_FILE, min_gap: float = SNAPSHOT_MIN_GAP):
+        """
+        :param min_gap: 計算增長速度時兩筆快照的最小間隔 (秒)，避免短時間內的雜訊
+        """
+        self.path = path
+        self.min_gap = min_gap
+        self._lock = threading.Lock()
+        self._conn = connect(self.path, _SCHEMA, "Snapshot")
+        self.prune()
+
+    def record(self, view_counts: dict, taken_at: float | None = None):
+        """
+        記錄一批觀看數快照
+        :param view_counts: {video_id: view_count}
+        """
+        if not view_counts:
+            return
+        taken_at = taken_at or time.time()
+        with self._lock:
+            try:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO snapshots (video_id, taken_at, view_count) VALUES (?, ?, ?)",
+                    [(vid, taken_at, int(views)) for vid, views in view_counts.items()]
+                )
+                self._conn.commit()
+            except sqlite3.Error as e:
+                logging.error(f"Snapshot write error: {e}")
+
+    def record_items(self, items: list[dict], taken_at: float | None = None):
+        """由 videos().list 項目的 statistics 記錄快照"""
+        view_counts = {}
+        for item in items:
+            try:
+                view_counts[item['id']] = int(item.get('statistics', {})['viewCount'])
+            except (KeyError, ValueError, TypeError):
+                continue
+        self.record(view_counts, taken_at)
+
+    def tracked_ids(self, max_age_days: int = SNAPSHOT_TRACK_DAYS) -> list[str]:
+        """最近仍有快照的影片 (重新輪詢的對象)"""
+        since = time.time() - max_age_days * 86400
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT video_id, MAX(taken_at) AS last FROM snapshots GROUP BY video_id HAVING last >= ? ORDER BY last DESC",
+                (since,)
+            ).fetchall()
+        return [r[0] for r in rows]
+
+    def views_per_hour(self, video_ids: list[str]) -> dict:
+        """
+        以最新快照與至少 min_gap 秒前的快照計算每小時觀看增長
+        :return: {video_id: views_per_hour}，快照不足的影片不會出現在結果中
+        """
+        result = {}
+        video_ids = list(dict.fromkeys(video_ids))
+        with self._lock:
+            for start in range(0, len(video_ids), 500):
+                chunk = video_ids[start:start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT video_id, taken_at, view_count FROM snapshots WHERE video_id IN ({placeholders}) "
+                    "ORDER BY video_id, taken_at DESC",
+                    chunk
+                ).fetchall()
+
+                latest = {}
+                for vid, taken_at, views in rows:
+                    if vid not in latest:
+                        latest[vid] = (taken_at, views)
+                    elif vid not in result and latest[vid][0] - taken_at >= self.min_gap:
+                        hours = (latest[vid][0] - taken_at) / 3600
+                        result[vid] = (latest[vid][1] - views) / hours
+        return result
+
+    def prune(self, retention_days: int = SNAPSHOT_RETENTION_DAYS):
+        """刪除過舊的快照"""
+        with self._lock:
+            try:
+                self._conn.execute("DELETE FROM snapshots WHERE taken_at < ?", (time.time() - retention_days * 86400,))
+                self._conn.commit()
+            except sqlite3.Error as e:
+                logging.error(f"Snapshot prune error: {e}")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,30 @@
+import logging
+import sqlite3
+
+
+def connect(path, schema: str, label: str) -> sqlite3.Connection:
+    """
+    開啟多執行緒共用的 SQLite 資料庫並建立資料表，無法開啟或寫入檔案時改用記憶體資料庫
+    :param path: 資料庫檔案，空值表示直接使用記憶體資料庫
+    :param schema: CREATE TABLE / CREATE INDEX 等敘述 (可多句)
+    :param label: 警告訊息中的名稱，例如 "Cache"
+    """
+    target = str(path) if path else ":memory:"
+    try:
+        conn = sqlite3.connect(target, timeout=10, check_same_thread=False)
+        _create_schema(conn, schema)
+    except sqlite3.Error as e:
+        logging.warning(f"{label} file unavailable ({e}), falling back to in-memory database")
+        conn = sqlite3.connect(":memory:", check_same_thread=False)
+        _create_schema(conn, schema)
+    return conn
+
+
+def _create_schema(conn: sqlite3.Connection, schema: str):
+    try:
+        # WAL lets several app processes read while one writes
+        conn.execute("PRAGMA journal_mode=WAL")
+    except sqlite3.Error:
+        pass
+    conn.executescript(schema)
+    conn.commit()
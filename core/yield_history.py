@@ -0,0 +1,89 @@
+import json
+import logging
+import os
+import threading
+from datetime import datetime, timezone
+from config.key_manager import FileLock, atomic_write_json
+from config.settings import YIELD_HISTORY_FILE, YIELD_HISTORY_ALPHA
+
+
+class YieldHistory:
+    """
+    各關鍵字每一頁搜尋結果的產出率 (每 100 額度單位有幾部影片通過篩選)，以指數移動平均記錄
+    篩選條件不同時通過率也不同，所以以「關鍵字 + 天數 + 篩選條件」分開記錄
+    自動調整搜尋深度時，依歷史產出率決定至少要翻幾頁
+    """
+    def __init__(self, path=YIELD_HISTORY_FILE, alpha: float = YIELD_HISTORY_ALPHA):
+        """
+        :param path: 記錄檔 (多個行程共用)，None 表示僅記錄於記憶體
+        :param alpha: 新一次結果的權重
+        """
+        self.path = path
+        self.alpha = alpha
+        self._lock = threading.Lock()
+        self._entries = self._read()
+
+    @staticmethod
+    def key(keyword: str, settings: dict) -> str:
+        return "|".join(str(v) for v in (
+            keyword.strip().casefold(), settings.get('days', 30),
+            settings.get('min_views', 100000), settings.get('max_duration', 60),
+        ))
+
+    def _read(self) -> dict:
+        if not self.path or not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            logging.warning(f"Yield history {self.path} unreadable ({e}), starting over")
+            return {}
+
+    def page_yields(self, keyword: str, settings: dict) -> list[float]:
+        """歷史上各頁的產出率 (沒有紀錄時為空)"""
+        with self._lock:
+            return list(self._entries.get(self.key(keyword, settings), {}).get("pages", []))
+
+    def start_depth(self, keyword: str, settings: dict, min_yield: float) -> int:
+        """開頭連續幾頁的歷史產出率達到門檻；這幾頁不會因單次結果偏低而提早停止"""
+        depth = 0
+        for value in self.page_yields(keyword, settings):
+            if value < min_yield:
+                break
+            depth += 1
+        return depth
+
+    def record(self, keyword: str, settings: dict, yields: list[float]):
+        """記錄這次各頁的產出率 (只更新實際取得的頁數)"""
+        if not yields:
+            return
+        key = self.key(keyword, settings)
+        with self._lock:
+            if not self.path:
+                self._merge(key, yields)
+                return
+            try:
+                with FileLock(self.path):
+                    # Other processes may have recorded other keywords since we loaded
+                    self._entries.update(self._read())
+                    self._merge(key, yields)
+                    try:
+                        atomic_write_json(self.path, self._entries)
+                    except OSError as e:
+                        logging.warning(f"Failed to save yield history: {e}")
+            except TimeoutError as e:
+                # Still used by this process, just not saved
+                logging.warning(f"Yield history not saved: {e}")
+                self._merge(key, yields)
+
+    def _merge(self, key: str, yields: list[float]):
+        entry = self._entries.setdefault(key, {"pages": [], "runs": 0})
+        pages = entry["pages"]
+        for idx, value in enumerate(yields):
+            if idx < len(pages):
+                pages[idx] = round(pages[idx] + self.alpha * (value - pages[idx]), 3)
+            else:
+                pages.append(round(value, 3))
+        entry["runs"] += 1
+        entry["updated"] = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
@@ -1,17 +1,28 @@
 
 import streamlit as st
-import pandas as pd
 from datetime import datetime
+import tempfile
 import time
 
 # Import Core Modules
 from config.settings import (
-    DEFAULT_KEYWORDS, DEFAULT_DAYS, DEFAULT_MAX_PAGES, 
+    DEFAULT_KEYWORDS, DEFAULT_DAYS, DEFAULT_MAX_PAGES, DEFAULT_SHARDS,
     DEFAULT_LIMIT_PER_KEYWORD, DEFAULT_MIN_VIEWS, DEFAULT_MAX_DURATION,
-    APP_VERSION, DONATE_URL, CHANNEL_URL
+    DEFAULT_MAX_WORKERS, DEFAULT_TRANSPORT, DEFAULT_PROJECTION, APP_VERSION, DONATE_URL, CHANNEL_URL, CACHE_FILE,
+    SNAPSHOT_FILE, YIELD_HISTORY_FILE, DELTA_FILE, CORPUS_FILE, CORPUS_MAX_AGE, RESULTS_PAGE_SIZES, STYLE_FILE,
+    JOB_POLL_INTERVAL, JOB_PREVIEW_CARDS
 )
 from config.key_manager import KeyManager
-from core.api_client import YouTubeAPIClient
+# core.api_client (googleapiclient) and core.corpus are imported on the first search so the page paints sooner
+from core.cache import ResponseCache
+from core.delta_store import DeltaStore
+from core.export import EXPORT_COLUMNS, EXPORT_FORMATS, write_export
+from core.jobs import CANCELLED, FAILED, Job, JobManager
+from core.metrics import Metrics
+from core.result_cache import SharedResultCache
+from core.result_view import ResultView, SORT_OPTIONS, card_html
+from core.snapshot_store import SnapshotStore
+from core.yield_history import YieldHistory
 
 # Page Config
 st.set_page_config(
@@ -22,96 +33,44 @@ st.set_page_config(
 )
 
 # --- CSS / Styles ---
-st.markdown("""
-<style>
-    /* Card Style */
-    .video-card {
-        background-color: white;
-        border: 1px solid #ddd;
-        border-radius: 8px;
-        padding: 15px;
-        margin-bottom: 15px;
-        transition: 0.3s;
-        box-shadow: 0 4px 6px rgba(0,0,0,0.1);
-        color: black;
-    }
-    .video-card:hover {
-        border-color: #007acc;
-        box-shadow: 0 8px 15px rgba(0,0,0,0.15);
-    }
-    .video-title {
-        font-size: 1.1rem;
-        font-weight: bold;
-        color: #333;
-        text-decoration: none;
-        display: block;
-        margin-bottom: 8px;
-        line-height: 1.4;
-    }
-    .video-title:hover {
-        color: #007acc;
-    }
-    .channel-name {
-        font-size: 0.9rem;
-        color: #666;
-        margin-bottom: 8px;
-    }
-    .stats-row {
-        font-size: 0.9rem;
-        color: #444;
-        margin-bottom: 8px;
-        display: flex;
-        align-items: center;
-        gap: 10px;
-    }
-    .daily-views {
-        color: #2e7d32;
-        font-weight: bold;
-    }
-    .action-btn {
-        display: inline-block;
-        background-color: #333;
-        color: white !important;
-        padding: 5px 12px;
-        border-radius: 4px;
-        text-decoration: none;
-        font-size: 0.85rem;
-        margin-right: 5px;
-        transition: 0.2s;
-    }
-    .action-btn:hover {
-        background-color: black;
-    }
-    
-    /* Support Buttons */
-    .kofi-btn {
-        background-color: #00b9fe !important;
-        color: white !important;
-        text-decoration: none;
-        padding: 8px 16px;
-        border-radius: 20px;
-        font-weight: bold;
-        display: inline-block;
-        margin: 5px;
-    }
-    .yt-btn {
-        background-color: #ff0000 !important;
-        color: white !important;
-        text-decoration: none;
-        padding: 8px 16px;
-        border-radius: 20px;
-        font-weight: bold;
-        display: inline-block;
-        margin: 5px;
-    }
-</style>
-""", unsafe_allow_html=True)
+@st.cache_resource
+def load_css() -> str:
+    """Read the stylesheet once per process instead of rebuilding it on every rerun"""
+    try:
+        return f"<style>{STYLE_FILE.read_text(encoding='utf-8')}</style>"
+    except OSError:
+        return ""
+
+st.markdown(load_css(), unsafe_allow_html=True)
+
+@st.cache_resource
+def job_manager() -> JobManager:
+    """Background searches for every session; jobs keep running across reruns"""
+    return JobManager()
+
+@st.cache_resource
+def shared_results() -> SharedResultCache:
+    """One result cache for every session, so identical searches run once"""
+    return SharedResultCache()
 
 # --- Session State ---
 if 'results' not in st.session_state:
     st.session_state.results = []
-if 'searching' not in st.session_state:
-    st.session_state.searching = False
+if 'job_id' not in st.session_state:
+    st.session_state.job_id = None  # Background search of this session
+    st.session_state.job_metrics = None
+if 'last_job' not in st.session_state:
+    st.session_state.last_job = None
+if 'key_usage' not in st.session_state:
+    st.session_state.key_usage = []
+if 'metrics' not in st.session_state:
+    st.session_state.metrics = None  # Metrics of the last search or refresh
+if 'result_view' not in st.session_state:
+    st.session_state.result_view = None
+if 'corpus' not in st.session_state:
+    st.session_state.corpus = None  # Unfiltered candidates of the last search
+if 'corpus_filters' not in st.session_state:
+    st.session_state.corpus_filters = None  # Filter rules the current results were produced with
 
 # --- Sidebar: Controls ---
 with st.sidebar:
@@ -123,16 +82,74 @@ with st.sidebar:
             placeholder="AIxxxxxxxxxxxxxxxxx",
             help="請輸入您的 YouTube Data API v3 金鑰"
         )
+        for usage in st.session_state.key_usage:
+            status = "⛔ 今日已用盡" if usage['exhausted'] else f"剩餘約 {usage['headroom']:,}"
+            st.caption(f"{usage['key']}：已用 {usage['units']:,} 單位，{status}")
     
     with st.expander("搜尋條件", expanded=True):
         keywords = st.text_input("關鍵字 (逗號分隔)", ", ".join(DEFAULT_KEYWORDS))
         days = st.slider("發布時間 (天)", 1, 365, DEFAULT_DAYS)
         depth = st.slider("搜尋深度 (頁)", 1, 20, DEFAULT_MAX_PAGES)
+        adaptive_depth = st.checkbox(
+            "自動調整搜尋深度", value=False,
+            help="某一頁幾乎沒有影片通過篩選時就停止翻頁 (搜尋深度改為上限)，並記住各關鍵字的產出率供下次參考"
+        )
+        incremental = st.checkbox(
+            "增量更新", value=False,
+            help="相同關鍵字與天數搜尋過後，只搜尋上次之後發布的新影片，舊影片只更新觀看數 (每 50 部 1 單位額度)"
+        )
+        enrich_channels = st.checkbox(
+            "取得頻道訂閱數", value=True,
+            help="搜尋完成後查詢結果中各頻道的訂閱數 (每 50 個頻道 1 單位額度，快取 7 天)，可依觀看/訂閱比找出小頻道爆款"
+        )
+        shards = st.slider(
+            "時間分段數", 1, 16, DEFAULT_SHARDS,
+            help="將發布時間切成多段分別搜尋以取得更多不同的影片；結果多的時段會自動再切細，"
+                 "每段各自翻頁。切細前的時段已先取得第一頁，每個關鍵字最多 "
+                 "(分段數 × 搜尋深度 + 分段數 − 1) 頁，每頁 100 單位 (例如 4 段、深度 2 最多 11 頁)"
+        )
         limit = st.slider("數量限制 (部)", 1, 500, DEFAULT_LIMIT_PER_KEYWORD)
+        max_workers = st.slider("並行數", 1, 10, DEFAULT_MAX_WORKERS, help="同時進行的 API 請求數量")
+        transport_modes = {"逐一請求": "direct", "批次請求": "batch"}
+        transport_label = st.selectbox(
+            "傳輸模式", list(transport_modes), index=list(transport_modes.values()).index(DEFAULT_TRANSPORT),
+            help="批次請求將多個 API 呼叫合併為一次連線，適合高延遲網路"
+        )
+        transport = transport_modes[transport_label]
+        projection_modes = {"卡片欄位": "card", "兩階段": "two-phase", "完整回應": "export"}
+        projection_label = st.selectbox(
+            "回應欄位", list(projection_modes), index=list(projection_modes.values()).index(DEFAULT_PROJECTION),
+            help="只下載需要的欄位以縮小回應；兩階段先取過濾所需欄位，只替通過篩選的影片取標題與縮圖 "
+                 "(每 50 部多 1 單位額度)"
+        )
+        projection = projection_modes[projection_label]
+        stream_results = st.checkbox(
+            "即時顯示結果", value=True,
+            help="每取得一頁就顯示符合條件的影片，達到數量限制即停止搜尋以節省額度 (逐頁請求，不使用批次模式)"
+        )
     
     with st.expander("篩選規則", expanded=True):
         min_views = st.number_input("最低觀看數", 0, 100000000, DEFAULT_MIN_VIEWS, step=10000)
         max_duration = st.slider("最長時長 (秒)", 0, 60, DEFAULT_MAX_DURATION)
+        min_velocity = st.number_input(
+            "最低每小時增長", 0, 10000000, 0, step=100,
+            help="依觀看數快照計算，需先「重新取得觀看數」累積兩筆以上快照；0 表示不篩選"
+        )
+        collapse_copies = st.checkbox(
+            "合併重複上傳", value=True,
+            help="同一支影片被多個頻道重新上傳時 (標題相近且時長相同)，只顯示觀看數最高的一部並標示上傳版本數"
+        )
+    
+    with st.expander("快取設定", expanded=False):
+        use_cache = st.checkbox("使用快取", value=True, help="重複的搜尋條件直接使用本地快取，節省 API 額度")
+        refresh_cache = st.checkbox("強制刷新", value=False, help="忽略既有快取並重新向 API 取得資料")
+        save_corpus = st.checkbox(
+            "保存候選影片", value=False,
+            help="將上次搜尋過濾前的所有候選影片寫入磁碟，重新開啟網頁後不必搜尋即可調整篩選條件"
+        )
+        if save_corpus and st.session_state.corpus is None:
+            from core.corpus import CandidateCorpus
+            st.session_state.corpus = CandidateCorpus.load(CORPUS_FILE)
     
     st.markdown("---")
     st.markdown("### 支持作者")
@@ -148,57 +165,292 @@ with st.sidebar:
 # --- Main Area ---
 st.title("🔥 YouTube Shorts 爆款搜索神器")
 
-# Search Logic
-def run_search():
-    if not api_keys_input.strip():
-        st.error("請先輸入 API Key！")
-        return
-    
-    st.session_state.searching = True
-    
-    # Initialize Managers
-    key_manager = KeyManager(file_path=None) # Don't load from file, use input
+def result_view() -> ResultView:
+    """Sort indexes and rendered pages for the current results, rebuilt only when they change"""
+    view = st.session_state.result_view
+    if view is None or view.source is not st.session_state.results or view.collapse_copies != collapse_copies:
+        view = ResultView(st.session_state.results, collapse_copies=collapse_copies)
+        st.session_state.result_view = view
+    return view
+
+def make_key_manager(metrics: Metrics | None = None) -> KeyManager:
+    # Every run starts with fresh metrics, shown in the diagnostics panel, unless it adds to the current ones
+    st.session_state.metrics = metrics or Metrics()
+    key_manager = KeyManager(file_path=None, metrics=st.session_state.metrics) # Don't load from file, use input
     keys = [k.strip() for k in api_keys_input.splitlines() if k.strip()]
     key_manager.set_keys(keys)
-    
-    api_client = YouTubeAPIClient(key_manager)
-    
-    settings = {
+    return key_manager
+
+def search_settings() -> dict:
+    """Search and filter settings from the sidebar"""
+    return {
         "keywords": [k.strip() for k in keywords.split(',') if k.strip()],
         "days": days,
         "max_pages": depth,
+        "shards": shards,
+        "adaptive": adaptive_depth,
+        "incremental": incremental,
         "limit": limit,
         "min_views": min_views,
         "max_duration": max_duration
     }
+
+def filter_key(settings: dict) -> tuple:
+    return settings["min_views"], settings["max_duration"], settings["limit"]
+
+def complete_cards(items: list[dict]):
+    """Card fields for candidates a two-phase search did not complete (1 quota unit per 50 videos)"""
+    if not api_keys_input.strip():
+        return  # Shown without titles until the next search
+    from core.api_client import YouTubeAPIClient
     
-    all_results = []
-    progress_bar = st.progress(0)
-    status_text = st.empty()
+    # Part of the re-filter: counted with the metrics of the search it came from
+    key_manager = make_key_manager(st.session_state.metrics)
+    YouTubeAPIClient(key_manager, max_workers=max_workers, transport=transport).complete_cards(items)
+    key_manager.flush()
+    st.session_state.key_usage = key_manager.usage_report()
+
+def refilter_results():
+    """Re-filter the last search's candidates locally when only the filter rules changed (no API calls)"""
+    corpus = st.session_state.corpus
+    settings = search_settings()
+    if corpus is None or filter_key(settings) == st.session_state.corpus_filters or not corpus.matches(settings):
+        return
+    
+    start = time.perf_counter()
+    records = corpus.query(settings, complete_cards)
+    if records is None:
+        st.info("上次搜尋在達到數量限制後就停止了，新的篩選條件需要更多候選影片，請重新搜尋")
+        return
     
-    total_kw = len(settings['keywords'])
+    # Subscriber counts carry over by channel; velocity comes from the local snapshots
+    subscribers = {v.channel_id: v.subscriber_count for v in st.session_state.results
+                   if v.subscriber_count is not None}
+    snapshots = SnapshotStore(SNAPSHOT_FILE)
+    velocity = snapshots.views_per_hour([v.id for v in records])
+    snapshots.close()
+    for vid in records:
+        vid.subscriber_count = subscribers.get(vid.channel_id)
+        vid.views_per_hour = velocity.get(vid.id)
     
-    for idx, kw in enumerate(settings['keywords']):
-        status_text.text(f"正在搜尋: {kw}...")
-        results = api_client.fetch_and_filter(kw, settings, lambda x, y: None) # No callback for now
-        all_results.extend(results)
-        progress_bar.progress(int((idx + 1) / total_kw * 100))
+    st.session_state.results = records
+    st.session_state.result_view = None
+    st.session_state.corpus_filters = filter_key(settings)
+    seconds = time.perf_counter() - start
+    if st.session_state.metrics is not None:
+        st.session_state.metrics.add_time("refilter", seconds)
+    st.caption(f"已從 {len(corpus):,} 部候選影片重新篩選 ({seconds * 1000:.0f} ms，未使用 API 額度)")
+
+def export_file(records: list, fmt: str, columns: list[str], title: str):
+    """Builds a download on click (deferred), streaming chunks into a temp file rather than one big string"""
+    def build():
+        file = tempfile.TemporaryFile(buffering=0)
+        write_export(records, file, fmt, columns, title=title)
+        file.seek(0)
+        return file
+    return build
+
+def refresh_views():
+    """Re-poll statistics for the current results (1 quota unit per 50 videos)"""
+    if not api_keys_input.strip():
+        st.error("請先輸入 API Key！")
+        return
+    
+    from core.api_client import YouTubeAPIClient
+    
+    results = st.session_state.results
+    key_manager = make_key_manager()
+    snapshots = SnapshotStore(SNAPSHOT_FILE)
+    api_client = YouTubeAPIClient(key_manager, max_workers=max_workers, transport=transport, snapshots=snapshots)
+    
+    with api_client.metrics.stage("run"):
+        view_counts = api_client.poll_statistics([v.id for v in results])
+    velocity = snapshots.views_per_hour(list(view_counts))
+    snapshots.close()
+    if st.session_state.corpus is not None:
+        st.session_state.corpus.update_views(view_counts)
+    for vid in results:
+        if vid.id in view_counts:
+            vid.update_views(view_counts[vid.id])
+            vid.views_per_hour = velocity.get(vid.id)
+    st.session_state.result_view = None  # Sort keys changed
+    
+    key_manager.flush()
+    st.session_state.key_usage = key_manager.usage_report()
+    st.success(f"已更新 {len(view_counts)} 部影片的觀看數")
+
+# Search Logic
+def search_job(job: Job, keys: list[str], settings: dict, options: dict, metrics: Metrics):
+    """
+    Runs on a job thread and outlives script reruns, so it must not touch st.* or session state.
+    Results are published to the job as they arrive.
+    """
+    from core.api_client import YouTubeAPIClient
+    from core.corpus import CandidateCorpus
+    
+    key_manager = KeyManager(file_path=None, metrics=metrics)
+    key_manager.set_keys(keys)
+    cache = ResponseCache(CACHE_FILE)
+    cache.enabled = options["use_cache"]
+    cache.refresh = options["refresh_cache"]
+    snapshots = SnapshotStore(SNAPSHOT_FILE)
+    delta_store = DeltaStore(DELTA_FILE)
+    corpus = CandidateCorpus(settings)
+    api_client = YouTubeAPIClient(key_manager, max_workers=options["max_workers"], cache=cache,
+                                  transport=options["transport"], projection=options["projection"],
+                                  snapshots=snapshots,
+                                  yield_history=YieldHistory(YIELD_HISTORY_FILE),
+                                  results_cache=options["results_cache"], delta_store=delta_store,
+                                  corpus=corpus)
+    finished_corpus = None
+    
+    keywords = settings['keywords']
+    job.set_progress(0, len(keywords), f"正在搜尋: {', '.join(keywords)}...")
+    
+    def on_keyword_done(done, total, kw):
+        job.set_progress(done, total, f"已完成: {kw} ({done}/{total})")
+    
+    try:
+        # Cancelling stops paging between requests; results found so far stay on the job
+        with metrics.stage("run"):
+            if options["stream"]:
+                for vid in api_client.iter_fetch_many(keywords, settings, on_keyword_done, job.cancel_event):
+                    job.add_results([vid])
+                    if job.cancelled:
+                        break  # Closing the stream stops further requests
+            else:
+                api_client.fetch_many(keywords, settings, on_keyword_done, cancel=job.cancel_event,
+                                      results_callback=job.add_results)
         
-    st.session_state.results = all_results
-    st.session_state.searching = False
-    status_text.text("搜尋完成！")
+        all_results = job.results()
+        if options["channels"] and all_results and not job.cancelled:
+            job.set_progress(job.done, job.total, "正在取得頻道資料...")
+            api_client.enrich_channels(all_results)
+        velocity = snapshots.views_per_hour([v.id for v in all_results])
+        for vid in all_results:
+            vid.views_per_hour = velocity.get(vid.id)
+        if not job.cancelled:
+            finished_corpus = corpus  # A cancelled search saw only part of the candidates
+    finally:
+        snapshots.close()
+        delta_store.close()
+        key_manager.flush()
+        job.summary = {"key_usage": key_manager.usage_report(), "cache": cache.stats(),
+                       "corpus": finished_corpus, "filters": filter_key(settings)}
+        cache.close()
+
+def submit_search():
+    if not api_keys_input.strip():
+        st.error("請先輸入 API Key！")
+        return
     
-    # Check Celebration
-    has_viral = any(int(v.get('statistics', {}).get('viewCount', 0)) >= 10000000 for v in all_results)
-    if has_viral:
-        st.balloons()
-        st.success("哇！發現千萬流量級別的超級爆款！🔥")
+    settings = search_settings()
+    corpus = st.session_state.corpus
+    if (corpus is not None and corpus.matches(settings) and not refresh_cache and not incremental
+            and time.time() - corpus.created_at < CORPUS_MAX_AGE and corpus.query(settings) is not None):
+        # The results already come from these candidates (see refilter_results)
+        st.info("搜尋條件 (關鍵字、天數、深度) 與上次相同，已直接以上次的候選影片篩選，未使用 API 額度；"
+                "需要最新資料請勾選「強制刷新」")
+        return
+    options = {
+        "max_workers": max_workers,
+        "transport": transport,
+        "projection": projection,
+        "channels": enrich_channels,
+        "stream": stream_results,
+        "use_cache": use_cache,
+        "refresh_cache": refresh_cache,
+        "results_cache": shared_results() if use_cache else None,
+    }
+    keys = [k.strip() for k in api_keys_input.splitlines() if k.strip()]
+    metrics = Metrics()
+    job = job_manager().submit(
+        lambda job: search_job(job, keys, settings, options, metrics), ", ".join(settings['keywords'])
+    )
+    st.session_state.job_id = job.id
+    st.session_state.job_metrics = metrics
+
+def current_job() -> Job | None:
+    """This session's search job, if it is still in the registry"""
+    job_id = st.session_state.job_id
+    job = job_manager().get(job_id) if job_id else None
+    if job_id and job is None:
+        st.session_state.job_id = None  # Pruned, or the server restarted
+    return job
+
+def finish_job(job: Job):
+    """Move a finished job's results into the session"""
+    st.session_state.results = job.results()
+    st.session_state.result_view = None
+    st.session_state.metrics = st.session_state.job_metrics
+    if job.summary.get("corpus") is not None:
+        st.session_state.corpus = job.summary["corpus"]
+        st.session_state.corpus_filters = job.summary["filters"]
+        if save_corpus:
+            st.session_state.corpus.save(CORPUS_FILE)
+    st.session_state.key_usage = job.summary.get("key_usage", st.session_state.key_usage)
+    st.session_state.job_id = None
+    st.session_state.last_job = {**job.snapshot(), "cache": job.summary.get("cache")}
+
+@st.fragment(run_every=JOB_POLL_INTERVAL)
+def job_panel():
+    """Polls the running job; reruns the whole page once it has finished"""
+    job = current_job()
+    if job is None:
+        return
+    if job.finished:
+        finish_job(job)
+        st.rerun()
+    
+    info = job.snapshot()
+    progress = info["done"] / info["total"] if info["total"] else 0.0
+    st.progress(progress, text=info["message"] or "排隊中...")
+    status_col, cancel_col = st.columns([4, 1])
+    status_col.caption(f"已找到 {info['results']} 部影片 · 已執行 {info['elapsed']:.0f} 秒")
+    if cancel_col.button("⏹ 取消搜尋", disabled=job.cancelled):
+        job.cancel()
+    
+    # Newest partial results first; the full sorted list replaces them when the job ends
+    preview = job.results()[-JOB_PREVIEW_CARDS:][::-1]
+    if preview:
+        st.markdown("\n".join(card_html(vid) for vid in preview), unsafe_allow_html=True)
+
+def show_last_job():
+    """Outcome of the job that just finished (shown once)"""
+    info = st.session_state.last_job
+    if info is None:
+        return
+    st.session_state.last_job = None
+    if info["state"] == FAILED:
+        st.error(f"搜尋失敗：{info['error']}")
+    elif info["state"] == CANCELLED:
+        st.warning(f"已取消搜尋，保留目前找到的 {info['results']} 部影片")
+    else:
+        cache_stats = info.get("cache") or {"hits": 0, "misses": 0}
+        st.success(f"搜尋完成！(快取命中 {cache_stats['hits']} / 未命中 {cache_stats['misses']})")
+        # Check Celebration
+        if any(v.view_count >= 10000000 for v in st.session_state.results):
+            st.balloons()
+            st.success("哇！發現千萬流量級別的超級爆款！🔥")
+
+if current_job() is None:
+    refilter_results()
 
 # Action Bar
+searching = current_job() is not None
 col1, col2 = st.columns([1, 4])
 with col1:
-    if st.button("🚀 開始找爆款", type="primary", disabled=st.session_state.searching):
-        run_search()
+    if st.button("🚀 開始找爆款", type="primary", disabled=searching):
+        submit_search()
+        searching = current_job() is not None
+with col2:
+    if st.button("📈 重新取得觀看數", disabled=searching or not st.session_state.results,
+                 help="只更新目前結果的觀看數 (每 50 部影片僅需 1 單位額度)，並計算每小時增長"):
+        refresh_views()
+
+if searching:
+    job_panel()
+show_last_job()
 
 # Results Display
 results = st.session_state.results
@@ -207,63 +459,96 @@ if results:
     st.subheader(f"找到 {len(results)} 部爆款影片")
     
     # Sort Options
-    sort_opt = st.selectbox("排序方式", ["總觀看數量 (High to Low)", "日均觀看數 (High to Low)"])
-    if "總觀看" in sort_opt:
-        results.sort(key=lambda x: int(x['statistics'].get('viewCount', 0)), reverse=True)
-    else:
-        results.sort(key=lambda x: x.get('_daily_views', 0), reverse=True)
-
-    # Display Cards
-    # Using columns for responsive grid
-    # Streamlit columns are not auto-wrapping, so we iterate
+    sort_col, size_col = st.columns([3, 1])
+    with sort_col:
+        sort_opt = st.selectbox("排序方式", list(SORT_OPTIONS))
+    with size_col:
+        page_size = st.selectbox("每頁顯示", RESULTS_PAGE_SIZES, index=1)
     
-    # On mobile, we might want 1 column. On desktop, maybe 2 or 3?
-    # Streamlit handles stacking automatically if we just print them one by one, 
-    # but for grid view we need manual chunking. Let's stick to list view for best compatibility.
+    view = result_view()
+    if len(view.records) < len(results):
+        st.caption(f"重複上傳已合併：共 {len(view.records)} 張卡片")
+    sort_key = SORT_OPTIONS[sort_opt]
+    shown = view.count(sort_key, min_velocity)
+    page_total = view.page_count(page_size, sort_key, min_velocity)
+    page = st.number_input(f"頁數 (共 {page_total} 頁)", min_value=1, max_value=page_total, value=1, step=1)
     
-    for vid in results:
-        snippet = vid.get('snippet', {})
-        stats = vid.get('statistics', {})
-        vid_id = vid.get('id')
+    if min_velocity > 0:
+        st.caption(f"符合每小時增長門檻: {shown} 部")
+    
+    with st.expander("📺 頻道彙總", expanded=False):
+        # Click a column header to sort, e.g. by views per subscriber to spot small channels that went viral
+        st.dataframe([
+            {"頻道": c["channel_title"], "訂閱數": c["subscribers"], "結果數": c["videos"],
+             "總觀看數": c["total_views"], "最高觀看數": c["top_views"],
+             "觀看/訂閱比": round(c["views_per_subscriber"], 2) if c["views_per_subscriber"] is not None else None,
+             "頻道連結": c["channel_url"]}
+            for c in view.channels()
+        ], hide_index=True, column_config={"頻道連結": st.column_config.LinkColumn("頻道連結", display_text="開啟")})
+    
+    with st.expander("💾 匯出結果", expanded=False):
+        export_formats = {"CSV": "csv", "JSON Lines (NDJSON)": "ndjson", "Parquet": "parquet", "HTML 報告": "html"}
+        format_col, columns_col = st.columns([1, 3])
+        with format_col:
+            export_fmt = export_formats[st.selectbox("格式", list(export_formats))]
+        with columns_col:
+            export_columns = st.multiselect(
+                "欄位", list(EXPORT_COLUMNS), default=list(EXPORT_COLUMNS), disabled=export_fmt == "html",
+                help="HTML 報告固定輸出與網頁相同的結果卡片"
+            )
+        mime, extension = EXPORT_FORMATS[export_fmt]
+        # Exactly the cards on screen: current sort order and velocity threshold
+        ordered = [view.records[i] for i in view.visible(sort_key, min_velocity)]
+        st.download_button(
+            "下載", export_file(ordered, export_fmt, export_columns, keywords), mime=mime,
+            file_name=f"shorts_{datetime.now().strftime('%Y%m%d_%H%M')}{extension}",
+            disabled=not export_columns and export_fmt != "html",
+        )
+    
+    # One HTML block per page instead of one element per card
+    render_start = time.perf_counter()
+    st.markdown(view.page_html(sort_key, int(page), page_size, min_velocity), unsafe_allow_html=True)
+    if st.session_state.metrics is not None:
+        st.session_state.metrics.add_time("render", time.perf_counter() - render_start)
         
-        title = snippet.get('title', 'No Title')
-        channel = snippet.get('channelTitle', 'Unknown')
-        view_count = int(stats.get('viewCount', 0))
-        daily = int(vid.get('_daily_views', 0))
-        duration = vid.get('_formatted_duration', '00:00')
-        rating = vid.get('_rating', '')
-        thumb = snippet.get('thumbnails', {}).get('medium', {}).get('url')
+elif not searching:
+    st.info("👈 請在左側設定 API Key 與搜尋條件，然後點擊「開始找爆款」！")
+
+# Diagnostics
+if st.session_state.metrics is not None:
+    with st.expander("🔧 診斷資訊 (上次執行)"):
+        metrics = st.session_state.metrics
+        snapshot = metrics.snapshot()
         
-        url = f"https://www.youtube.com/watch?v={vid_id}"
-        channel_id = snippet.get('channelId')
-        channel_url = f"https://www.youtube.com/channel/{channel_id}"
+        st.markdown("**各階段耗時** (並行執行時各執行緒的時間會累加)")
+        st.table([
+            {"階段": stage, "次數": v["calls"], "總秒數": round(v["seconds"], 3), "最長秒數": round(v["max_seconds"], 3)}
+            for stage, v in snapshot["stages"].items()
+        ])
         
-        # Render HTML Card
-        st.markdown(f"""
-        <div class="video-card">
-            <div style="display: flex; gap: 15px;">
-                <div style="flex: 0 0 160px;">
-                    <img src="{thumb}" style="width: 100%; border-radius: 4px;">
-                </div>
-                <div style="flex: 1;">
-                    <a href="{url}" target="_blank" class="video-title">{title}</a>
-                    <div class="channel-name">{channel}</div>
-                    <div class="stats-row">
-                        <span>👀 {view_count:,} {rating}</span>
-                        <span>⏱️ {duration}</span>
-                    </div>
-                    <div class="daily-views">🔥 日均: {daily:,}/天</div>
-                    <div style="margin-top: 10px;">
-                        <a href="{url}" target="_blank" class="action-btn">▶ 觀看影片</a>
-                        <a href="{channel_url}" target="_blank" class="action-btn">🏠 頻道首頁</a>
-                    </div>
-                </div>
-            </div>
-        </div>
-        """, unsafe_allow_html=True)
+        calls = metrics.by_label("api_calls", "keyword")
+        quota = metrics.by_label("keyword_quota_units", "keyword")
+        st.markdown("**各關鍵字 API 呼叫與預估額度**")
+        st.table([{"關鍵字": kw or "-", "呼叫次數": calls.get(kw, 0), "額度": quota.get(kw, 0)} for kw in quota])
         
-elif not st.session_state.searching:
-    st.info("👈 請在左側設定 API Key 與搜尋條件，然後點擊「開始找爆款」！")
+        m1, m2, m3, m4 = st.columns(4)
+        m1.metric("HTTP 請求", int(metrics.total("http_requests")))
+        m2.metric("回應大小", f"{metrics.total('response_bytes') / 1024:,.0f} KiB")
+        m3.metric("重試", int(metrics.total("retries")))
+        m4.metric("Key 輪替", int(metrics.total("key_rotations")))
+        
+        filtered = metrics.by_label("items_filtered", "rule")
+        checked = int(metrics.total("items_checked"))
+        st.caption(f"檢查 {checked} 部影片，淘汰: " + (", ".join(f"{rule} {int(n)}" for rule, n in filtered.items()) or "無"))
+        st.caption(f"快取: 命中 {int(metrics.total('cache_lookups', result='hit'))} / "
+                   f"未命中 {int(metrics.total('cache_lookups', result='miss'))}；"
+                   f"共用結果: 命中 {int(metrics.total('result_cache', result='hit'))} / "
+                   f"等待其他使用者 {int(metrics.total('result_cache', result='joined'))} / "
+                   f"未命中 {int(metrics.total('result_cache', result='lead'))}")
+        
+        d1, d2 = st.columns(2)
+        d1.download_button("下載 JSON", metrics.to_json(), file_name="metrics.json", mime="application/json")
+        d2.download_button("下載 Prometheus", metrics.to_prometheus(), file_name="metrics.prom", mime="text/plain")
 
 # Footer
 st.markdown("---")